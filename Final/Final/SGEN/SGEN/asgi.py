@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SGEN.settings')
 
 application = get_asgi_application()
+
+# Plantillas compiladas y validadas antes de la primera petición (sgenapp/arranque.py)
+if settings.PRECOMPILAR_PLANTILLAS:
+    from sgenapp.arranque import preparar
+    preparar()
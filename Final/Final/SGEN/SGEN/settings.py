@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'sgenapp.middleware.PerfiladoMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -48,22 +52,50 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'sgenapp.middleware.AuditoriaMiddleware',
 ]
 
 ROOT_URLCONF = 'SGEN.urls'
 
+# Perfil de plantillas, con SGEN_PLANTILLAS:
+#   desarrollo  las plantillas modificadas se vuelven a leer (con runserver)
+#   produccion  cargador en caché sin información de depuración; wsgi.py compila
+#               y valida todas las plantillas al iniciar el proceso (ver sgenapp/arranque.py)
+PERFIL_PLANTILLAS = os.environ.get('SGEN_PLANTILLAS', 'desarrollo' if DEBUG else 'produccion')
+if PERFIL_PLANTILLAS not in ('desarrollo', 'produccion'):
+    raise ImproperlyConfigured(
+        f"SGEN_PLANTILLAS debe ser 'desarrollo' o 'produccion', no '{PERFIL_PLANTILLAS}'"
+    )
+PRECOMPILAR_PLANTILLAS = os.environ.get(
+    'SGEN_PRECOMPILAR', '1' if PERFIL_PLANTILLAS == 'produccion' else '0'
+) == '1'
+
+OPCIONES_PLANTILLAS = {
+    'context_processors': [
+        'django.template.context_processors.request',
+        'django.contrib.auth.context_processors.auth',
+        'django.contrib.messages.context_processors.messages',
+        'sgenapp.fragmentos.fragmentos',
+    ],
+}
+if PERFIL_PLANTILLAS == 'produccion':
+    OPCIONES_PLANTILLAS.update({
+        'debug': False,
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    })
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
-        'OPTIONS': {
-            'context_processors': [
-                'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-            ],
-        },
+        # Con 'loaders' explícitos el cargador de app_directories ya está en la lista
+        'APP_DIRS': PERFIL_PLANTILLAS == 'desarrollo',
+        'OPTIONS': OPCIONES_PLANTILLAS,
     },
 ]
 
@@ -73,13 +105,122 @@ WSGI_APPLICATION = 'SGEN.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+# Se configura por variables de entorno. SQLite es el valor por defecto; para
+# producción usar PostgreSQL (requiere psycopg, y psycopg[pool] para el pool):
+#   SGEN_DB_MOTOR          sqlite | postgresql
+#   SGEN_DB_NOMBRE         archivo (SQLite) o nombre de la base (PostgreSQL)
+#   SGEN_DB_USUARIO, SGEN_DB_CLAVE, SGEN_DB_HOST, SGEN_DB_PUERTO
+#   SGEN_DB_CONN_MAX_AGE   segundos que se reutiliza una conexión (por defecto 60)
+#   SGEN_DB_POOL           1 para usar el pool de psycopg en lugar de CONN_MAX_AGE
+#   SGEN_DB_POOL_MIN, SGEN_DB_POOL_MAX  tamaño del pool por proceso
+
+MOTOR_BD = os.environ.get('SGEN_DB_MOTOR', 'sqlite')
+
+# Perfil de rendimiento de SQLite (WAL y PRAGMA, ver sgenapp/perfil_sqlite.py).
+# SGEN_SQLITE_PERFIL=0 vuelve al comportamiento por defecto de SQLite
+SQLITE_PERFIL = {
+    'ACTIVO': os.environ.get('SGEN_SQLITE_PERFIL', '1') == '1',
+    'PRAGMAS': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,      # ms que una conexión espera un bloqueo antes de fallar
+        'cache_size': -20000,      # negativo = KiB, unos 20 MB por conexión
+        'mmap_size': 134217728,    # 128 MB de lectura por memoria mapeada
+        'temp_store': 'MEMORY',
+    },
 }
 
+if MOTOR_BD == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SGEN_DB_NOMBRE', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {},
+        }
+    }
+    if SQLITE_PERFIL['ACTIVO']:
+        # En WAL una transacción que lee y luego escribe falla sin esperar busy_timeout
+        # si otra escribió entre medio; IMMEDIATE toma el bloqueo de escritura al iniciar
+        DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+elif MOTOR_BD == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('SGEN_DB_NOMBRE', 'sgen'),
+            'USER': os.environ.get('SGEN_DB_USUARIO', 'sgen'),
+            'PASSWORD': os.environ.get('SGEN_DB_CLAVE', ''),
+            'HOST': os.environ.get('SGEN_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('SGEN_DB_PUERTO', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('SGEN_DB_CONN_MAX_AGE', '60')),
+            # Verifica una conexión reutilizada antes de usarla en una nueva petición
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('SGEN_DB_POOL') == '1':
+        # El pool ya mantiene las conexiones abiertas; Django exige CONN_MAX_AGE = 0
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('SGEN_DB_POOL_MIN', '2')),
+            'max_size': int(os.environ.get('SGEN_DB_POOL_MAX', '10')),
+            'timeout': 10,
+        }
+else:
+    raise ImproperlyConfigured(f"SGEN_DB_MOTOR debe ser 'sqlite' o 'postgresql', no '{MOTOR_BD}'")
+
+
+# Cachés, una por uso:
+#   default     agregados calculados (estadísticas del panel, permisos, portal del estudiante)
+#   sesiones    copia en caché de las sesiones (SESSION_ENGINE cached_db)
+#   fragmentos  fragmentos de plantilla ({% cache %})
+# SGEN_CACHE_MOTOR elige dónde viven:
+#   memoria  LRU dentro del proceso, con MAX_ENTRIES por alias; sólo sirve con un
+#            proceso por servidor (cada worker tendría su propia copia e invalidaciones)
+#   archivo  directorio SGEN_CACHE_DIR compartido por los workers de un mismo equipo
+#   redis    servidor en SGEN_CACHE_URL, para varios equipos (requiere el paquete redis;
+#            el límite de tamaño lo pone maxmemory/maxmemory-policy del servidor)
+MOTOR_CACHE = os.environ.get('SGEN_CACHE_MOTOR', 'memoria')
+ENTRADAS_CACHE = {'default': 5000, 'sesiones': 10000, 'fragmentos': 2000}
+
+if MOTOR_CACHE == 'memoria':
+    CACHES = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': f'sgen-{alias}',
+            # Al llenarse descarta la cuarta parte menos usada recientemente
+            'OPTIONS': {'MAX_ENTRIES': maximo, 'CULL_FREQUENCY': 4},
+        }
+        for alias, maximo in ENTRADAS_CACHE.items()
+    }
+elif MOTOR_CACHE == 'archivo':
+    DIRECTORIO_CACHE = os.environ.get('SGEN_CACHE_DIR', str(BASE_DIR / 'cache'))
+    CACHES = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(DIRECTORIO_CACHE, alias),
+            'OPTIONS': {'MAX_ENTRIES': maximo, 'CULL_FREQUENCY': 4},
+        }
+        for alias, maximo in ENTRADAS_CACHE.items()
+    }
+elif MOTOR_CACHE == 'redis':
+    CACHES = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('SGEN_CACHE_URL', 'redis://127.0.0.1:6379/0'),
+            'KEY_PREFIX': alias,
+        }
+        for alias in ENTRADAS_CACHE
+    }
+else:
+    raise ImproperlyConfigured(
+        f"SGEN_CACHE_MOTOR debe ser 'memoria', 'archivo' o 'redis', no '{MOTOR_CACHE}'"
+    )
+
+# La sesión se lee de la caché y se escribe también en la base de datos, así
+# que sobrevive a un reinicio o a que se descarte de la caché
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sesiones'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -116,6 +257,29 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'estaticos'
+
+# Almacenamiento de estáticos, con SGEN_ESTATICOS:
+#   manifiesto  collectstatic agrega a cada archivo un hash de su contenido
+#                (sgen.3f2a9c81e0b4.css) para servirlo con caché de un año (ver
+#                sgenapp/estaticos.py). Es un paso obligatorio del despliegue:
+#                    python manage.py collectstatic --noinput
+#                Sin staticfiles.json en STATIC_ROOT, {% static %} falla con DEBUG=False;
+#                check --deploy (sgenapp.E001) y el arranque (sgenapp/arranque.py) lo detectan.
+#   simple       los archivos de la app tal cual, sin collectstatic (desarrollo y pruebas)
+ALMACEN_ESTATICOS = os.environ.get('SGEN_ESTATICOS', 'simple' if DEBUG else 'manifiesto')
+if ALMACEN_ESTATICOS not in ('manifiesto', 'simple'):
+    raise ImproperlyConfigured(
+        f"SGEN_ESTATICOS debe ser 'manifiesto' o 'simple', no '{ALMACEN_ESTATICOS}'"
+    )
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+        if ALMACEN_ESTATICOS == 'manifiesto'
+        else 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -128,3 +292,45 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'login'  # Redirige al login para que la vista maneje la redirección
 LOGOUT_REDIRECT_URL = 'login'
 
+
+# Auditoría (HistorialAcciones): 'asincrono' escribe por lotes desde un hilo,
+# 'sincrono' escribe cada acción en el momento (usar en pruebas)
+AUDITORIA = {
+    'MODO': 'asincrono',
+    'TAMANO_LOTE': 100,
+    'INTERVALO': 2.0,
+}
+
+
+# Caché del portal del estudiante (ver sgenapp/portal_estudiante.py). Al
+# guardar una planilla los portales afectados se recalculan en segundo plano.
+PORTAL_ESTUDIANTE = {
+    'CALENTAMIENTO': 'asincrono',
+    'EXPIRACION': 15 * 60,
+    'TAMANO_LOTE': 500,
+    'ESPERA_MAXIMA': 2.0,
+}
+
+
+# Fragmentos de plantilla en caché (barras de navegación y listas de selección,
+# ver sgenapp/fragmentos.py). Las señales los invalidan al cambiar la estructura.
+FRAGMENTOS = {
+    'EXPIRACION': 60 * 60,
+}
+
+
+# Perfilado por petición (Server-Timing y log rotativo, ver sgenapp/perfilado.py).
+# Se activa con SGEN_PERFILADO=1; MUESTREO es la fracción de peticiones registradas
+PERFILADO = {
+    'ACTIVO': os.environ.get('SGEN_PERFILADO') == '1',
+    'MUESTREO': float(os.environ.get('SGEN_PERFILADO_MUESTREO', '0.1')),
+    'LENTA_MS': 500,
+    'ARCHIVO': BASE_DIR / 'perfilado.log',
+    'TAMANO_MAXIMO': 5 * 1024 * 1024,
+    'RESPALDOS': 3,
+    'UMBRAL_REPETIDAS': 5,
+}
+
+# Los índices con columnas incluidas (include=) sólo son cubrientes en PostgreSQL;
+# en SQLite se crean sin ellas, que es lo esperado
+SILENCED_SYSTEM_CHECKS = ['models.W040']
@@ -14,11 +14,17 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from sgenapp.estaticos import servir
 
 urlpatterns = [
     path('django-admin/', admin.site.urls),  # Admin de Django en ruta diferente
+    re_path(rf'^{re.escape(settings.STATIC_URL.lstrip("/"))}(?P<ruta>.+)$', servir),  # STATIC_ROOT con caché
     path('', include('sgenapp.urls')),       # Tu app en la raíz
 ]
 
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SGEN.settings')
 
 application = get_wsgi_application()
+
+# Plantillas compiladas y validadas antes de la primera petición (sgenapp/arranque.py)
+if settings.PRECOMPILAR_PLANTILLAS:
+    from sgenapp.arranque import preparar
+    preparar()
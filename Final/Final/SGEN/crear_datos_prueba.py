@@ -2,6 +2,9 @@
 Script para crear datos de prueba en SGEN
 Ejecutar: cd C:\Users\USUARIO\Desktop\Final\SGEN
 Ejecutar: python manage.py shell < crear_datos_prueba.py
+
+Para volúmenes grandes (pruebas de carga) usar el comando de gestión:
+    python manage.py generar_datos --help
 """
 
 from sgenapp.models import (
@@ -7,50 +7,23 @@ import os
 
 TEMPLATES_PATH = "sgenapp/templates/"
 
-# CSS Base reutilizable
+# CSS propio de estas páginas; las variables de diseño y las reglas comunes
+# están en sgenapp/static/sgenapp/css/sgen.css, que se carga antes
 CSS_BASE = """
-  :root{
-    --brand-blue: #1565C0;
-    --brand-red: #D32F2F;
-    --success: #2E7D32;
-    --warning: #ED6C02;
-    --bg:#FFFFFF;
-    --text:#111111;
-    --muted:#6B7280;
-    --border:#DADCE0;
-    --shadow:0 8px 24px rgba(16,24,40,.08);
-    --font-sans:ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Inter, "Helvetica Neue", Arial, sans-serif;
-    --space-2:.5rem;
-    --space-3:.75rem;
-    --space-4:1rem;
-    --space-6:1.5rem;
-    --space-8:2rem;
-    --radius-sm:.5rem;
-    --radius-xl:1.25rem;
-  }
-  *{box-sizing:border-box}
   html,body{height:100%; margin:0}
   body{font-family:var(--font-sans); font-size:15px; color:var(--text); background:linear-gradient(180deg,#fafafb, #f4f6fa 60%, #eef2f7)}
-  .container{max-width:1200px; margin:0 auto; padding:var(--space-8)}
   .header{display:flex; justify-content:space-between; align-items:center; margin-bottom:var(--space-8)}
   .header h1{margin:0}
-  .header-small{display:flex; gap:var(--space-4)}
   .btn{appearance:none; border:1px solid var(--border); background:#e5e7eb; color:var(--text); padding:.5rem .75rem; border-radius:6px; font-weight:600; cursor:pointer; font-size:14px; transition:.15s}
-  .btn.primary{background:var(--brand-blue); color:#fff; border:none}
-  .btn.primary:hover{background:#0D47A1}
-  .btn.danger{background:var(--brand-red); color:#fff; border:none}
   .btn.danger:hover{background:#B71C1C}
   .btn.success{background:var(--success); color:#fff; border:none}
   .card{background:var(--bg); border:1px solid var(--border); border-radius:var(--radius-xl); box-shadow:var(--shadow); padding:var(--space-6); margin-bottom:var(--space-6)}
-  .card h2{margin:0 0 var(--space-4)}
   .nav{background:var(--bg); border-bottom:1px solid var(--border); padding:var(--space-4); margin-bottom:var(--space-8); display:flex; gap:var(--space-4); flex-wrap:wrap}
   .nav a{text-decoration:none; color:var(--brand-blue); font-weight:600; padding:.5rem 1rem; border-radius:.5rem}
-  .nav a:hover{background:var(--border)}
   .table{width:100%; border-collapse:separate; border-spacing:0; border:1px solid var(--border); border-radius:var(--radius-sm); overflow:hidden}
   .table th, .table td{padding:.75rem; border-bottom:1px solid var(--border); text-align:left}
   .table thead th{background:#F7F7F9; font-weight:700}
   .table tr:last-child td{border-bottom:none}
-  .form-group{margin-bottom:var(--space-4)}
   .form-group label{display:block; font-weight:600; margin-bottom:.25rem}
   .form-group input, .form-group select, .form-group textarea{width:100%; padding:.5rem; border:1px solid var(--border); border-radius:.5rem; font-family:var(--font-sans); font-size:15px}
   .form-group input:focus, .form-group select:focus, .form-group textarea:focus{outline:none; box-shadow:0 0 0 3px rgba(21,101,192,.18); border-color:var(--brand-blue)}
@@ -60,16 +33,18 @@ CSS_BASE = """
   .message.warning{background:rgba(237,108,2,.06); border-color:var(--warning); color:var(--warning)}
 """
 
+ESTILOS = """<link rel="stylesheet" href="{% static 'sgenapp/css/sgen.css' %}" />
+<style>""" + CSS_BASE + """</style>"""
+
 templates = {
-    "admin_usuarios.html": """<!doctype html>
+    "admin_usuarios.html": """{% load static %}
+<!doctype html>
 <html lang="es">
 <head>
 <meta charset="utf-8" />
 <meta name="viewport" content="width=device-width, initial-scale=1" />
 <title>Gestionar Usuarios • SGEN</title>
-<style>
-""" + CSS_BASE + """
-</style>
+""" + ESTILOS + """
 </head>
 <body>
   <div class="container">
@@ -188,15 +163,14 @@ templates = {
 </body>
 </html>""",
 
-    "admin_crear_usuario.html": """<!doctype html>
+    "admin_crear_usuario.html": """{% load static %}
+<!doctype html>
 <html lang="es">
 <head>
 <meta charset="utf-8" />
 <meta name="viewport" content="width=device-width, initial-scale=1" />
 <title>Crear Usuario • SGEN</title>
-<style>
-""" + CSS_BASE + """
-</style>
+""" + ESTILOS + """
 </head>
 <body>
   <div class="container">
@@ -248,15 +222,14 @@ templates = {
 </body>
 </html>""",
 
-    "admin_editar_usuario.html": """<!doctype html>
+    "admin_editar_usuario.html": """{% load static %}
+<!doctype html>
 <html lang="es">
 <head>
 <meta charset="utf-8" />
 <meta name="viewport" content="width=device-width, initial-scale=1" />
 <title>Editar Usuario • SGEN</title>
-<style>
-""" + CSS_BASE + """
-</style>
+""" + ESTILOS + """
 </head>
 <body>
   <div class="container">
@@ -302,15 +275,14 @@ templates = {
 </body>
 </html>""",
 
-    "admin_reportes.html": """<!doctype html>
+    "admin_reportes.html": """{% load static %}
+<!doctype html>
 <html lang="es">
 <head>
 <meta charset="utf-8" />
 <meta name="viewport" content="width=device-width, initial-scale=1" />
 <title>Reportes • SGEN</title>
-<style>
-""" + CSS_BASE + """
-</style>
+""" + ESTILOS + """
 </head>
 <body>
   <div class="container">
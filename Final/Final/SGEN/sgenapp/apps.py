@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SgenappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sgenapp'
+
+    def ready(self):
+        # Registran los receptores de señales y los chequeos del sistema
+        from . import estaticos, signals  # noqa: F401
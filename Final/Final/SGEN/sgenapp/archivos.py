@@ -0,0 +1,74 @@
+"""
+Lectura de las hojas de cálculo que suben los usuarios (CSV o XLSX).
+
+leer_filas es común a las importaciones de usuarios y de notas y a la
+asignación de profesores en bloque: cada una pasa sus columnas requeridas y
+recibe las filas como diccionarios de texto, una a una, sin cargar el archivo
+completo en memoria. El encabezado no distingue mayúsculas y acepta 'n' por
+'ñ'. XLSX requiere openpyxl.
+"""
+
+import csv
+import io
+
+
+class ArchivoError(Exception):
+    """El archivo no se puede leer (formato, encabezado o dependencia faltante)"""
+
+
+def _normalizar_encabezado(columnas, requeridas):
+    encabezado = [str(columna or '').strip().lower().replace('ñ', 'n') for columna in columnas]
+    faltantes = [columna for columna in requeridas if columna not in encabezado]
+    if faltantes:
+        raise ArchivoError(f'Faltan columnas: {", ".join(faltantes)}')
+    return encabezado
+
+
+def _filas_csv(archivo, requeridas):
+    texto = io.TextIOWrapper(getattr(archivo, 'file', archivo), encoding='utf-8-sig', newline='')
+    try:
+        lector = csv.reader(texto)
+        encabezado = _normalizar_encabezado(next(lector, []), requeridas)
+        for numero, valores in enumerate(lector, start=2):
+            yield numero, dict(zip(encabezado, valores))
+    except UnicodeDecodeError:
+        raise ArchivoError('El archivo CSV debe estar codificado en UTF-8.')
+    except csv.Error as error:
+        raise ArchivoError(f'CSV inválido: {error}')
+    finally:
+        texto.detach()
+
+
+def _filas_xlsx(archivo, requeridas):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ArchivoError('Para importar archivos XLSX instale openpyxl.')
+    try:
+        libro = load_workbook(archivo, read_only=True, data_only=True)
+    except Exception:
+        raise ArchivoError('El archivo XLSX no es válido.')
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezado = _normalizar_encabezado(next(filas, []), requeridas)
+        for numero, valores in enumerate(filas, start=2):
+            yield numero, dict(zip(encabezado, valores))
+    finally:
+        libro.close()
+
+
+def leer_filas(archivo, nombre, requeridas):
+    """
+    Genera (linea, {columna: texto}) con las filas no vacías; `nombre` decide
+    el formato por su extensión. Lanza ArchivoError si no se puede leer.
+    """
+    if nombre.lower().endswith('.xlsx'):
+        filas = _filas_xlsx(archivo, requeridas)
+    elif nombre.lower().endswith('.csv'):
+        filas = _filas_csv(archivo, requeridas)
+    else:
+        raise ArchivoError('Formato no soportado: use .csv o .xlsx')
+    for numero, fila in filas:
+        fila = {clave: '' if valor is None else str(valor).strip() for clave, valor in fila.items()}
+        if any(fila.values()):
+            yield numero, fila
@@ -0,0 +1,97 @@
+"""
+Preparación de un proceso nuevo antes de su primera petición.
+
+Django compila cada plantilla la primera vez que se usa y la guarda en el
+cargador en caché del proceso; lo mismo pasa con las rutas de urls.py y el
+manifiesto de archivos estáticos. Sin preparación, la primera petición de
+cada página después de un despliegue paga ese costo. preparar() lo hace al
+iniciar el proceso (wsgi.py, con settings.PRECOMPILAR_PLANTILLAS) y además
+valida las plantillas: un error de sintaxis detiene el arranque en lugar de
+aparecer como un 500 en la primera visita a esa página.
+
+El comando precompilar_plantillas hace la misma validación sin servir
+peticiones (p. ej. antes de desplegar), y prueba_arranque mide el tiempo
+hasta la primera respuesta de un proceso nuevo.
+"""
+
+import logging
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import ImproperlyConfigured
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+HOJA_COMPARTIDA = 'sgenapp/css/sgen.css'
+
+
+def directorios_plantillas(motor):
+    """DIRS del motor y la carpeta templates/ de las apps del proyecto (no las de Django)"""
+    base = Path(settings.BASE_DIR).resolve()
+    directorios = [Path(directorio) for directorio in motor.dirs]
+    for config in apps.get_app_configs():
+        carpeta = Path(config.path).resolve() / 'templates'
+        if carpeta.is_relative_to(base) and carpeta.is_dir():
+            directorios.append(carpeta)
+    return directorios
+
+
+def nombres_plantillas(motor):
+    nombres = set()
+    for directorio in directorios_plantillas(motor):
+        nombres.update(
+            ruta.relative_to(directorio).as_posix()
+            for ruta in directorio.rglob('*.html') if ruta.is_file()
+        )
+    return sorted(nombres)
+
+
+def precompilar_plantillas():
+    """
+    Compila todas las plantillas del proyecto con cada motor de Django. Con el
+    cargador en caché quedan guardadas para el resto del proceso.
+
+    Retorna (compiladas, errores) con errores = [(nombre, mensaje)].
+    """
+    compiladas = 0
+    errores = []
+    for motor in engines.all():
+        if not isinstance(motor, DjangoTemplates):
+            continue
+        for nombre in nombres_plantillas(motor):
+            try:
+                motor.get_template(nombre)
+            except TemplateSyntaxError as error:
+                errores.append((nombre, str(error)))
+            else:
+                compiladas += 1
+    return compiladas, errores
+
+
+def preparar():
+    """Compila las plantillas, carga las rutas y el manifiesto de estáticos"""
+    inicio = time.perf_counter()
+    compiladas, errores = precompilar_plantillas()
+    if errores:
+        raise ImproperlyConfigured(
+            'Plantillas con errores: ' + '; '.join(f'{nombre}: {mensaje}' for nombre, mensaje in errores)
+        )
+    # Índice de nombres que usan reverse() y {% url %}
+    get_resolver().reverse_dict
+    # Con ManifestStaticFilesStorage la primera llamada lee staticfiles.json; sin
+    # collectstatic todas las páginas fallarían, así que tampoco se arranca
+    try:
+        staticfiles_storage.url(HOJA_COMPARTIDA)
+    except ValueError as error:
+        raise ImproperlyConfigured(
+            f'{HOJA_COMPARTIDA} no está en el manifiesto de estáticos; ejecute collectstatic'
+        ) from error
+    logger.info('Proceso preparado: %d plantillas compiladas en %.0f ms',
+                compiladas, (time.perf_counter() - inicio) * 1000)
+    return compiladas
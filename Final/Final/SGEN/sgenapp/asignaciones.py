@@ -0,0 +1,146 @@
+"""
+Asignación de profesores (MateriaGrupo) en bloque.
+
+Recibe una matriz de (materia, grupo, profesor), ya sea por IDs desde el
+formulario de varias filas o por referencias legibles desde un CSV o XLSX
+(leído con archivos.leer_filas), resuelve todas las referencias con una
+consulta por tabla y crea o actualiza los MateriaGrupo con un solo
+bulk_create(update_conflicts=True) dentro de una transacción. Si alguna fila
+tiene errores no se aplica ninguna.
+
+Columnas del archivo (con encabezado; el orden no importa):
+    materia   código de la materia
+    grupo     nombre del grupo
+    periodo   nombre del período académico del grupo
+    profesor  documento o username del profesor
+"""
+
+from django.db import transaction
+from django.db.models import Q
+
+from .archivos import ArchivoError, leer_filas
+from .models import Grupo, Materia, MateriaGrupo, Usuario
+from .portal_estudiante import invalidar_portales
+
+COLUMNAS = ('materia', 'grupo', 'periodo', 'profesor')
+
+
+class AsignacionError(Exception):
+    """El archivo o las filas enviadas no se pueden procesar"""
+
+
+def leer_archivo(archivo, nombre):
+    """Lee el CSV o XLSX subido con leer_filas y retorna [(linea, {columna: valor})]"""
+    try:
+        return [
+            (numero, {columna: fila.get(columna, '') for columna in COLUMNAS})
+            for numero, fila in leer_filas(archivo, nombre, COLUMNAS)
+        ]
+    except ArchivoError as error:
+        raise AsignacionError(str(error))
+
+
+def resolver_archivo(filas):
+    """
+    Convierte las filas del archivo en [(linea, materia, grupo, profesor)].
+    Retorna (asignaciones, errores) con errores = [(linea, mensaje)].
+    """
+    codigos = {fila['materia'] for _, fila in filas}
+    periodos = {fila['periodo'] for _, fila in filas}
+    nombres_grupo = {fila['grupo'] for _, fila in filas}
+    referencias = {fila['profesor'] for _, fila in filas}
+
+    materias = {m.codigo: m for m in Materia.objects.filter(codigo__in=codigos)}
+    grupos = {
+        (g.nombre, g.periodo.nombre): g
+        for g in Grupo.objects.filter(nombre__in=nombres_grupo, periodo__nombre__in=periodos).select_related('periodo')
+    }
+    profesores = {}
+    for p in Usuario.objects.filter(Q(documento__in=referencias) | Q(username__in=referencias), rol='2'):
+        profesores[p.documento] = p
+        profesores[p.username] = p
+
+    asignaciones, errores = [], []
+    for linea, fila in filas:
+        materia = materias.get(fila['materia'])
+        grupo = grupos.get((fila['grupo'], fila['periodo']))
+        profesor = profesores.get(fila['profesor'])
+        problemas = []
+        if materia is None:
+            problemas.append(f"materia '{fila['materia']}' no existe")
+        if grupo is None:
+            problemas.append(f"grupo '{fila['grupo']}' no existe en el período '{fila['periodo']}'")
+        if profesor is None:
+            problemas.append(f"profesor '{fila['profesor']}' no existe")
+        if problemas:
+            errores.append((linea, '; '.join(problemas)))
+        else:
+            asignaciones.append((linea, materia, grupo, profesor))
+    return asignaciones, errores
+
+
+def resolver_ids(filas):
+    """
+    Igual que resolver_archivo pero para el formulario: filas = [(linea, materia_id, grupo_id, profesor_id)].
+    """
+    def enteros(posicion):
+        return {int(f[posicion]) for f in filas if str(f[posicion]).isdigit()}
+
+    materias = Materia.objects.in_bulk(enteros(1))
+    grupos = Grupo.objects.select_related('periodo').in_bulk(enteros(2))
+    profesores = Usuario.objects.filter(rol='2').in_bulk(enteros(3))
+
+    asignaciones, errores = [], []
+    for linea, materia_id, grupo_id, profesor_id in filas:
+        materia = materias.get(int(materia_id)) if str(materia_id).isdigit() else None
+        grupo = grupos.get(int(grupo_id)) if str(grupo_id).isdigit() else None
+        profesor = profesores.get(int(profesor_id)) if str(profesor_id).isdigit() else None
+        if materia is None or grupo is None or profesor is None:
+            errores.append((linea, 'seleccione materia, grupo y profesor válidos'))
+        else:
+            asignaciones.append((linea, materia, grupo, profesor))
+    return asignaciones, errores
+
+
+def aplicar_asignaciones(asignaciones):
+    """
+    Crea o actualiza los MateriaGrupo de `asignaciones` en una transacción.
+
+    Lanza AsignacionError si una misma (materia, grupo) aparece dos veces.
+    Retorna (creadas, actualizadas, sin_cambios).
+    """
+    vistas = {}
+    for linea, materia, grupo, _ in asignaciones:
+        clave = (materia.pk, grupo.pk)
+        if clave in vistas:
+            raise AsignacionError(
+                f'{materia.codigo} en {grupo.nombre} ({grupo.periodo.nombre}) aparece en las filas '
+                f'{vistas[clave]} y {linea}.'
+            )
+        vistas[clave] = linea
+
+    with transaction.atomic():
+        actuales = {
+            (materia_id, grupo_id): profesor_id
+            for materia_id, grupo_id, profesor_id in MateriaGrupo.objects.select_for_update().filter(
+                materia_id__in={m.pk for _, m, _, _ in asignaciones},
+                grupo_id__in={g.pk for _, _, g, _ in asignaciones},
+            ).values_list('materia_id', 'grupo_id', 'profesor_id')
+        }
+        pendientes = [
+            MateriaGrupo(materia=materia, grupo=grupo, profesor=profesor)
+            for _, materia, grupo, profesor in asignaciones
+            if actuales.get((materia.pk, grupo.pk), object()) != profesor.pk
+        ]
+        if pendientes:
+            MateriaGrupo.objects.bulk_create(
+                pendientes,
+                update_conflicts=True,
+                unique_fields=['materia', 'grupo'],
+                update_fields=['profesor'],
+            )
+            invalidar_portales()
+
+    creadas = sum(1 for mg in pendientes if (mg.materia_id, mg.grupo_id) not in actuales)
+    actualizadas = len(pendientes) - creadas
+    return creadas, actualizadas, len(asignaciones) - len(pendientes)
@@ -0,0 +1,142 @@
+"""
+Servicio de auditoría: punto único para registrar HistorialAcciones.
+
+Las vistas llaman a registrar_accion(request, accion, descripcion). En modo
+'asincrono' las entradas se acumulan en memoria y un hilo en segundo plano las
+escribe con bulk_create cuando se alcanza el tamaño de lote, cuando vence el
+intervalo o cuando termina la petición (AuditoriaMiddleware). En modo
+'sincrono' cada entrada se escribe en el momento; es el modo para pruebas.
+
+Configuración en settings.AUDITORIA:
+    MODO: 'asincrono' o 'sincrono'
+    TAMANO_LOTE: entradas que disparan una escritura inmediata
+    INTERVALO: segundos máximos que una entrada espera en memoria
+
+Nota: fecha_hora es auto_now_add, así que en modo asíncrono registra el
+momento de la escritura (a lo sumo INTERVALO segundos después de la acción).
+"""
+
+import atexit
+import ipaddress
+import logging
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection
+
+from .models import HistorialAcciones
+
+logger = logging.getLogger(__name__)
+
+CONFIGURACION_POR_DEFECTO = {
+    'MODO': 'asincrono',
+    'TAMANO_LOTE': 100,
+    'INTERVALO': 2.0,
+}
+
+
+def configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'AUDITORIA', {})}
+
+
+def obtener_ip(request):
+    """IP del cliente según REMOTE_ADDR (None si no es una IP válida)"""
+    ip = request.META.get('REMOTE_ADDR') or None
+    if ip and not _es_ip(ip):
+        return None
+    return ip
+
+
+def _es_ip(valor):
+    try:
+        ipaddress.ip_address(valor)
+        return True
+    except ValueError:
+        return False
+
+
+class EscritorAuditoria:
+    """Acumula entradas de auditoría y las escribe por lotes desde un hilo"""
+
+    def __init__(self):
+        self._pendientes = []
+        self._condicion = threading.Condition()
+        self._hilo = None
+        self._vaciar_ya = False
+
+    def agregar(self, entrada):
+        config = configuracion()
+        with self._condicion:
+            self._pendientes.append(entrada)
+            self._iniciar_hilo()
+            if len(self._pendientes) >= config['TAMANO_LOTE']:
+                self._vaciar_ya = True
+                self._condicion.notify()
+
+    def programar_vaciado(self):
+        """Pide al hilo que escriba lo pendiente sin bloquear la petición"""
+        with self._condicion:
+            if self._pendientes:
+                self._vaciar_ya = True
+                self._condicion.notify()
+
+    def vaciar(self):
+        """Escribe de inmediato, en el hilo actual, todas las entradas pendientes"""
+        with self._condicion:
+            lote, self._pendientes = self._pendientes, []
+            self._vaciar_ya = False
+        _escribir(lote)
+
+    def _iniciar_hilo(self):
+        if self._hilo is None or not self._hilo.is_alive():
+            self._hilo = threading.Thread(target=self._ciclo, name='auditoria', daemon=True)
+            self._hilo.start()
+
+    def _ciclo(self):
+        while True:
+            with self._condicion:
+                if not self._vaciar_ya:
+                    self._condicion.wait(timeout=configuracion()['INTERVALO'])
+                lote, self._pendientes = self._pendientes, []
+                self._vaciar_ya = False
+            if lote:
+                close_old_connections()
+                try:
+                    _escribir(lote)
+                finally:
+                    connection.close()
+
+
+def _escribir(lote):
+    if not lote:
+        return
+    try:
+        HistorialAcciones.objects.bulk_create(lote)
+    except IntegrityError:
+        # Alguna entrada apunta a un usuario ya eliminado: guardar las demás
+        for entrada in lote:
+            try:
+                entrada.save()
+            except IntegrityError:
+                logger.warning('Entrada de auditoría descartada: %s', entrada.accion)
+    except Exception:
+        logger.exception('No se pudieron escribir %d entradas de auditoría', len(lote))
+
+
+escritor = EscritorAuditoria()
+atexit.register(escritor.vaciar)
+
+
+def registrar_accion(request, accion, descripcion=''):
+    """Registra una acción del usuario autenticado en el historial"""
+    entrada = HistorialAcciones(
+        usuario_id=request.user.pk,
+        accion=accion,
+        descripcion=descripcion,
+        ip_address=obtener_ip(request),
+    )
+    if configuracion()['MODO'] == 'sincrono':
+        entrada.save()
+    else:
+        escritor.agregar(entrada)
+    return entrada
@@ -0,0 +1,70 @@
+"""
+Búsqueda de estudiantes para los selectores de inscripción.
+
+La búsqueda es por prefijo sobre documento, username y nombre. El nombre se
+compara contra Usuario.nombre_busqueda (nombre completo sin tildes y en
+casefold, calculado en Python), con la misma normalización aplicada al texto
+buscado: UPPER/LOWER de SQLite sólo cambian letras ASCII.
+
+En SQLite cada prefijo es un rango (>= texto y < texto + U+10FFFF) sobre un
+índice B-tree normal; la intercalación BINARY ordena por punto de código, así
+que el rango es exacto. SQLite sólo combina los tres índices (MULTI-INDEX OR)
+si tiene estadísticas (ANALYZE); sin ellas recorre los estudiantes por
+usuario_rol_documento_idx.
+
+En PostgreSQL el orden depende de la intercalación de la base, así que se usa
+LIKE 'texto%', que resuelven los índices varchar_pattern_ops (*_like) que
+Django crea para estas columnas.
+"""
+
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+
+from .models import EstudianteGrupo, Usuario, normalizar_busqueda
+from .paginacion import paginar_keyset
+
+RESULTADOS_POR_PAGINA = 25
+_MAXIMO = chr(0x10FFFF)
+
+
+def _prefijo(campo, texto):
+    if connection.vendor == 'postgresql':
+        return Q(**{f'{campo}__startswith': texto})
+    return Q(**{f'{campo}__gte': texto, f'{campo}__lt': texto + _MAXIMO})
+
+
+def filtrar_estudiantes(texto='', grupo_id=None):
+    """
+    Estudiantes cuyo documento, username o nombre empieza por `texto`. Con
+    `grupo_id` cada estudiante trae el atributo `inscrito`.
+    """
+    estudiantes = Usuario.objects.filter(rol='3').only(
+        'id_usuario', 'username', 'first_name', 'last_name', 'documento'
+    )
+    texto = (texto or '').strip()
+    if texto:
+        estudiantes = estudiantes.filter(
+            _prefijo('documento', texto)
+            | _prefijo('username', texto)
+            | _prefijo('nombre_busqueda', normalizar_busqueda(texto))
+        )
+    if grupo_id:
+        estudiantes = estudiantes.annotate(inscrito=Exists(
+            EstudianteGrupo.objects.filter(grupo_id=grupo_id, estudiante_id=OuterRef('pk'))
+        ))
+    return estudiantes
+
+
+def buscar_estudiantes(texto='', grupo_id=None, despues=None, tamano=RESULTADOS_POR_PAGINA):
+    """Página de filtrar_estudiantes ordenada por documento"""
+    return paginar_keyset(filtrar_estudiantes(texto, grupo_id), ['documento'], despues=despues, tamano=tamano)
+
+
+def estudiante_a_dict(estudiante):
+    return {
+        'id': estudiante.id_usuario,
+        'nombre': estudiante.first_name or estudiante.username,
+        'username': estudiante.username,
+        'documento': estudiante.documento,
+        'inscrito': getattr(estudiante, 'inscrito', False),
+    }
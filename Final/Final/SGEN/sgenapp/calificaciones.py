@@ -0,0 +1,108 @@
+"""
+Servicio de ingreso masivo de calificaciones.
+
+Guarda la planilla completa de un (materia_grupo, tipo_evaluacion) con un
+número fijo de consultas, sin importar cuántos estudiantes tenga el grupo.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Calificacion, EstudianteGrupo
+from .portal_estudiante import calentar_portales
+from .resumen import actualizar_resumen
+
+NOTA_MINIMA = 0.0
+NOTA_MAXIMA = 5.0
+
+
+def validar_nota(valor):
+    """Convierte la nota enviada a float; lanza ValueError si no es válida"""
+    nota = float(valor)
+    if not NOTA_MINIMA <= nota <= NOTA_MAXIMA:
+        raise ValueError(f'La nota debe estar entre {NOTA_MINIMA} y {NOTA_MAXIMA}')
+    return nota
+
+
+def guardar_calificaciones(materia_grupo, tipo_evaluacion, notas):
+    """
+    Guarda en bloque las notas de una evaluación.
+
+    `notas` es un dict {estudiante_id: (nota, observacion)} con los valores tal
+    como llegan del formulario; observacion=None conserva la observación que
+    ya tenga la calificación. Sólo se consideran estudiantes inscritos en el
+    grupo de la materia. Todas las notas se validan antes de escribir y las
+    válidas se guardan con bulk_create/bulk_update en una sola transacción,
+    junto con la actualización de ResumenCalificacion (bulk_create y
+    bulk_update no disparan las señales de Calificacion). Al confirmar se
+    precalculan los portales de los estudiantes afectados.
+
+    Retorna (notas_guardadas, errores), donde errores es una lista de
+    (estudiante, mensaje) para las notas inválidas.
+    """
+    inscritos = {
+        eg.estudiante_id: eg.estudiante
+        for eg in EstudianteGrupo.objects.filter(
+            grupo_id=materia_grupo.grupo_id,
+            estudiante_id__in=list(notas),
+        ).select_related('estudiante')
+    }
+
+    validas = {}
+    errores = []
+    for estudiante_id, (nota, observacion) in notas.items():
+        estudiante = inscritos.get(estudiante_id)
+        if estudiante is None or nota in (None, ''):
+            continue
+        try:
+            validas[estudiante_id] = (validar_nota(nota), observacion)
+        except ValueError:
+            errores.append((estudiante, f'Nota inválida para estudiante {estudiante.first_name}'))
+
+    if not validas:
+        return 0, errores
+
+    ahora = timezone.now()
+    with transaction.atomic():
+        existentes = {
+            cal.estudiante_id: cal
+            for cal in Calificacion.objects.select_for_update().filter(
+                materia_grupo=materia_grupo,
+                tipo_evaluacion=tipo_evaluacion,
+                estudiante_id__in=list(validas),
+            )
+        }
+
+        nuevas = []
+        actualizadas = []
+        for estudiante_id, (nota, observacion) in validas.items():
+            cal = existentes.get(estudiante_id)
+            if cal is None:
+                nuevas.append(Calificacion(
+                    estudiante_id=estudiante_id,
+                    materia_grupo=materia_grupo,
+                    tipo_evaluacion=tipo_evaluacion,
+                    nota=nota,
+                    observacion=observacion or '',
+                    estado='registrada',
+                ))
+            else:
+                cal.nota = nota
+                if observacion is not None:
+                    cal.observacion = observacion
+                cal.estado = 'registrada'
+                cal.fecha_actualizacion = ahora
+                actualizadas.append(cal)
+
+        if nuevas:
+            Calificacion.objects.bulk_create(nuevas)
+        if actualizadas:
+            Calificacion.objects.bulk_update(
+                actualizadas, ['nota', 'observacion', 'estado', 'fecha_actualizacion']
+            )
+
+        actualizar_resumen(materia_grupo.id, validas)
+        # Los estudiantes consultan sus notas justo después de publicadas
+        calentar_portales(validas)
+
+    return len(validas), errores
@@ -0,0 +1,78 @@
+"""
+Estadísticas del panel de administrador.
+
+Los conteos por rol salen de una sola consulta agrupada y el avance de
+ingreso de notas por período activo de dos consultas más. El resultado se
+guarda en caché; las señales lo invalidan cuando cambian usuarios o períodos
+y el avance de notas se refresca al vencer el tiempo de expiración.
+"""
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Calificacion, MateriaGrupo, PeriodoAcademico, TipoEvaluacion, Usuario
+
+CLAVE_CACHE = 'sgen:dashboard:estadisticas'
+EXPIRACION = 60  # segundos
+
+
+def conteo_por_rol():
+    """{rol: cantidad} en una sola consulta GROUP BY"""
+    return dict(
+        Usuario.objects.order_by().values_list('rol').annotate(total=Count('id_usuario'))
+    )
+
+
+def avance_periodos_activos():
+    """
+    Avance de ingreso de notas por período activo: notas registradas frente a
+    las esperadas (estudiantes inscritos en cada materia-grupo por tipo de
+    evaluación).
+    """
+    periodos = list(PeriodoAcademico.objects.filter(activo=True).values('id', 'nombre'))
+    if not periodos:
+        return []
+
+    tipos = TipoEvaluacion.objects.count()
+    inscripciones = dict(
+        MateriaGrupo.objects.filter(grupo__periodo__activo=True)
+        .order_by().values_list('grupo__periodo_id')
+        .annotate(total=Count('grupo__estudiantegrupo'))
+    )
+    registradas = dict(
+        Calificacion.objects.filter(nota__isnull=False, materia_grupo__grupo__periodo__activo=True)
+        .order_by().values_list('materia_grupo__grupo__periodo_id')
+        .annotate(total=Count('id'))
+    )
+
+    avance = []
+    for periodo in periodos:
+        esperadas = inscripciones.get(periodo['id'], 0) * tipos
+        hechas = registradas.get(periodo['id'], 0)
+        avance.append({
+            'periodo': periodo['nombre'],
+            'esperadas': esperadas,
+            'registradas': hechas,
+            'porcentaje': round(100 * hechas / esperadas, 1) if esperadas else 0,
+        })
+    return avance
+
+
+def calcular_estadisticas():
+    por_rol = conteo_por_rol()
+    return {
+        'total_usuarios': sum(por_rol.values()),
+        'total_administradores': por_rol.get('1', 0),
+        'total_profesores': por_rol.get('2', 0),
+        'total_estudiantes': por_rol.get('3', 0),
+        'avance_periodos': avance_periodos_activos(),
+    }
+
+
+def estadisticas_dashboard():
+    """Estadísticas del panel, desde caché cuando están disponibles"""
+    return cache.get_or_set(CLAVE_CACHE, calcular_estadisticas, EXPIRACION)
+
+
+def invalidar_estadisticas():
+    cache.delete(CLAVE_CACHE)
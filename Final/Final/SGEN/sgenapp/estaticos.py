@@ -0,0 +1,62 @@
+"""
+Archivos estáticos con caché de larga duración.
+
+Los estilos compartidos de las plantillas están en
+static/sgenapp/css/sgen.css y se enlazan con {% static %}. collectstatic los
+copia a STATIC_ROOT con ManifestStaticFilesStorage, que agrega al nombre un
+hash del contenido (css/sgen.3f2a9c81e0b4.css): como el nombre cambia cuando
+cambia el archivo, el navegador puede guardarlo un año sin volver a
+preguntar. Los nombres sin hash se sirven con una expiración corta.
+
+servir() entrega STATIC_ROOT con esos encabezados cuando no hay un servidor
+web delante; si lo hay, debe servir la misma carpeta con las mismas reglas.
+Con DEBUG, runserver sirve los archivos de la app antes de llegar aquí.
+
+Desplegar incluye `python manage.py collectstatic --noinput`: sin él /static/
+responde 404 y, sin el manifiesto, toda página con {% static %} responde 500.
+manifiesto_generado() lo verifica con `python manage.py check --deploy` cuando
+el almacenamiento es ManifestStaticFilesStorage; el arranque (arranque.py) se
+detiene si falta.
+"""
+
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core import checks
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+# ManifestStaticFilesStorage usa los primeros 12 caracteres hexadecimales del MD5
+CON_HUELLA = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+EXPIRACION_CON_HUELLA = 365 * 24 * 60 * 60
+EXPIRACION_SIN_HUELLA = 5 * 60
+
+
+def con_huella(ruta):
+    return bool(CON_HUELLA.search(ruta))
+
+
+def servir(request, ruta):
+    respuesta = serve(request, ruta, document_root=settings.STATIC_ROOT)
+    if con_huella(ruta):
+        patch_cache_control(respuesta, public=True, max_age=EXPIRACION_CON_HUELLA, immutable=True)
+    else:
+        patch_cache_control(respuesta, public=True, max_age=EXPIRACION_SIN_HUELLA)
+    return respuesta
+
+
+# Sólo con --deploy: en una copia nueva collectstatic aún no corrió y un Error
+# bloquearía migrate, makemigrations y runserver. Sin la etiqueta 'staticfiles',
+# que collectstatic sí corre.
+@checks.register('sgenapp', deploy=True)
+def manifiesto_generado(app_configs, **kwargs):
+    if not isinstance(staticfiles_storage, ManifestFilesMixin):
+        return []
+    if staticfiles_storage.exists(staticfiles_storage.manifest_name):
+        return []
+    return [checks.Error(
+        f'No existe {staticfiles_storage.manifest_name} en STATIC_ROOT ({settings.STATIC_ROOT}).',
+        hint='Ejecute python manage.py collectstatic --noinput, o use SGEN_ESTATICOS=simple en desarrollo.',
+        id='sgenapp.E001',
+    )]
@@ -0,0 +1,65 @@
+"""
+Fragmentos de plantilla en caché.
+
+Las barras de navegación y las listas de selección de períodos, grupos,
+materias y profesores se repiten en varias páginas y casi nunca cambian. Las
+plantillas los guardan con {% cache %} en el alias 'fragmentos':
+
+    {% load cache %}
+    {% cache expiracion_fragmentos opciones_periodos version_fragmentos using="fragmentos" %}
+        ...
+    {% endcache %}
+
+El procesador de contexto fragmentos() agrega expiracion_fragmentos y
+version_fragmentos. La versión es un valor en caché que cambia con las mismas
+señales que invalidan los portales de los estudiantes (materias, grupos,
+períodos, profesores, tipos de evaluación), así que los fragmentos anteriores
+dejan de usarse todos a la vez. Los querysets se evalúan al recorrerlos en la
+plantilla: con el fragmento en caché la vista no consulta esas listas.
+
+Dentro de un fragmento no van {% csrf_token %} ni datos del usuario: la
+misma copia se sirve a todos.
+
+Configuración en settings.FRAGMENTOS:
+    EXPIRACION: segundos que vive cada fragmento
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+
+ALIAS = 'fragmentos'
+CLAVE_VERSION = 'sgen:fragmentos:version'
+
+CONFIGURACION_POR_DEFECTO = {
+    'EXPIRACION': 60 * 60,
+}
+
+
+def configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'FRAGMENTOS', {})}
+
+
+def version_actual():
+    cache = caches[ALIAS]
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(CLAVE_VERSION, version, None):
+            version = cache.get(CLAVE_VERSION)
+    return version
+
+
+def invalidar_fragmentos():
+    transaction.on_commit(lambda: caches[ALIAS].set(CLAVE_VERSION, uuid.uuid4().hex, None))
+
+
+def fragmentos(request):
+    """Procesador de contexto; la versión sólo se lee si la plantilla tiene un fragmento"""
+    return {
+        'expiracion_fragmentos': configuracion()['EXPIRACION'],
+        'version_fragmentos': SimpleLazyObject(version_actual),
+    }
@@ -0,0 +1,107 @@
+"""
+Consultas del historial de acciones (auditoría).
+
+Los filtros por fecha, acción y usuario se resuelven con los índices
+compuestos de HistorialAcciones. La búsqueda libre es por prefijos de palabra,
+todas las palabras a la vez (AND):
+
+    SQLite      tabla FTS5 sgenapp_historialacciones_fts sobre acción,
+                descripción y username, sin tildes. Los triggers de las
+                migraciones 0007, 0010 y 0011 la mantienen al día con el
+                historial y con el username actual de cada usuario.
+    PostgreSQL  índice GIN historial_texto_gin (migración 0012) sobre
+                to_tsvector('simple', accion || ' ' || descripcion); el
+                username se busca aparte en sgenapp_usuario (se recorre, es
+                mucho más chica que el historial) y sus acciones por el
+                índice historial_usuario_fecha_idx. Distingue tildes
+                (la extensión unaccent no se puede suponer instalada) y todas
+                las palabras deben estar en el texto de la acción o todas en
+                el username.
+"""
+
+import re
+from datetime import datetime, time, timedelta
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import HistorialAcciones
+
+TABLA_FTS = 'sgenapp_historialacciones_fts'
+
+
+def _consulta_fts(texto):
+    """Convierte el texto del usuario en una consulta FTS5 por prefijos (AND)"""
+    palabras = re.findall(r'\w+', texto)
+    return ' '.join(f'"{palabra}"*' for palabra in palabras)
+
+
+def _consulta_tsquery(texto):
+    """Lo mismo que _consulta_fts para to_tsquery de PostgreSQL"""
+    return ' & '.join(f'{palabra}:*' for palabra in re.findall(r'\w+', texto))
+
+
+def buscar_texto(acciones, texto):
+    """Filtra el historial por texto libre en acción, descripción y usuario"""
+    if connection.vendor == 'sqlite':
+        consulta = _consulta_fts(texto)
+        if not consulta:
+            return acciones
+        return acciones.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {TABLA_FTS} WHERE {TABLA_FTS} MATCH %s', (consulta,)
+        ))
+    consulta = _consulta_tsquery(texto)
+    if not consulta:
+        return acciones
+    # Un solo id IN (...) para que el planificador lo resuelva como semi-join con
+    # índices; la expresión to_tsvector debe ser idéntica a la de historial_texto_gin
+    return acciones.filter(id__in=RawSQL(
+        "SELECT id FROM sgenapp_historialacciones "
+        "WHERE to_tsvector('simple', accion || ' ' || descripcion) @@ to_tsquery('simple', %s) "
+        "UNION "
+        "SELECT h.id FROM sgenapp_historialacciones h "
+        "JOIN sgenapp_usuario u ON u.id_usuario = h.usuario_id "
+        "WHERE to_tsvector('simple', u.username) @@ to_tsquery('simple', %s)",
+        (consulta, consulta),
+    ))
+
+
+def _inicio_del_dia(valor, dias=0):
+    """Inicio del día 'AAAA-MM-DD' (más `dias`); None si la fecha no existe o se sale del rango"""
+    try:
+        fecha = parse_date(valor) if valor else None
+        if fecha is None:
+            return None
+        return timezone.make_aware(datetime.combine(fecha + timedelta(days=dias), time.min))
+    except (ValueError, OverflowError):
+        return None
+
+
+def filtrar_historial(acciones, q=None, accion=None, usuario=None, desde=None, hasta=None):
+    """
+    Aplica los filtros del panel de historial. Las fechas son 'AAAA-MM-DD' y
+    el rango es inclusivo; se comparan contra fecha_hora sin funciones para
+    que el motor pueda usar los índices. Una fecha inválida o fuera de rango
+    (2024-02-30, 9999-12-31 como límite final) se ignora.
+    """
+    if accion:
+        acciones = acciones.filter(accion=accion)
+    if usuario:
+        acciones = acciones.filter(usuario__username=usuario)
+    inicio = _inicio_del_dia(desde)
+    if inicio:
+        acciones = acciones.filter(fecha_hora__gte=inicio)
+    fin = _inicio_del_dia(hasta, dias=1)
+    if fin:
+        acciones = acciones.filter(fecha_hora__lt=fin)
+    if q:
+        acciones = buscar_texto(acciones, q)
+    return acciones
+
+
+def tipos_de_accion():
+    """Acciones distintas registradas (resuelto sobre el índice por acción)"""
+    return HistorialAcciones.objects.order_by('accion').values_list('accion', flat=True).distinct()
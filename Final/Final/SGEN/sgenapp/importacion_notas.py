@@ -0,0 +1,119 @@
+"""
+Carga de las notas de una evaluación desde una hoja de cálculo.
+
+El profesor sube un CSV o XLSX con las notas de un (materia_grupo,
+tipo_evaluacion). El archivo se lee fila por fila con archivos.leer_filas, los estudiantes se buscan por documento entre los
+inscritos del grupo con una sola consulta y se compara cada nota con la que ya
+está guardada para mostrar una vista previa. Al confirmar, las notas que
+cambian se guardan con guardar_calificaciones (bulk_create/bulk_update y
+resumen en una transacción).
+
+Columnas (con encabezado; el orden no importa):
+    documento   documento del estudiante
+    nota        0 a 5, acepta coma decimal; vacía = no se modifica
+    observacion opcional; vacía conserva la observación actual
+"""
+
+from .archivos import ArchivoError, leer_filas
+from .calificaciones import guardar_calificaciones, validar_nota
+from .models import Calificacion, EstudianteGrupo
+
+COLUMNAS = ('documento', 'nota')
+# Ningún grupo se acerca a esto; evita cargar en memoria (y en la sesión) un archivo equivocado
+MAXIMO_FILAS = 5000
+
+
+def leer_notas(archivo, nombre):
+    """Genera (linea, documento, nota, observacion) con la nota aún como texto"""
+    for numero, (linea, fila) in enumerate(leer_filas(archivo, nombre, COLUMNAS), start=1):
+        if numero > MAXIMO_FILAS:
+            raise ArchivoError(f'El archivo tiene más de {MAXIMO_FILAS} filas.')
+        yield linea, fila.get('documento', ''), fila.get('nota', ''), fila.get('observacion') or None
+
+
+def previsualizar(materia_grupo, tipo_evaluacion, filas):
+    """
+    Compara las filas del archivo con las calificaciones guardadas.
+
+    Retorna (cambios, errores): cambios es una lista de dicts con el estudiante,
+    la nota y observación actuales y nuevas y la acción ('nueva', 'modificada'
+    o 'sin_cambios'); errores es una lista de (linea, documento, mensaje).
+    """
+    leidas = []
+    errores = []
+    vistos = set()
+    for linea, documento, nota, observacion in filas:
+        if not documento:
+            errores.append((linea, '', 'documento vacío'))
+            continue
+        if documento in vistos:
+            errores.append((linea, documento, 'documento repetido en el archivo'))
+            continue
+        vistos.add(documento)
+        if not nota:
+            continue
+        try:
+            leidas.append((linea, documento, validar_nota(nota.replace(',', '.')), observacion))
+        except ValueError:
+            errores.append((linea, documento, f"nota inválida '{nota}'"))
+
+    inscritos = {
+        documento: (estudiante_id, nombre)
+        for estudiante_id, documento, nombre in EstudianteGrupo.objects.filter(
+            grupo_id=materia_grupo.grupo_id,
+            estudiante__documento__in=[documento for _, documento, _, _ in leidas],
+        ).values_list('estudiante_id', 'estudiante__documento', 'estudiante__first_name')
+    }
+    actuales = {
+        estudiante_id: (nota, observacion)
+        for estudiante_id, nota, observacion in Calificacion.objects.filter(
+            materia_grupo=materia_grupo,
+            tipo_evaluacion=tipo_evaluacion,
+            estudiante_id__in=[estudiante_id for estudiante_id, _ in inscritos.values()],
+        ).values_list('estudiante_id', 'nota', 'observacion')
+    }
+
+    cambios = []
+    for linea, documento, nota, observacion in leidas:
+        if documento not in inscritos:
+            errores.append((linea, documento, 'el estudiante no está inscrito en el grupo'))
+            continue
+        estudiante_id, nombre = inscritos[documento]
+        if estudiante_id not in actuales:
+            accion = 'nueva'
+            nota_anterior, observacion_anterior = None, ''
+        else:
+            nota_anterior, observacion_anterior = actuales[estudiante_id]
+            sin_cambios = nota == nota_anterior and observacion in (None, observacion_anterior)
+            accion = 'sin_cambios' if sin_cambios else 'modificada'
+        cambios.append({
+            'linea': linea,
+            'documento': documento,
+            'nombre': nombre,
+            'estudiante_id': estudiante_id,
+            'nota_anterior': nota_anterior,
+            'nota': nota,
+            'observacion_anterior': observacion_anterior,
+            'observacion': observacion,
+            'accion': accion,
+        })
+
+    errores.sort(key=lambda error: error[0] or 0)
+    return cambios, errores
+
+
+def pendientes(cambios):
+    """Lo que hay que guardar de una vista previa, en forma serializable para la sesión"""
+    return [
+        [cambio['estudiante_id'], cambio['nota'], cambio['observacion']]
+        for cambio in cambios if cambio['accion'] != 'sin_cambios'
+    ]
+
+
+def aplicar_importacion(materia_grupo, tipo_evaluacion, notas):
+    """Guarda las notas de pendientes(); retorna lo mismo que guardar_calificaciones"""
+    return guardar_calificaciones(
+        materia_grupo,
+        tipo_evaluacion,
+        {estudiante_id: (nota, observacion) for estudiante_id, nota, observacion in notas},
+    )
@@ -0,0 +1,197 @@
+"""
+Importación masiva de usuarios desde CSV o XLSX.
+
+El archivo se lee fila por fila y se procesa en lotes: cada lote valida sus
+filas, consulta de una vez qué documentos ya existen, calcula los hashes de
+contraseña en un pool de procesos (es la parte costosa) y crea usuarios y
+perfiles con bulk_create en su propia transacción. Una fila inválida se
+reporta con su número de línea y no detiene la importación.
+
+Columnas (con encabezado; el orden no importa):
+    nombre, documento, correo, rol (1/2/3 o administrador/profesor/estudiante)
+    contrasena (opcional si se indica una contraseña inicial para todo el archivo)
+
+El archivo se lee con archivos.leer_filas (XLSX requiere openpyxl).
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .archivos import ArchivoError, leer_filas
+from .estadisticas import invalidar_estadisticas
+from .fragmentos import invalidar_fragmentos
+from .models import Admin, Estudiante, Profesor, Usuario
+from .portal_estudiante import invalidar_portales
+
+TAMANO_LOTE = 1000
+# Con menos filas que esto el pool de procesos cuesta más de lo que ahorra
+MINIMO_PARA_POOL = 50
+
+COLUMNAS = ('nombre', 'documento', 'correo', 'rol')
+ROLES = {
+    '1': '1', 'administrador': '1', 'admin': '1',
+    '2': '2', 'profesor': '2',
+    '3': '3', 'estudiante': '3',
+}
+PERFILES = {'1': Admin, '2': Profesor, '3': Estudiante}
+LARGO_DOCUMENTO = Usuario._meta.get_field('documento').max_length
+
+
+class Importador:
+    """Procesa las filas por lotes; usar como context manager para cerrar el pool"""
+
+    def __init__(self, contrasena_inicial='', procesos=None, tamano_lote=TAMANO_LOTE):
+        self.contrasena_inicial = contrasena_inicial
+        self.procesos = procesos or min(4, os.cpu_count() or 1)
+        self.tamano_lote = tamano_lote
+        self.vistos = set()
+        self.creados = 0
+        self.errores = []
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.shutdown()
+        # bulk_create no envía post_save: se invalida lo que invalidan las señales de Usuario
+        if self.creados:
+            invalidar_estadisticas()
+            invalidar_fragmentos()
+            invalidar_portales()
+
+    def importar(self, filas):
+        lote = []
+        leidas = 0
+        try:
+            for fila in filas:
+                leidas += 1
+                lote.append(fila)
+                if len(lote) >= self.tamano_lote:
+                    self._procesar_lote(lote)
+                    lote = []
+        except ArchivoError as error:
+            if not leidas:
+                raise
+            # Los lotes anteriores ya se guardaron: se reporta dónde se cortó la lectura
+            self._error(lote[-1][0] + 1 if lote else None, '', f'Lectura interrumpida: {error}')
+        if lote:
+            self._procesar_lote(lote)
+        return self.creados, self.errores
+
+    def _error(self, linea, documento, mensaje):
+        self.errores.append((linea, documento, mensaje))
+
+    def _validar(self, linea, fila):
+        documento = fila.get('documento', '')
+        nombre = fila.get('nombre', '')
+        correo = fila.get('correo', '')
+        rol = ROLES.get(fila.get('rol', '').lower())
+        contrasena = fila.get('contrasena') or self.contrasena_inicial
+
+        problemas = []
+        if not documento:
+            problemas.append('documento vacío')
+        elif len(documento) > LARGO_DOCUMENTO:
+            problemas.append(f'documento de más de {LARGO_DOCUMENTO} caracteres')
+        elif documento in self.vistos:
+            problemas.append('documento repetido en el archivo')
+        if not nombre:
+            problemas.append('nombre vacío')
+        try:
+            validate_email(correo)
+        except ValidationError:
+            problemas.append(f"correo inválido '{correo}'")
+        if rol is None:
+            problemas.append(f"rol inválido '{fila.get('rol', '')}'")
+        if not contrasena:
+            problemas.append('sin contraseña')
+
+        if documento:
+            self.vistos.add(documento)
+        if problemas:
+            self._error(linea, documento, '; '.join(problemas))
+            return None
+        return linea, Usuario(
+            username=documento, documento=documento, first_name=nombre, email=correo, rol=rol,
+            password=contrasena,
+        )
+
+    def _hashear(self, contrasenas):
+        if len(contrasenas) < MINIMO_PARA_POOL or self.procesos == 1:
+            return [make_password(c) for c in contrasenas]
+        if self._pool is None:
+            # 'spawn' y no 'fork': el proceso del servidor ya tiene hilos vivos (auditoría,
+            # precarga de caché) y un fork copiaría sus locks en el estado en que estén.
+            # El hijo arranca sin Django configurado; el inicializador es django.setup y no
+            # una función de este módulo porque importarlo carga los modelos.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.procesos,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+        tamano = max(1, len(contrasenas) // (self.procesos * 4))
+        return list(self._pool.map(make_password, contrasenas, chunksize=tamano))
+
+    def _procesar_lote(self, lote):
+        validos = [v for v in (self._validar(linea, fila) for linea, fila in lote) if v]
+        if not validos:
+            return
+
+        documentos = [u.documento for _, u in validos]
+        existentes = set()
+        for documento, username in Usuario.objects.filter(
+            Q(documento__in=documentos) | Q(username__in=documentos)
+        ).values_list('documento', 'username'):
+            existentes.update((documento, username))
+        nuevos = []
+        for linea, usuario in validos:
+            if usuario.documento in existentes:
+                self._error(linea, usuario.documento, 'ya existe un usuario con ese documento')
+            else:
+                nuevos.append((linea, usuario))
+        if not nuevos:
+            return
+
+        for (_, usuario), hash_ in zip(nuevos, self._hashear([u.password for _, u in nuevos])):
+            usuario.password = hash_
+
+        try:
+            with transaction.atomic():
+                self._crear([u for _, u in nuevos])
+            self.creados += len(nuevos)
+        except IntegrityError:
+            # Otro proceso creó alguno de estos documentos entre la consulta y el insert
+            for linea, usuario in nuevos:
+                try:
+                    with transaction.atomic():
+                        self._crear([usuario])
+                    self.creados += 1
+                except IntegrityError:
+                    self._error(linea, usuario.documento, 'ya existe un usuario con ese documento')
+
+    def _crear(self, usuarios):
+        Usuario.objects.bulk_create(usuarios)
+        for rol, perfil in PERFILES.items():
+            perfiles = [perfil(usuario=u) for u in usuarios if u.rol == rol]
+            if perfiles:
+                perfil.objects.bulk_create(perfiles)
+
+
+def importar_usuarios(archivo, nombre, contrasena_inicial='', procesos=None):
+    """
+    Importa el archivo subido. Retorna (creados, errores) con
+    errores = [(linea, documento, mensaje)]. Lanza ArchivoError si el
+    archivo no se puede leer.
+    """
+    with Importador(contrasena_inicial, procesos) as importador:
+        return importador.importar(leer_filas(archivo, nombre, COLUMNAS))
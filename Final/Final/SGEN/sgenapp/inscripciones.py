@@ -0,0 +1,69 @@
+"""
+Sincronización de inscripciones (EstudianteGrupo) por conjuntos.
+
+Recibe el conjunto deseado de estudiantes de un grupo, lo compara con el
+actual y aplica la diferencia con un número fijo de consultas: validación en
+bloque, bulk_create para las altas y un solo DELETE para las bajas, todo en
+una transacción. También hace cumplir Grupo.capacidad.
+"""
+
+from django.db import transaction
+
+from .models import EstudianteGrupo, Grupo, Usuario
+from .portal_estudiante import invalidar_portal
+
+
+class InscripcionError(Exception):
+    """La sincronización no se aplicó (datos inválidos o capacidad excedida)"""
+
+
+def parsear_ids(valores):
+    """Convierte los IDs enviados por el formulario en un conjunto de enteros"""
+    try:
+        return {int(valor) for valor in valores}
+    except (TypeError, ValueError):
+        raise InscripcionError('La selección de estudiantes no es válida.')
+
+
+def sincronizar_inscripciones(grupo, estudiante_ids):
+    """
+    Deja inscritos en `grupo` exactamente a los estudiantes de `estudiante_ids`.
+
+    Retorna (agregados, eliminados). Lanza InscripcionError sin modificar nada
+    si algún ID no es un estudiante o si se supera la capacidad del grupo.
+    """
+    deseados = set(estudiante_ids)
+
+    validos = set(
+        Usuario.objects.filter(id_usuario__in=deseados, rol='3').values_list('id_usuario', flat=True)
+    )
+    invalidos = deseados - validos
+    if invalidos:
+        raise InscripcionError(
+            f'IDs que no corresponden a estudiantes: {", ".join(map(str, sorted(invalidos)))}'
+        )
+
+    with transaction.atomic():
+        grupo = Grupo.objects.select_for_update().get(pk=grupo.pk)
+        if len(deseados) > grupo.capacidad:
+            raise InscripcionError(
+                f'El grupo {grupo.nombre} tiene capacidad para {grupo.capacidad} estudiantes '
+                f'({len(deseados)} seleccionados).'
+            )
+
+        actuales = set(
+            EstudianteGrupo.objects.filter(grupo=grupo).values_list('estudiante_id', flat=True)
+        )
+        nuevos = deseados - actuales
+        sobrantes = actuales - deseados
+
+        if sobrantes:
+            EstudianteGrupo.objects.filter(grupo=grupo, estudiante_id__in=sobrantes).delete()
+        if nuevos:
+            EstudianteGrupo.objects.bulk_create(
+                [EstudianteGrupo(estudiante_id=est_id, grupo=grupo) for est_id in nuevos],
+                ignore_conflicts=True,
+            )
+        invalidar_portal(nuevos | sobrantes)
+
+    return len(nuevos), len(sobrantes)
@@ -0,0 +1,270 @@
+"""
+Genera una institución sintética para pruebas de carga.
+
+Ejemplo (aprox. 1.000.000 de calificaciones):
+    python manage.py generar_datos --periodos 2 --grupos 100 --estudiantes 20000 \
+        --materias 40 --materias-por-grupo 5 --tipos 5 --profesores 200
+"""
+
+import random
+import time
+from datetime import date
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from sgenapp.estadisticas import invalidar_estadisticas
+from sgenapp.fragmentos import invalidar_fragmentos
+from sgenapp.models import (
+    Usuario, Admin, Profesor, Estudiante, PeriodoAcademico, Grupo, Materia, MateriaGrupo,
+    EstudianteGrupo, TipoEvaluacion, Calificacion
+)
+from sgenapp.portal_estudiante import invalidar_portales
+from sgenapp.resumen import reconstruir_resumen
+
+# Opciones que deben ser al menos 1 (las demás cantidades admiten 0)
+POSITIVAS = ('periodos', 'grupos', 'materias', 'materias_por_grupo', 'tipos', 'lote')
+NO_NEGATIVAS = ('administradores', 'profesores', 'estudiantes')
+
+
+def en_lotes(objetos, tamano):
+    """Agrupa un iterable en listas de `tamano` elementos"""
+    lote = []
+    for obj in objetos:
+        lote.append(obj)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+class Command(BaseCommand):
+    help = 'Genera períodos, grupos, materias, usuarios, inscripciones y calificaciones con bulk_create'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--periodos', type=int, default=1)
+        parser.add_argument('--grupos', type=int, default=10, help='Grupos por período')
+        parser.add_argument('--materias', type=int, default=10)
+        parser.add_argument('--materias-por-grupo', type=int, default=5)
+        parser.add_argument('--administradores', type=int, default=1)
+        parser.add_argument('--profesores', type=int, default=20)
+        parser.add_argument('--estudiantes', type=int, default=300,
+                            help='Cada estudiante se inscribe en un grupo de cada período')
+        parser.add_argument('--tipos', type=int, default=3, help='Tipos de evaluación (suman 100%%)')
+        parser.add_argument('--completitud', type=float, default=1.0,
+                            help='Fracción de calificaciones con nota registrada (0 a 1)')
+        parser.add_argument('--semilla', type=int, default=2025)
+        parser.add_argument('--lote', type=int, default=5000, help='Filas por bulk_create')
+        parser.add_argument('--prefijo', default='gen', help='Prefijo de usernames, documentos y códigos')
+        parser.add_argument('--contrasena', default='sgen12345', help='Contraseña común de los usuarios generados')
+        parser.add_argument('--sin-resumen', action='store_true', help='No reconstruir ResumenCalificacion')
+
+    def handle(self, *args, **opciones):
+        for nombre in POSITIVAS:
+            if opciones[nombre] < 1:
+                raise CommandError(f"--{nombre.replace('_', '-')} debe ser al menos 1")
+        for nombre in NO_NEGATIVAS:
+            if opciones[nombre] < 0:
+                raise CommandError(f"--{nombre.replace('_', '-')} no puede ser negativo")
+        if opciones['materias_por_grupo'] > opciones['materias']:
+            raise CommandError('--materias-por-grupo no puede superar --materias')
+        if not 0 <= opciones['completitud'] <= 1:
+            raise CommandError('--completitud debe estar entre 0 y 1')
+        if Usuario.objects.filter(username__startswith=f"{opciones['prefijo']}-").exists():
+            raise CommandError(f"Ya existen datos con el prefijo '{opciones['prefijo']}'; use otro --prefijo")
+
+        self.opciones = opciones
+        self.rng = random.Random(opciones['semilla'])
+        self.lote = opciones['lote']
+        inicio = time.perf_counter()
+
+        with transaction.atomic():
+            periodos = self.crear_periodos()
+            materias = self.crear_materias()
+            tipos = self.crear_tipos()
+            profesores, estudiantes = self.crear_usuarios()
+            grupos = self.crear_grupos(periodos)
+            materias_grupos = self.crear_materias_grupos(grupos, materias, profesores)
+            inscritos = self.crear_inscripciones(grupos, estudiantes)
+            total = self.crear_calificaciones(materias_grupos, inscritos, tipos)
+
+        if not opciones['sin_resumen']:
+            self.paso('Resumen de calificaciones', reconstruir_resumen(tamano_lote=self.lote))
+        # bulk_create no dispara señales: se invalida todo lo que pudo quedar en caché
+        invalidar_estadisticas()
+        invalidar_fragmentos()
+        invalidar_portales()
+
+        segundos = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'Generadas {total} calificaciones en {segundos:.1f}s '
+            f"(usuarios '{opciones['prefijo']}-*', contraseña '{opciones['contrasena']}')"
+        ))
+
+    def paso(self, nombre, cantidad):
+        self.stdout.write(f'  {nombre}: {cantidad}')
+
+    def crear_periodos(self):
+        prefijo = self.opciones['prefijo']
+        periodos = [
+            PeriodoAcademico(
+                nombre=f'{prefijo}-{2025 + i // 2}-{i % 2 + 1}',
+                descripcion='Generado',
+                activo=(i == self.opciones['periodos'] - 1),
+                fecha_inicio=date(2025 + i // 2, 1 if i % 2 == 0 else 7, 15),
+                fecha_fin=date(2025 + i // 2, 6 if i % 2 == 0 else 12, 15),
+            )
+            for i in range(self.opciones['periodos'])
+        ]
+        PeriodoAcademico.objects.bulk_create(periodos)
+        periodos = list(PeriodoAcademico.objects.filter(nombre__startswith=f'{prefijo}-').order_by('fecha_inicio'))
+        self.paso('Períodos', len(periodos))
+        return periodos
+
+    def crear_materias(self):
+        prefijo = self.opciones['prefijo'].upper()
+        Materia.objects.bulk_create([
+            Materia(nombre=f'Materia {i + 1}', codigo=f'{prefijo}{i + 1:04d}', creditos=self.rng.randint(1, 5))
+            for i in range(self.opciones['materias'])
+        ], batch_size=self.lote)
+        materias = list(Materia.objects.filter(codigo__startswith=prefijo).order_by('codigo'))
+        self.paso('Materias', len(materias))
+        return materias
+
+    def crear_tipos(self):
+        cantidad = self.opciones['tipos']
+        base = round(100 / cantidad, 2)
+        porcentajes = [base] * (cantidad - 1) + [round(100 - base * (cantidad - 1), 2)]
+        nombres = [f"{self.opciones['prefijo']} Evaluación {i + 1}" for i in range(cantidad)]
+        TipoEvaluacion.objects.bulk_create([
+            TipoEvaluacion(nombre=nombre, porcentaje=porcentaje)
+            for nombre, porcentaje in zip(nombres, porcentajes)
+        ])
+        tipos = list(TipoEvaluacion.objects.filter(nombre__in=nombres).order_by('id'))
+        self.paso('Tipos de evaluación', len(tipos))
+        return tipos
+
+    def crear_usuarios(self):
+        prefijo = self.opciones['prefijo']
+        # Se calcula un solo hash (es lo costoso) y se reutiliza para todos
+        contrasena = make_password(self.opciones['contrasena'])
+
+        def usuarios(rol, etiqueta, cantidad):
+            for i in range(cantidad):
+                yield Usuario(
+                    username=f'{prefijo}-{etiqueta}{i + 1}',
+                    documento=f'{prefijo}-{rol}{i + 1:08d}',
+                    first_name=f'{etiqueta.capitalize()} {i + 1}',
+                    email=f'{etiqueta}{i + 1}@{prefijo}.sgen.edu',
+                    password=contrasena,
+                    rol=rol,
+                )
+
+        for rol, etiqueta, cantidad in (('1', 'admin', self.opciones['administradores']),
+                                        ('2', 'profesor', self.opciones['profesores']),
+                                        ('3', 'estudiante', self.opciones['estudiantes'])):
+            for lote in en_lotes(usuarios(rol, etiqueta, cantidad), self.lote):
+                Usuario.objects.bulk_create(lote)
+
+        generados = Usuario.objects.filter(username__startswith=f'{prefijo}-').order_by('documento')
+        administradores = list(generados.filter(rol='1').values_list('id_usuario', flat=True))
+        profesores = list(generados.filter(rol='2').values_list('id_usuario', flat=True))
+        estudiantes = list(generados.filter(rol='3').values_list('id_usuario', flat=True))
+
+        Admin.objects.bulk_create([Admin(usuario_id=pk) for pk in administradores])
+        for lote in en_lotes((Profesor(usuario_id=pk) for pk in profesores), self.lote):
+            Profesor.objects.bulk_create(lote)
+        for lote in en_lotes((Estudiante(usuario_id=pk) for pk in estudiantes), self.lote):
+            Estudiante.objects.bulk_create(lote)
+
+        self.paso('Administradores', len(administradores))
+        self.paso('Profesores', len(profesores))
+        self.paso('Estudiantes', len(estudiantes))
+        return profesores, estudiantes
+
+    def crear_grupos(self, periodos):
+        Grupo.objects.bulk_create([
+            Grupo(nombre=f'G{g + 1:03d}', periodo=periodo, capacidad=0)
+            for periodo in periodos for g in range(self.opciones['grupos'])
+        ], batch_size=self.lote)
+        grupos = {
+            periodo.pk: list(Grupo.objects.filter(periodo=periodo).order_by('nombre').values_list('id', flat=True))
+            for periodo in periodos
+        }
+        self.paso('Grupos', sum(len(ids) for ids in grupos.values()))
+        return grupos
+
+    def crear_materias_grupos(self, grupos, materias, profesores):
+        por_grupo = self.opciones['materias_por_grupo']
+        nuevas = (
+            MateriaGrupo(materia_id=materia.pk, grupo_id=grupo_id, profesor_id=self.rng.choice(profesores) if profesores else None)
+            for ids in grupos.values() for grupo_id in ids
+            for materia in self.rng.sample(materias, por_grupo)
+        )
+        for lote in en_lotes(nuevas, self.lote):
+            MateriaGrupo.objects.bulk_create(lote)
+
+        todos = [grupo_id for ids in grupos.values() for grupo_id in ids]
+        materias_grupos = {}
+        # En orden de id: la semilla se consume recorriendo este diccionario
+        filas = MateriaGrupo.objects.filter(grupo_id__in=todos).order_by('id').values_list('id', 'grupo_id')
+        for mg_id, grupo_id in filas:
+            materias_grupos.setdefault(grupo_id, []).append(mg_id)
+        self.paso('Materias-Grupos', sum(len(ids) for ids in materias_grupos.values()))
+        return materias_grupos
+
+    def crear_inscripciones(self, grupos, estudiantes):
+        """Cada estudiante queda en un grupo de cada período; retorna {grupo_id: [estudiantes]}"""
+        inscritos = {}
+        for ids in grupos.values():
+            orden = estudiantes[:]
+            self.rng.shuffle(orden)
+            for i, estudiante_id in enumerate(orden):
+                inscritos.setdefault(ids[i % len(ids)], []).append(estudiante_id)
+
+        nuevas = (
+            EstudianteGrupo(estudiante_id=estudiante_id, grupo_id=grupo_id)
+            for grupo_id, ids in inscritos.items() for estudiante_id in ids
+        )
+        for lote in en_lotes(nuevas, self.lote):
+            EstudianteGrupo.objects.bulk_create(lote)
+
+        # La capacidad de cada grupo se ajusta a su número de inscritos
+        Grupo.objects.bulk_update(
+            [Grupo(id=grupo_id, capacidad=len(ids)) for grupo_id, ids in inscritos.items()],
+            ['capacidad'], batch_size=self.lote,
+        )
+        self.paso('Inscripciones', sum(len(ids) for ids in inscritos.values()))
+        return inscritos
+
+    def crear_calificaciones(self, materias_grupos, inscritos, tipos):
+        completitud = self.opciones['completitud']
+        rng = self.rng
+
+        def calificaciones():
+            for grupo_id, mg_ids in materias_grupos.items():
+                for mg_id in mg_ids:
+                    for estudiante_id in inscritos.get(grupo_id, []):
+                        for tipo in tipos:
+                            if rng.random() < completitud:
+                                yield Calificacion(
+                                    estudiante_id=estudiante_id, materia_grupo_id=mg_id,
+                                    tipo_evaluacion_id=tipo.pk, nota=round(rng.uniform(0, 5), 1),
+                                    estado='registrada',
+                                )
+                            else:
+                                yield Calificacion(
+                                    estudiante_id=estudiante_id, materia_grupo_id=mg_id,
+                                    tipo_evaluacion_id=tipo.pk,
+                                )
+
+        total = 0
+        for lote in en_lotes(calificaciones(), self.lote):
+            Calificacion.objects.bulk_create(lote)
+            total += len(lote)
+            if total % (self.lote * 20) == 0:
+                self.stdout.write(f'    ... {total} calificaciones')
+        self.paso('Calificaciones', total)
+        return total
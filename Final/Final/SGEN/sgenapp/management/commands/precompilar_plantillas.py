@@ -0,0 +1,27 @@
+"""
+Compila y valida todas las plantillas del proyecto sin servir peticiones.
+
+Es la misma validación que hace wsgi.py al iniciar con el perfil de
+producción; sirve para detectar una plantilla rota antes de desplegar:
+    python manage.py precompilar_plantillas
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sgenapp.arranque import precompilar_plantillas
+
+
+class Command(BaseCommand):
+    help = 'Compila todas las plantillas del proyecto y falla si alguna tiene errores'
+
+    def handle(self, *args, **opciones):
+        inicio = time.perf_counter()
+        compiladas, errores = precompilar_plantillas()
+        milisegundos = (time.perf_counter() - inicio) * 1000
+        for nombre, mensaje in errores:
+            self.stderr.write(f'  {nombre}: {mensaje}')
+        if errores:
+            raise CommandError(f'{len(errores)} plantillas con errores ({compiladas} compiladas)')
+        self.stdout.write(self.style.SUCCESS(f'{compiladas} plantillas compiladas en {milisegundos:.0f} ms'))
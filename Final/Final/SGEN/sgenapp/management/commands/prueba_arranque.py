@@ -0,0 +1,245 @@
+"""
+Mide el tiempo hasta la primera respuesta de un proceso nuevo.
+
+Cada corrida lanza un intérprete de Python nuevo que importa SGEN.wsgi (con
+django.setup() y, según el perfil, la precompilación de sgenapp/arranque.py),
+pide una vez cada página llamando directamente a la aplicación WSGI y luego
+la vuelve a pedir --repeticiones veces. Se reporta, con la mediana de
+--corridas procesos:
+
+    arranque     desde que se lanza el proceso hasta tener la aplicación lista
+    primera      desde que se lanza el proceso hasta la primera respuesta
+    todas        suma de la primera petición de cada página
+    por página   primera petición y mediana de las siguientes
+
+Perfiles (SGEN_PLANTILLAS / SGEN_PRECOMPILAR en settings.py):
+    desarrollo                 configuración por defecto de Django
+    produccion                 cargador en caché y precompilación al iniciar
+    produccion-sin-precompilar cargador en caché, cada plantilla se compila en su primer uso
+
+    python manage.py prueba_arranque --corridas 5 --salida arranque.json
+    python manage.py prueba_arranque --comparar arranque.json
+
+Las páginas con sesión usan el primer usuario de cada rol (p. ej. de
+generar_datos). Las peticiones van a 'localhost', que debe estar permitido
+(ALLOWED_HOSTS, o DEBUG).
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from sgenapp.models import Usuario
+
+PERFILES = {
+    'desarrollo': {'SGEN_PLANTILLAS': 'desarrollo', 'SGEN_PRECOMPILAR': '0'},
+    'produccion': {'SGEN_PLANTILLAS': 'produccion', 'SGEN_PRECOMPILAR': '1'},
+    'produccion-sin-precompilar': {'SGEN_PLANTILLAS': 'produccion', 'SGEN_PRECOMPILAR': '0'},
+}
+
+# (rol, nombre de la URL); rol None = sin sesión
+PAGINAS = [
+    (None, 'login'),
+    ('1', 'admin_dashboard'),
+    ('1', 'admin_reportes'),
+    ('1', 'admin_crear_grupo'),
+    ('2', 'profesor_dashboard'),
+    ('2', 'profesor_ingresar_notas'),
+    ('3', 'estudiante_dashboard'),
+    ('3', 'estudiante_ver_notas'),
+]
+
+# Se ejecuta en el proceso nuevo; recibe las páginas en SGEN_ARRANQUE_PAGINAS
+# y el instante de lanzamiento en SGEN_ARRANQUE_INICIO (time.time() del padre)
+TRABAJADOR = r'''
+import io, json, os, statistics, sys, time
+
+lanzado = float(os.environ['SGEN_ARRANQUE_INICIO'])
+paginas = json.loads(os.environ['SGEN_ARRANQUE_PAGINAS'])
+repeticiones = int(os.environ['SGEN_ARRANQUE_REPETICIONES'])
+
+from SGEN.wsgi import application
+listo = time.time()
+
+
+def pedir(ruta, cookie):
+    estado = []
+    entorno = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': ruta, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+        'SERVER_PROTOCOL': 'HTTP/1.1', 'HTTP_COOKIE': cookie,
+        'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr, 'wsgi.multithread': True, 'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    cuerpo = application(entorno, lambda status, headers, exc_info=None: estado.append(status))
+    try:
+        for _ in cuerpo:
+            pass
+    finally:
+        if hasattr(cuerpo, 'close'):
+            cuerpo.close()
+    return int(estado[0].split()[0])
+
+
+resultado = {'arranque_ms': (listo - lanzado) * 1000, 'paginas': {}}
+for nombre, ruta, cookie in paginas:
+    inicio = time.perf_counter()
+    estado = pedir(ruta, cookie)
+    primera = (time.perf_counter() - inicio) * 1000
+    if 'primera_ms' not in resultado:
+        resultado['primera_ms'] = (time.time() - lanzado) * 1000
+    siguientes = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        pedir(ruta, cookie)
+        siguientes.append((time.perf_counter() - inicio) * 1000)
+    resultado['paginas'][nombre] = {
+        'estado': estado,
+        'primera_ms': primera,
+        'siguientes_ms': statistics.median(siguientes) if siguientes else None,
+    }
+print(json.dumps(resultado))
+'''
+
+
+def mediana(valores):
+    valores = [v for v in valores if v is not None]
+    return round(statistics.median(valores), 2) if valores else None
+
+
+class Command(BaseCommand):
+    help = 'Tiempo hasta la primera respuesta de un proceso nuevo con cada perfil de plantillas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--perfiles', default=','.join(PERFILES), help='Perfiles separados por coma')
+        parser.add_argument('--corridas', type=int, default=5, help='Procesos nuevos por perfil')
+        parser.add_argument('--repeticiones', type=int, default=20, help='Peticiones después de la primera')
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+        parser.add_argument('--comparar', help='JSON de una corrida anterior para comparar')
+
+    def handle(self, *args, **opciones):
+        perfiles = [perfil.strip() for perfil in opciones['perfiles'].split(',') if perfil.strip()]
+        desconocidos = [perfil for perfil in perfiles if perfil not in PERFILES]
+        if desconocidos:
+            raise CommandError(f"Perfiles desconocidos: {', '.join(desconocidos)}")
+        if opciones['corridas'] < 1:
+            raise CommandError('--corridas debe ser al menos 1')
+
+        sesiones = self.crear_sesiones()
+        try:
+            paginas = [
+                (nombre, reverse(nombre), f'{settings.SESSION_COOKIE_NAME}={sesiones[rol].session_key}' if rol else '')
+                for rol, nombre in PAGINAS
+            ]
+            resultados = {}
+            for perfil in perfiles:
+                self.stdout.write(f"Perfil {perfil}: {opciones['corridas']} procesos")
+                corridas = [self.lanzar(perfil, paginas, opciones['repeticiones']) for _ in range(opciones['corridas'])]
+                resultados[perfil] = self.resumir(corridas)
+        finally:
+            for sesion in sesiones.values():
+                sesion.delete()
+
+        resultado = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'corridas': opciones['corridas'],
+            'repeticiones': opciones['repeticiones'],
+            'perfiles': resultados,
+        }
+        self.imprimir(resultado)
+
+        if opciones['comparar']:
+            self.comparar(resultado, opciones['comparar'])
+        if opciones['salida']:
+            with open(opciones['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {opciones['salida']}"))
+
+    def crear_sesiones(self):
+        """Una sesión guardada en la base de datos por rol, para que el proceso nuevo la encuentre"""
+        almacen = import_module(settings.SESSION_ENGINE).SessionStore
+        sesiones = {}
+        for rol in sorted({rol for rol, _ in PAGINAS if rol}):
+            usuario = Usuario.objects.filter(rol=rol, is_active=True).order_by('pk').first()
+            if usuario is None:
+                raise CommandError(f'No hay usuarios con rol {rol}; ejecute generar_datos primero')
+            sesion = almacen()
+            sesion[SESSION_KEY] = usuario._meta.pk.value_to_string(usuario)
+            sesion[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+            sesion[HASH_SESSION_KEY] = usuario.get_session_auth_hash()
+            sesion.save()
+            sesiones[rol] = sesion
+        return sesiones
+
+    def lanzar(self, perfil, paginas, repeticiones):
+        entorno = {
+            **os.environ,
+            **PERFILES[perfil],
+            'PYTHONPATH': os.pathsep.join(filter(None, [str(settings.BASE_DIR), os.environ.get('PYTHONPATH')])),
+            'DJANGO_SETTINGS_MODULE': os.environ['DJANGO_SETTINGS_MODULE'],
+            'SGEN_ARRANQUE_PAGINAS': json.dumps(paginas),
+            'SGEN_ARRANQUE_REPETICIONES': str(repeticiones),
+            'SGEN_ARRANQUE_INICIO': repr(time.time()),
+        }
+        proceso = subprocess.run(
+            [sys.executable, '-c', TRABAJADOR], cwd=settings.BASE_DIR, env=entorno,
+            capture_output=True, text=True, timeout=300,
+        )
+        if proceso.returncode != 0:
+            raise CommandError(f'El proceso de prueba ({perfil}) falló:\n{proceso.stderr[-2000:]}')
+        return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+    def resumir(self, corridas):
+        return {
+            'arranque_ms': mediana([c['arranque_ms'] for c in corridas]),
+            'primera_ms': mediana([c['primera_ms'] for c in corridas]),
+            'todas_ms': mediana([sum(p['primera_ms'] for p in c['paginas'].values()) for c in corridas]),
+            'paginas': {
+                nombre: {
+                    'estado': corridas[0]['paginas'][nombre]['estado'],
+                    'primera_ms': mediana([c['paginas'][nombre]['primera_ms'] for c in corridas]),
+                    'siguientes_ms': mediana([c['paginas'][nombre]['siguientes_ms'] for c in corridas]),
+                }
+                for nombre in corridas[0]['paginas']
+            },
+        }
+
+    def imprimir(self, resultado):
+        for perfil, r in resultado['perfiles'].items():
+            self.stdout.write(
+                f"\n{perfil}: arranque {r['arranque_ms']} ms, primera respuesta {r['primera_ms']} ms, "
+                f"primera de cada página {r['todas_ms']} ms"
+            )
+            encabezado = f"  {'página':<32} {'estado':>6} {'primera':>9} {'siguientes':>11}"
+            self.stdout.write(encabezado)
+            for nombre, p in r['paginas'].items():
+                self.stdout.write(f"  {nombre:<32} {p['estado']:>6} {p['primera_ms']:>9} {p['siguientes_ms']:>11}")
+
+    def comparar(self, resultado, ruta):
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                anterior = json.load(archivo)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'No se pudo leer {ruta}: {error}')
+
+        self.stdout.write(f"\nComparación con {ruta} ({anterior.get('fecha', '?')}):")
+        for perfil, actual in resultado['perfiles'].items():
+            previo = anterior.get('perfiles', {}).get(perfil)
+            if not previo:
+                continue
+            self.stdout.write(
+                f"{perfil:<28} arranque {previo['arranque_ms']:>8} -> {actual['arranque_ms']:>8}  "
+                f"primera {previo['primera_ms']:>8} -> {actual['primera_ms']:>8}  "
+                f"todas {previo['todas_ms']:>8} -> {actual['todas_ms']:>8}"
+            )
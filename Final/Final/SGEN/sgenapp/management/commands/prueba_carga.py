@@ -0,0 +1,352 @@
+"""
+Prueba de carga HTTP de los flujos por rol de SGEN.
+
+Levanta la aplicación en un servidor WSGI local (o usa --url) y lanza usuarios
+virtuales concurrentes que inician sesión y recorren el flujo de su rol:
+
+    administrador: dashboard, usuarios, reportes, historial
+    profesor:      dashboard, seleccionar planilla, abrir planilla, guardar notas
+    estudiante:    dashboard, seleccionar materia, ver notas, notas de una materia
+
+Los usuarios se toman de los datos de generar_datos (mismo --prefijo y
+--contrasena), por ejemplo:
+    python manage.py generar_datos --estudiantes 2000 --grupos 20
+    python manage.py prueba_carga --usuarios 20 --duracion 60 --salida carga.json
+    python manage.py prueba_carga --comparar carga.json
+
+Se reportan latencias p50/p95/p99 y peticiones por segundo por endpoint.
+"""
+
+import json
+import platform
+import random
+import threading
+import time
+from datetime import datetime
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, build_opener
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+from django.db import connection
+from django.urls import reverse
+
+from sgenapp.models import EstudianteGrupo, MateriaGrupo, TipoEvaluacion, Usuario
+
+ROLES = {'administrador': '1', 'profesor': '2', 'estudiante': '3'}
+
+
+class _SinRedireccion(HTTPRedirectHandler):
+    """Cada redirección se mide como su propia respuesta, no se sigue"""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class _ManejadorSilencioso(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def percentil(ordenados, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not ordenados:
+        return None
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[indice]
+
+
+class Metricas:
+    """Latencias y errores por endpoint, compartidas entre hilos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = {}
+        self.errores = {}
+
+    def registrar(self, endpoint, segundos, ok):
+        with self._lock:
+            self.latencias.setdefault(endpoint, []).append(segundos)
+            if not ok:
+                self.errores[endpoint] = self.errores.get(endpoint, 0) + 1
+
+    def resumen(self, duracion):
+        def estadisticas(valores, errores):
+            ordenados = sorted(valores)
+            return {
+                'peticiones': len(ordenados),
+                'errores': errores,
+                'rps': round(len(ordenados) / duracion, 2),
+                'media_ms': round(sum(ordenados) / len(ordenados) * 1000, 2),
+                'p50_ms': round(percentil(ordenados, 50) * 1000, 2),
+                'p95_ms': round(percentil(ordenados, 95) * 1000, 2),
+                'p99_ms': round(percentil(ordenados, 99) * 1000, 2),
+                'max_ms': round(ordenados[-1] * 1000, 2),
+            }
+
+        endpoints = {
+            endpoint: estadisticas(valores, self.errores.get(endpoint, 0))
+            for endpoint, valores in sorted(self.latencias.items())
+        }
+        todas = [v for valores in self.latencias.values() for v in valores]
+        total = estadisticas(todas, sum(self.errores.values())) if todas else {}
+        return total, endpoints
+
+
+class UsuarioVirtual:
+    """Sesión HTTP propia (cookies, CSRF) de un usuario del sistema"""
+
+    def __init__(self, base, metricas):
+        self.base = base
+        self.metricas = metricas
+        self.cookies = CookieJar()
+        self.cliente = build_opener(HTTPCookieProcessor(self.cookies), _SinRedireccion())
+
+    def csrf(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def pedir(self, endpoint, ruta, datos=None):
+        """Hace la petición y registra su latencia; 2xx y 3xx cuentan como éxito"""
+        cuerpo = None
+        if datos is not None:
+            cuerpo = urlencode({**datos, 'csrfmiddlewaretoken': self.csrf()}).encode()
+        metodo = 'POST' if cuerpo is not None else 'GET'
+        inicio = time.perf_counter()
+        try:
+            with self.cliente.open(self.base + ruta, data=cuerpo, timeout=60) as respuesta:
+                contenido = respuesta.read()
+                estado = respuesta.status
+        except HTTPError as error:
+            contenido = error.read()
+            estado = error.code
+        except URLError:
+            contenido, estado = b'', 0
+        self.metricas.registrar(f'{metodo} {endpoint}', time.perf_counter() - inicio, 200 <= estado < 400)
+        return estado, contenido
+
+    def iniciar_sesion(self, username, contrasena):
+        self.pedir('login', reverse('login'))
+        estado, _ = self.pedir('login', reverse('login'), {'username': username, 'password': contrasena})
+        return estado == 302
+
+
+def flujo_administrador(usuario, datos, rng):
+    usuario.pedir('admin_dashboard', reverse('admin_dashboard'))
+    usuario.pedir('admin_usuarios', reverse('admin_usuarios'))
+    usuario.pedir('admin_reportes', reverse('admin_reportes'))
+    usuario.pedir('admin_historial', reverse('admin_historial'))
+
+
+def flujo_profesor(usuario, datos, rng):
+    usuario.pedir('profesor_dashboard', reverse('profesor_dashboard'))
+    usuario.pedir('profesor_ingresar_notas', reverse('profesor_ingresar_notas'))
+    if not datos['planillas']:
+        return
+    materia_grupo_id, estudiantes = rng.choice(datos['planillas'])
+    tipo_id = rng.choice(datos['tipos'])
+    usuario.pedir('profesor_ingresar_notas', reverse('profesor_ingresar_notas'), {
+        'materia_grupo': materia_grupo_id, 'tipo_evaluacion': tipo_id,
+    })
+    notas = {f'nota_{estudiante_id}': round(rng.uniform(0, 5), 1) for estudiante_id in estudiantes}
+    usuario.pedir('profesor_guardar_notas', reverse('profesor_guardar_notas'), {
+        'materia_grupo_id': materia_grupo_id, 'tipo_evaluacion_id': tipo_id, **notas,
+    })
+
+
+def flujo_estudiante(usuario, datos, rng):
+    usuario.pedir('estudiante_dashboard', reverse('estudiante_dashboard'))
+    usuario.pedir('estudiante_seleccionar_materia', reverse('estudiante_seleccionar_materia'))
+    usuario.pedir('estudiante_ver_notas', reverse('estudiante_ver_notas'))
+    if datos['materias_grupos']:
+        materia_grupo_id = rng.choice(datos['materias_grupos'])
+        usuario.pedir('estudiante_ver_notas_materia', reverse('estudiante_ver_notas_materia', args=[materia_grupo_id]))
+
+
+FLUJOS = {
+    'administrador': flujo_administrador,
+    'profesor': flujo_profesor,
+    'estudiante': flujo_estudiante,
+}
+
+
+def parsear_mezcla(texto):
+    """'administrador=1,profesor=3,estudiante=6' -> {rol: peso}"""
+    mezcla = {}
+    for parte in texto.split(','):
+        rol, _, peso = parte.partition('=')
+        rol = rol.strip()
+        if rol not in ROLES:
+            raise CommandError(f"Rol desconocido en --mezcla: '{rol}'")
+        try:
+            mezcla[rol] = float(peso)
+        except ValueError:
+            raise CommandError(f"Peso inválido en --mezcla para '{rol}'")
+    if not any(peso > 0 for peso in mezcla.values()):
+        raise CommandError('--mezcla necesita al menos un peso positivo')
+    return mezcla
+
+
+class Command(BaseCommand):
+    help = 'Prueba de carga HTTP de los flujos de administrador, profesor y estudiante'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=10, help='Usuarios virtuales concurrentes')
+        parser.add_argument('--duracion', type=float, default=30, help='Segundos de carga')
+        parser.add_argument('--mezcla', default='administrador=1,profesor=3,estudiante=6')
+        parser.add_argument('--pausa', type=float, default=0, help='Segundos de espera entre flujos')
+        parser.add_argument('--prefijo', default='gen', help='Prefijo de los usuarios de generar_datos')
+        parser.add_argument('--contrasena', default='sgen12345')
+        parser.add_argument('--semilla', type=int, default=2025)
+        parser.add_argument('--url', help='Usar un servidor ya levantado en lugar del servidor local')
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+        parser.add_argument('--comparar', help='JSON de una corrida anterior para comparar p95 y rps')
+
+    def handle(self, *args, **opciones):
+        rng = random.Random(opciones['semilla'])
+        mezcla = parsear_mezcla(opciones['mezcla'])
+        cuentas = self.cargar_cuentas(opciones['prefijo'], mezcla)
+
+        servidor = None
+        base = (opciones['url'] or '').rstrip('/')
+        if not base:
+            servidor = ThreadedWSGIServer(('127.0.0.1', 0), _ManejadorSilencioso)
+            servidor.set_app(get_internal_wsgi_application())
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            base = f'http://127.0.0.1:{servidor.server_address[1]}'
+        # El plan de carga ya está en memoria; los hilos del servidor abren sus propias conexiones
+        connection.close()
+
+        metricas = Metricas()
+        roles = list(mezcla)
+        pesos = [mezcla[rol] for rol in roles]
+        asignados = [rng.choices(roles, pesos)[0] for _ in range(opciones['usuarios'])]
+
+        self.stdout.write(f"Carga contra {base}: {opciones['usuarios']} usuarios durante {opciones['duracion']}s")
+        fin = time.perf_counter() + opciones['duracion']
+        hilos = [
+            threading.Thread(target=self.ejecutar, args=(
+                rol, cuentas[rol][i % len(cuentas[rol])], base, metricas, fin,
+                opciones, random.Random(opciones['semilla'] + i),
+            ))
+            for i, rol in enumerate(asignados)
+        ]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+
+        if servidor is not None:
+            servidor.shutdown()
+            servidor.server_close()
+
+        total, endpoints = metricas.resumen(duracion)
+        resultado = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'parametros': {
+                clave: opciones[clave]
+                for clave in ('usuarios', 'duracion', 'mezcla', 'pausa', 'prefijo', 'semilla', 'url')
+            },
+            'entorno': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'base_datos': connection.vendor,
+                'usuarios_por_rol': {rol: asignados.count(rol) for rol in mezcla},
+            },
+            'duracion_s': round(duracion, 2),
+            'total': total,
+            'endpoints': endpoints,
+        }
+        self.imprimir(resultado)
+
+        if opciones['comparar']:
+            self.comparar(resultado, opciones['comparar'])
+        if opciones['salida']:
+            with open(opciones['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {opciones['salida']}"))
+
+    def cargar_cuentas(self, prefijo, mezcla):
+        """Usuarios de cada rol y los datos que sus flujos necesitan"""
+        tipos = list(TipoEvaluacion.objects.values_list('id', flat=True))
+        cuentas = {}
+        for rol, codigo in ROLES.items():
+            if not mezcla.get(rol):
+                continue
+            usuarios = list(
+                Usuario.objects.filter(rol=codigo, username__startswith=f'{prefijo}-')
+                .order_by('id_usuario').values_list('id_usuario', 'username')[:200]
+            )
+            if not usuarios:
+                raise CommandError(
+                    f"No hay usuarios '{prefijo}-*' con rol {rol}; ejecute generar_datos primero"
+                )
+            cuentas[rol] = [self.datos_flujo(rol, pk, username, tipos) for pk, username in usuarios]
+        return cuentas
+
+    def datos_flujo(self, rol, pk, username, tipos):
+        datos = {'username': username, 'tipos': tipos, 'planillas': [], 'materias_grupos': []}
+        if rol == 'profesor':
+            materias_grupos = dict(MateriaGrupo.objects.filter(profesor_id=pk).values_list('id', 'grupo_id')[:5])
+            estudiantes = {}
+            for grupo_id, estudiante_id in EstudianteGrupo.objects.filter(
+                grupo_id__in=set(materias_grupos.values())
+            ).values_list('grupo_id', 'estudiante_id'):
+                estudiantes.setdefault(grupo_id, []).append(estudiante_id)
+            datos['planillas'] = [
+                (mg_id, estudiantes.get(grupo_id, [])) for mg_id, grupo_id in materias_grupos.items()
+            ]
+        elif rol == 'estudiante':
+            datos['materias_grupos'] = list(
+                MateriaGrupo.objects.filter(grupo__estudiantegrupo__estudiante_id=pk).values_list('id', flat=True)
+            )
+        return datos
+
+    def ejecutar(self, rol, datos, base, metricas, fin, opciones, rng):
+        usuario = UsuarioVirtual(base, metricas)
+        if not usuario.iniciar_sesion(datos['username'], opciones['contrasena']):
+            metricas.registrar('POST login (rechazado)', 0, False)
+            return
+        flujo = FLUJOS[rol]
+        while time.perf_counter() < fin:
+            flujo(usuario, datos, rng)
+            if opciones['pausa']:
+                time.sleep(opciones['pausa'])
+
+    def imprimir(self, resultado):
+        encabezado = f"{'endpoint':<45} {'n':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+        self.stdout.write(encabezado)
+        self.stdout.write('-' * len(encabezado))
+        filas = list(resultado['endpoints'].items())
+        if resultado['total']:
+            filas.append(('TOTAL', resultado['total']))
+        for endpoint, e in filas:
+            self.stdout.write(
+                f"{endpoint:<45} {e['peticiones']:>6} {e['errores']:>4} {e['rps']:>8} "
+                f"{e['p50_ms']:>8} {e['p95_ms']:>8} {e['p99_ms']:>8}"
+            )
+
+    def comparar(self, resultado, ruta):
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                anterior = json.load(archivo)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'No se pudo leer {ruta}: {error}')
+
+        self.stdout.write(f"\nComparación con {ruta} ({anterior.get('fecha', '?')}):")
+        for endpoint, actual in resultado['endpoints'].items():
+            previo = anterior.get('endpoints', {}).get(endpoint)
+            if not previo:
+                continue
+            cambio = (actual['p95_ms'] - previo['p95_ms']) / previo['p95_ms'] * 100 if previo['p95_ms'] else 0
+            self.stdout.write(
+                f"{endpoint:<45} p95 {previo['p95_ms']:>8} -> {actual['p95_ms']:>8} ({cambio:+.1f}%)  "
+                f"rps {previo['rps']:>8} -> {actual['rps']:>8}"
+            )
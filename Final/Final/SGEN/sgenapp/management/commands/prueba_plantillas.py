@@ -0,0 +1,214 @@
+"""
+Mide el tamaño y el tiempo de las páginas de cada rol.
+
+Por cada página se pide --repeticiones veces con la caché de fragmentos vacía
+(fría) y otras tantas con los fragmentos ya guardados (caliente), y se
+reportan la mediana en ms, las consultas, los bytes del HTML (también con
+gzip) y cuántos de ellos son estilos en línea. Las hojas enlazadas con
+<link rel="stylesheet"> se cuentan aparte: se descargan una vez y, con
+nombre con hash, el navegador no las vuelve a pedir.
+
+Usa el primer usuario de cada rol, por ejemplo con los datos de generar_datos:
+    python manage.py generar_datos --estudiantes 2000 --grupos 20
+    python manage.py prueba_plantillas --salida plantillas.json
+    python manage.py prueba_plantillas --comparar plantillas.json
+"""
+
+import gzip
+import json
+import re
+import statistics
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from sgenapp.estaticos import CON_HUELLA
+from sgenapp.fragmentos import ALIAS
+from sgenapp.models import Usuario
+
+# (rol, nombre de la URL); rol None = sin sesión
+PAGINAS = [
+    (None, 'login'),
+    ('1', 'admin_dashboard'),
+    ('1', 'admin_usuarios'),
+    ('1', 'admin_reportes'),
+    ('1', 'admin_periodos'),
+    ('1', 'admin_grupos'),
+    ('1', 'admin_materias'),
+    ('1', 'admin_crear_grupo'),
+    ('1', 'admin_asignar_profesor'),
+    ('1', 'admin_historial'),
+    ('2', 'profesor_dashboard'),
+    ('2', 'profesor_ingresar_notas'),
+    ('2', 'profesor_importar_notas'),
+    ('3', 'estudiante_dashboard'),
+    ('3', 'estudiante_seleccionar_materia'),
+    ('3', 'estudiante_ver_notas'),
+]
+
+ESTILO_EN_LINEA = re.compile(rb'<style[^>]*>.*?</style>', re.S)
+HOJA_ENLAZADA = re.compile(rb'<link rel="stylesheet" href="([^"]+)"')
+
+
+def tamano_hoja(url):
+    """Bytes de una hoja de STATIC_URL, buscada entre los archivos de las apps"""
+    ruta = url.split(settings.STATIC_URL, 1)[-1]
+    encontrada = finders.find(CON_HUELLA.sub(lambda m: '.' + m.group(0).rsplit('.', 1)[-1], ruta))
+    if not encontrada:
+        return 0, 0
+    with open(encontrada, 'rb') as archivo:
+        contenido = archivo.read()
+    return len(contenido), len(gzip.compress(contenido))
+
+
+class Command(BaseCommand):
+    help = 'Bytes transferidos y tiempo de render de las páginas de cada rol, con y sin fragmentos en caché'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=20)
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+        parser.add_argument('--comparar', help='JSON de una corrida anterior para comparar bytes y tiempos')
+
+    def handle(self, *args, **opciones):
+        if opciones['repeticiones'] < 1:
+            raise CommandError('--repeticiones debe ser al menos 1')
+        clientes = self.clientes()
+        fragmentos = caches[ALIAS]
+
+        paginas = {}
+        hojas = {}
+        for rol, nombre in PAGINAS:
+            cliente = clientes[rol]
+            url = reverse(nombre)
+            frio = self.medir(cliente, url, opciones['repeticiones'], antes=fragmentos.clear)
+            caliente = self.medir(cliente, url, opciones['repeticiones'])
+            contenido = caliente['contenido']
+            enlazadas = [url.decode() for url in HOJA_ENLAZADA.findall(contenido)]
+            for hoja in enlazadas:
+                hojas.setdefault(hoja, tamano_hoja(hoja))
+            paginas[nombre] = {
+                'estado': caliente['estado'],
+                'bytes': len(contenido),
+                'bytes_gzip': len(gzip.compress(contenido)),
+                'bytes_estilos_en_linea': sum(len(bloque) for bloque in ESTILO_EN_LINEA.findall(contenido)),
+                'hojas': enlazadas,
+                'ms_frio': frio['ms'],
+                'ms_caliente': caliente['ms'],
+                'consultas_frio': frio['consultas'],
+                'consultas_caliente': caliente['consultas'],
+            }
+
+        bytes_paginas = sum(p['bytes'] for p in paginas.values())
+        gzip_paginas = sum(p['bytes_gzip'] for p in paginas.values())
+        resultado = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'repeticiones': opciones['repeticiones'],
+            'base_datos': connection.vendor,
+            'paginas': paginas,
+            'hojas': {hoja: {'bytes': b, 'bytes_gzip': g} for hoja, (b, g) in hojas.items()},
+            'total': {
+                # Primera visita a todas las páginas: cada hoja se descarga una sola vez
+                'primera_visita_bytes': bytes_paginas + sum(b for b, _ in hojas.values()),
+                'primera_visita_gzip': gzip_paginas + sum(g for _, g in hojas.values()),
+                # Visitas siguientes: las hojas salen de la caché del navegador
+                'siguientes_bytes': bytes_paginas,
+                'siguientes_gzip': gzip_paginas,
+                'ms_frio': round(sum(p['ms_frio'] for p in paginas.values()), 2),
+                'ms_caliente': round(sum(p['ms_caliente'] for p in paginas.values()), 2),
+            },
+        }
+        self.imprimir(resultado)
+
+        if opciones['comparar']:
+            self.comparar(resultado, opciones['comparar'])
+        if opciones['salida']:
+            with open(opciones['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {opciones['salida']}"))
+
+    def clientes(self):
+        clientes = {None: Client(HTTP_HOST='localhost')}
+        for rol in sorted({rol for rol, _ in PAGINAS if rol}):
+            usuario = Usuario.objects.filter(rol=rol, is_active=True).order_by('pk').first()
+            if usuario is None:
+                raise CommandError(f'No hay usuarios con rol {rol}; ejecute generar_datos primero')
+            clientes[rol] = Client(HTTP_HOST='localhost')
+            clientes[rol].force_login(usuario)
+        return clientes
+
+    def medir(self, cliente, url, repeticiones, antes=None):
+        """Mediana de `repeticiones` peticiones; antes() se llama antes de cada una"""
+        tiempos = []
+        consultas = []
+        for _ in range(repeticiones):
+            if antes:
+                antes()
+            with CaptureQueriesContext(connection) as capturadas:
+                inicio = time.perf_counter()
+                respuesta = cliente.get(url)
+                tiempos.append(time.perf_counter() - inicio)
+            consultas.append(len(capturadas))
+        return {
+            'estado': respuesta.status_code,
+            'contenido': respuesta.content,
+            'ms': round(statistics.median(tiempos) * 1000, 2),
+            'consultas': min(consultas),
+        }
+
+    def imprimir(self, resultado):
+        encabezado = (
+            f"{'página':<32} {'bytes':>8} {'gzip':>7} {'estilos':>8} "
+            f"{'ms frío':>8} {'ms cal.':>8} {'q frío':>7} {'q cal.':>7}"
+        )
+        self.stdout.write(encabezado)
+        self.stdout.write('-' * len(encabezado))
+        for nombre, p in resultado['paginas'].items():
+            self.stdout.write(
+                f"{nombre:<32} {p['bytes']:>8} {p['bytes_gzip']:>7} {p['bytes_estilos_en_linea']:>8} "
+                f"{p['ms_frio']:>8} {p['ms_caliente']:>8} {p['consultas_frio']:>7} {p['consultas_caliente']:>7}"
+            )
+        for hoja, h in resultado['hojas'].items():
+            self.stdout.write(f"hoja {hoja}: {h['bytes']} bytes ({h['bytes_gzip']} con gzip)")
+        t = resultado['total']
+        self.stdout.write(
+            f"Primera visita: {t['primera_visita_bytes']} bytes ({t['primera_visita_gzip']} con gzip); "
+            f"siguientes: {t['siguientes_bytes']} ({t['siguientes_gzip']} con gzip)"
+        )
+        self.stdout.write(f"Render: {t['ms_frio']} ms en frío, {t['ms_caliente']} ms en caliente")
+
+    def comparar(self, resultado, ruta):
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                anterior = json.load(archivo)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'No se pudo leer {ruta}: {error}')
+
+        def cambio(antes, despues):
+            return (despues - antes) / antes * 100 if antes else 0
+
+        self.stdout.write(f"\nComparación con {ruta} ({anterior.get('fecha', '?')}):")
+        for nombre, actual in resultado['paginas'].items():
+            previo = anterior.get('paginas', {}).get(nombre)
+            if not previo:
+                continue
+            self.stdout.write(
+                f"{nombre:<32} bytes {previo['bytes']:>7} -> {actual['bytes']:>7} "
+                f"({cambio(previo['bytes'], actual['bytes']):+.1f}%)  "
+                f"ms {previo['ms_caliente']:>7} -> {actual['ms_caliente']:>7} "
+                f"({cambio(previo['ms_caliente'], actual['ms_caliente']):+.1f}%)"
+            )
+        previo, actual = anterior.get('total', {}), resultado['total']
+        for clave in ('primera_visita_bytes', 'siguientes_bytes', 'siguientes_gzip', 'ms_caliente'):
+            if clave in previo:
+                self.stdout.write(
+                    f"{clave:<32} {previo[clave]:>10} -> {actual[clave]:>10} "
+                    f"({cambio(previo[clave], actual[clave]):+.1f}%)"
+                )
@@ -0,0 +1,202 @@
+"""
+Compara el rendimiento concurrente de SQLite con y sin el perfil de perfil_sqlite.
+
+Para cada modo copia la base de datos a un archivo temporal y lanza hilos
+lectores (consultas de notas de un estudiante e historial reciente) y
+escritores (una entrada de HistorialAcciones y la actualización de una
+Calificacion por transacción) durante --duracion segundos. Se usa sqlite3
+directamente para medir sólo el motor, con las mismas transacciones que abre
+Django en cada modo (DEFERRED sin perfil, IMMEDIATE con perfil).
+
+    python manage.py prueba_sqlite --lectores 8 --escritores 2 --duracion 10 --salida sqlite.json
+"""
+
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from sgenapp.perfil_sqlite import aplicar_pragmas, configuracion
+
+# Valores por defecto de SQLite y de Django (timeout de 5 s del módulo sqlite3)
+PRAGMAS_SIN_PERFIL = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'busy_timeout': 5000,
+}
+
+CONSULTA_NOTAS = """
+    SELECT c.materia_grupo_id, c.tipo_evaluacion_id, c.nota, t.porcentaje
+    FROM sgenapp_calificacion c
+    JOIN sgenapp_tipoevaluacion t ON t.id = c.tipo_evaluacion_id
+    WHERE c.estudiante_id = ?
+"""
+CONSULTA_HISTORIAL = """
+    SELECT id, accion, fecha_hora FROM sgenapp_historialacciones
+    ORDER BY fecha_hora DESC, id DESC LIMIT 50
+"""
+INSERTAR_ACCION = """
+    INSERT INTO sgenapp_historialacciones (usuario_id, accion, descripcion, fecha_hora, ip_address)
+    VALUES (?, 'Prueba SQLite', '', ?, NULL)
+"""
+ACTUALIZAR_NOTA = """
+    UPDATE sgenapp_calificacion SET nota = ?, fecha_actualizacion = ? WHERE id = ?
+"""
+
+
+def percentil_ms(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return round(ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))] * 1000, 2)
+
+
+class Command(BaseCommand):
+    help = 'Mide lecturas y escrituras concurrentes en SQLite con y sin el perfil de rendimiento'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lectores', type=int, default=8)
+        parser.add_argument('--escritores', type=int, default=2)
+        parser.add_argument('--duracion', type=float, default=10)
+        parser.add_argument('--base', help='Archivo SQLite a copiar (por defecto la base configurada)')
+        parser.add_argument('--semilla', type=int, default=2025)
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+
+    def handle(self, *args, **opciones):
+        origen = opciones['base'] or str(settings.DATABASES['default']['NAME'])
+        if not opciones['base'] and connection.vendor != 'sqlite':
+            raise CommandError('La base configurada no es SQLite; indique --base')
+        if not os.path.isfile(origen):
+            raise CommandError(f'No existe el archivo {origen}')
+
+        resultados = {}
+        with tempfile.TemporaryDirectory() as directorio:
+            for modo, pragmas, inmediata in (
+                ('sin_perfil', PRAGMAS_SIN_PERFIL, False),
+                ('con_perfil', configuracion()['PRAGMAS'], True),
+            ):
+                copia = os.path.join(directorio, f'{modo}.sqlite3')
+                self.copiar(origen, copia)
+                self.stdout.write(f'Midiendo {modo} ...')
+                resultados[modo] = self.medir(copia, pragmas, inmediata, opciones)
+
+        self.imprimir(resultados)
+        if opciones['salida']:
+            with open(opciones['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump({
+                    'fecha': datetime.now().isoformat(timespec='seconds'),
+                    'sqlite': sqlite3.sqlite_version,
+                    'parametros': {
+                        clave: opciones[clave] for clave in ('lectores', 'escritores', 'duracion', 'semilla')
+                    },
+                    'resultados': resultados,
+                }, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {opciones['salida']}"))
+
+    def copiar(self, origen, destino):
+        """Copia consistente (incluye lo que aún esté en el WAL del original)"""
+        fuente = sqlite3.connect(origen)
+        copia = sqlite3.connect(destino)
+        try:
+            fuente.backup(copia)
+        finally:
+            fuente.close()
+            copia.close()
+
+    def conectar(self, ruta, pragmas):
+        conexion = sqlite3.connect(ruta, timeout=pragmas.get('busy_timeout', 5000) / 1000,
+                                   isolation_level=None, check_same_thread=False)
+        aplicar_pragmas(conexion, pragmas)
+        return conexion
+
+    def medir(self, ruta, pragmas, inmediata, opciones):
+        conexion = self.conectar(ruta, pragmas)
+        estudiantes = [fila[0] for fila in conexion.execute(
+            'SELECT DISTINCT estudiante_id FROM sgenapp_calificacion LIMIT 5000')]
+        calificaciones = [fila[0] for fila in conexion.execute(
+            'SELECT id FROM sgenapp_calificacion LIMIT 50000')]
+        usuarios = [fila[0] for fila in conexion.execute('SELECT id_usuario FROM sgenapp_usuario LIMIT 1000')]
+        conexion.close()
+        if not (estudiantes and calificaciones and usuarios):
+            raise CommandError('La base no tiene calificaciones; ejecute generar_datos primero')
+
+        lecturas, escrituras, errores = [], [], []
+        lock = threading.Lock()
+        fin = time.perf_counter() + opciones['duracion']
+
+        def lector(semilla):
+            rng = random.Random(semilla)
+            conexion = self.conectar(ruta, pragmas)
+            while time.perf_counter() < fin:
+                inicio = time.perf_counter()
+                try:
+                    conexion.execute(CONSULTA_NOTAS, (rng.choice(estudiantes),)).fetchall()
+                    conexion.execute(CONSULTA_HISTORIAL).fetchall()
+                except sqlite3.OperationalError as error:
+                    with lock:
+                        errores.append(str(error))
+                    continue
+                with lock:
+                    lecturas.append(time.perf_counter() - inicio)
+            conexion.close()
+
+        def escritor(semilla):
+            rng = random.Random(semilla)
+            conexion = self.conectar(ruta, pragmas)
+            while time.perf_counter() < fin:
+                inicio = time.perf_counter()
+                ahora = datetime.now().isoformat()
+                try:
+                    conexion.execute('BEGIN IMMEDIATE' if inmediata else 'BEGIN')
+                    conexion.execute(INSERTAR_ACCION, (rng.choice(usuarios), ahora))
+                    conexion.execute(ACTUALIZAR_NOTA, (round(rng.uniform(0, 5), 1), ahora, rng.choice(calificaciones)))
+                    conexion.execute('COMMIT')
+                except sqlite3.OperationalError as error:
+                    if conexion.in_transaction:
+                        conexion.execute('ROLLBACK')
+                    with lock:
+                        errores.append(str(error))
+                    continue
+                with lock:
+                    escrituras.append(time.perf_counter() - inicio)
+            conexion.close()
+
+        hilos = [threading.Thread(target=lector, args=(opciones['semilla'] + i,))
+                 for i in range(opciones['lectores'])]
+        hilos += [threading.Thread(target=escritor, args=(opciones['semilla'] + 1000 + i,))
+                  for i in range(opciones['escritores'])]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+
+        return {
+            'pragmas': pragmas,
+            'lecturas_por_s': round(len(lecturas) / duracion, 1),
+            'escrituras_por_s': round(len(escrituras) / duracion, 1),
+            'lectura_p50_ms': percentil_ms(lecturas, 50),
+            'lectura_p95_ms': percentil_ms(lecturas, 95),
+            'escritura_p50_ms': percentil_ms(escrituras, 50),
+            'escritura_p95_ms': percentil_ms(escrituras, 95),
+            'errores': len(errores),
+            'ejemplo_error': errores[0] if errores else None,
+        }
+
+    def imprimir(self, resultados):
+        columnas = ['lecturas_por_s', 'escrituras_por_s', 'lectura_p50_ms', 'lectura_p95_ms',
+                    'escritura_p50_ms', 'escritura_p95_ms', 'errores']
+        self.stdout.write(f"{'':<18} {'sin perfil':>12} {'con perfil':>12}")
+        for columna in columnas:
+            self.stdout.write(
+                f"{columna:<18} {str(resultados['sin_perfil'][columna]):>12} {str(resultados['con_perfil'][columna]):>12}"
+            )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from sgenapp.resumen import reconstruir_resumen
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye desde cero la tabla ResumenCalificacion a partir de las calificaciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamano-lote', type=int, default=2000,
+                            help='Filas por cada bulk_create (por defecto 2000)')
+
+    def handle(self, *args, **options):
+        total = reconstruir_resumen(tamano_lote=options['tamano_lote'])
+        self.stdout.write(self.style.SUCCESS(f'Resumen reconstruido: {total} filas'))
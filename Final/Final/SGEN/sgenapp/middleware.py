@@ -0,0 +1,50 @@
+import random
+from contextlib import ExitStack
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import perfilado
+from .auditoria import configuracion, escritor
+
+
+class AuditoriaMiddleware:
+    """Al terminar cada petición pide escribir las entradas de auditoría pendientes"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if configuracion()['MODO'] != 'sincrono':
+            escritor.programar_vaciado()
+        return response
+
+
+class PerfiladoMiddleware:
+    """
+    Mide SQL, plantillas y tiempo total de cada petición (ver perfilado.py).
+    Debe ir primero en MIDDLEWARE para incluir el trabajo de los demás.
+    """
+
+    def __init__(self, get_response):
+        if not perfilado.configuracion()['ACTIVO']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        perfilado.medir_plantillas()
+
+    def __call__(self, request):
+        medicion, token = perfilado.iniciar()
+        try:
+            with ExitStack() as pila:
+                for conexion in connections.all():
+                    pila.enter_context(conexion.execute_wrapper(medicion))
+                response = self.get_response(request)
+        finally:
+            perfilado.terminar(medicion, token)
+
+        response['Server-Timing'] = medicion.server_timing()
+        config = perfilado.configuracion()
+        if medicion.total * 1000 >= config['LENTA_MS'] or random.random() < config['MUESTREO']:
+            perfilado.escribir(medicion.registro(request, response))
+        return response
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField, Q, Sum
+
+
+def poblar_resumen(apps, schema_editor):
+    Calificacion = apps.get_model('sgenapp', 'Calificacion')
+    ResumenCalificacion = apps.get_model('sgenapp', 'ResumenCalificacion')
+    con_nota = Q(nota__isnull=False)
+    filas = (
+        Calificacion.objects.order_by()
+        .values('estudiante_id', 'materia_grupo_id')
+        .annotate(
+            suma_ponderada=Sum(F('nota') * F('tipo_evaluacion__porcentaje'), output_field=FloatField()),
+            porcentaje_evaluado=Sum('tipo_evaluacion__porcentaje', filter=con_nota, output_field=FloatField()),
+            total_notas=Count('id', filter=con_nota),
+        )
+    )
+    ResumenCalificacion.objects.bulk_create([
+        ResumenCalificacion(
+            estudiante_id=fila['estudiante_id'],
+            materia_grupo_id=fila['materia_grupo_id'],
+            promedio=round((fila['suma_ponderada'] or 0) / 100, 2),
+            porcentaje_evaluado=fila['porcentaje_evaluado'] or 0,
+            total_notas=fila['total_notas'],
+        )
+        for fila in filas
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sgenapp', '0005_grupo_capacidad_materia_creditos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenCalificacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('promedio', models.FloatField(default=0)),
+                ('porcentaje_evaluado', models.FloatField(default=0)),
+                ('total_notas', models.PositiveIntegerField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('estudiante', models.ForeignKey(limit_choices_to={'rol': '3'}, on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_calificacion', to=settings.AUTH_USER_MODEL)),
+                ('materia_grupo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_calificacion', to='sgenapp.materiagrupo')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Calificaciones',
+                'verbose_name_plural': 'Resúmenes de Calificaciones',
+                'unique_together': {('estudiante', 'materia_grupo')},
+            },
+        ),
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
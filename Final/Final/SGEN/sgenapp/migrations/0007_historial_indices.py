@@ -0,0 +1,79 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+# Índice de texto completo (FTS5) para buscar en el historial. Sólo aplica en
+# SQLite; los triggers lo mantienen sincronizado con la tabla del modelo.
+FTS_CREAR = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS sgenapp_historialacciones_fts
+    USING fts5(accion, descripcion, username, tokenize='unicode61 remove_diacritics 2')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sgenapp_historialacciones_fts_ai
+    AFTER INSERT ON sgenapp_historialacciones BEGIN
+        INSERT INTO sgenapp_historialacciones_fts(rowid, accion, descripcion, username)
+        VALUES (new.id, new.accion, new.descripcion,
+                (SELECT username FROM sgenapp_usuario WHERE id_usuario = new.usuario_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sgenapp_historialacciones_fts_au
+    AFTER UPDATE ON sgenapp_historialacciones BEGIN
+        UPDATE sgenapp_historialacciones_fts
+        SET accion = new.accion, descripcion = new.descripcion,
+            username = (SELECT username FROM sgenapp_usuario WHERE id_usuario = new.usuario_id)
+        WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sgenapp_historialacciones_fts_ad
+    AFTER DELETE ON sgenapp_historialacciones BEGIN
+        DELETE FROM sgenapp_historialacciones_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    INSERT INTO sgenapp_historialacciones_fts(rowid, accion, descripcion, username)
+    SELECT h.id, h.accion, h.descripcion, u.username
+    FROM sgenapp_historialacciones h JOIN sgenapp_usuario u ON u.id_usuario = h.usuario_id
+    """,
+]
+
+FTS_BORRAR = [
+    'DROP TRIGGER IF EXISTS sgenapp_historialacciones_fts_ai',
+    'DROP TRIGGER IF EXISTS sgenapp_historialacciones_fts_au',
+    'DROP TRIGGER IF EXISTS sgenapp_historialacciones_fts_ad',
+    'DROP TABLE IF EXISTS sgenapp_historialacciones_fts',
+]
+
+
+def _ejecutar_en_sqlite(sentencias):
+    def ejecutar(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in sentencias:
+            schema_editor.execute(sql)
+    return ejecutar
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sgenapp', '0006_resumencalificacion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='historialacciones',
+            index=models.Index(fields=['-fecha_hora', '-id'], name='historial_fecha_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historialacciones',
+            index=models.Index(fields=['usuario', '-fecha_hora'], name='historial_usuario_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historialacciones',
+            index=models.Index(fields=['accion', '-fecha_hora'], name='historial_accion_fecha_idx'),
+        ),
+        migrations.RunPython(_ejecutar_en_sqlite(FTS_CREAR), _ejecutar_en_sqlite(FTS_BORRAR)),
+    ]
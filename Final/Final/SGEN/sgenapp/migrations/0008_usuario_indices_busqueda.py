@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:16
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('sgenapp', '0007_historial_indices'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(fields=['rol', 'documento'], name='usuario_rol_documento_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(django.db.models.functions.text.Upper('first_name'), name='usuario_nombre_upper_idx'),
+        ),
+    ]
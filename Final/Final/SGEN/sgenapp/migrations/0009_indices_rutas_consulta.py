@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sgenapp', '0008_usuario_indices_busqueda'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='calificacion',
+            name='estudiante',
+            field=models.ForeignKey(db_index=False, limit_choices_to={'rol': '3'}, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='calificacion',
+            name='materia_grupo',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='sgenapp.materiagrupo'),
+        ),
+        migrations.AlterField(
+            model_name='estudiantegrupo',
+            name='estudiante',
+            field=models.ForeignKey(db_index=False, limit_choices_to={'rol': '3'}, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='estudiantegrupo',
+            name='grupo',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='sgenapp.grupo'),
+        ),
+        migrations.AlterField(
+            model_name='materiagrupo',
+            name='profesor',
+            field=models.ForeignKey(db_index=False, limit_choices_to={'rol': '2'}, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='calificacion',
+            index=models.Index(fields=['materia_grupo', 'tipo_evaluacion', 'estudiante'], include=('nota',), name='calificacion_planilla_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='estudiantegrupo',
+            index=models.Index(fields=['grupo', 'estudiante'], name='estudiantegrupo_grupo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='materiagrupo',
+            index=models.Index(fields=['profesor', 'grupo'], include=('materia',), name='materiagrupo_profesor_idx'),
+        ),
+    ]
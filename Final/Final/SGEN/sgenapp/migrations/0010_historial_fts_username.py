@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:05
+
+from django.db import migrations
+
+# El índice FTS5 del historial (0007) guarda una copia del username de cada
+# acción. Al renombrar un usuario se reescriben las filas de sus acciones, para
+# que la búsqueda por el nombre nuevo encuentre también su historial anterior.
+TRIGGER_CREAR = [
+    """
+    CREATE TRIGGER IF NOT EXISTS sgenapp_usuario_fts_username_au
+    AFTER UPDATE OF username ON sgenapp_usuario
+    WHEN old.username IS NOT new.username BEGIN
+        UPDATE sgenapp_historialacciones_fts SET username = new.username
+        WHERE rowid IN (SELECT id FROM sgenapp_historialacciones WHERE usuario_id = new.id_usuario);
+    END
+    """,
+    # Acciones de usuarios renombrados antes de esta migración
+    """
+    UPDATE sgenapp_historialacciones_fts
+    SET username = (
+        SELECT u.username FROM sgenapp_historialacciones h
+        JOIN sgenapp_usuario u ON u.id_usuario = h.usuario_id
+        WHERE h.id = sgenapp_historialacciones_fts.rowid
+    )
+    WHERE username IS NOT (
+        SELECT u.username FROM sgenapp_historialacciones h
+        JOIN sgenapp_usuario u ON u.id_usuario = h.usuario_id
+        WHERE h.id = sgenapp_historialacciones_fts.rowid
+    )
+    """,
+]
+
+TRIGGER_BORRAR = [
+    'DROP TRIGGER IF EXISTS sgenapp_usuario_fts_username_au',
+]
+
+
+def _ejecutar_en_sqlite(sentencias):
+    def ejecutar(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in sentencias:
+            schema_editor.execute(sql)
+    return ejecutar
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sgenapp', '0009_indices_rutas_consulta'),
+    ]
+
+    operations = [
+        migrations.RunPython(_ejecutar_en_sqlite(TRIGGER_CREAR), _ejecutar_en_sqlite(TRIGGER_BORRAR)),
+    ]
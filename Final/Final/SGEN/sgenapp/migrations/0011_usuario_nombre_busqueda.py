@@ -0,0 +1,101 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:40
+
+import unicodedata
+
+import sgenapp.models
+from django.db import migrations, models
+
+
+# Agregar una columna NOT NULL en SQLite rehace la tabla sgenapp_usuario: se
+# pierde el trigger de 0010 y el cambio de nombre de la tabla falla mientras
+# existan los triggers del FTS del historial (0007) que la consultan. Se
+# borran antes y se vuelven a crear igual que en esas migraciones.
+TRIGGERS_CREAR = [
+    """
+    CREATE TRIGGER IF NOT EXISTS sgenapp_historialacciones_fts_ai
+    AFTER INSERT ON sgenapp_historialacciones BEGIN
+        INSERT INTO sgenapp_historialacciones_fts(rowid, accion, descripcion, username)
+        VALUES (new.id, new.accion, new.descripcion,
+                (SELECT username FROM sgenapp_usuario WHERE id_usuario = new.usuario_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sgenapp_historialacciones_fts_au
+    AFTER UPDATE ON sgenapp_historialacciones BEGIN
+        UPDATE sgenapp_historialacciones_fts
+        SET accion = new.accion, descripcion = new.descripcion,
+            username = (SELECT username FROM sgenapp_usuario WHERE id_usuario = new.usuario_id)
+        WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sgenapp_usuario_fts_username_au
+    AFTER UPDATE OF username ON sgenapp_usuario
+    WHEN old.username IS NOT new.username BEGIN
+        UPDATE sgenapp_historialacciones_fts SET username = new.username
+        WHERE rowid IN (SELECT id FROM sgenapp_historialacciones WHERE usuario_id = new.id_usuario);
+    END
+    """,
+]
+
+TRIGGERS_BORRAR = [
+    'DROP TRIGGER IF EXISTS sgenapp_historialacciones_fts_ai',
+    'DROP TRIGGER IF EXISTS sgenapp_historialacciones_fts_au',
+    'DROP TRIGGER IF EXISTS sgenapp_usuario_fts_username_au',
+]
+
+
+def _ejecutar_en_sqlite(sentencias):
+    def ejecutar(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in sentencias:
+            schema_editor.execute(sql)
+    return ejecutar
+
+
+def _normalizar(texto):
+    # Copia de models.normalizar_busqueda: la migración no debe cambiar si esa función cambia
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+
+def llenar_nombre_busqueda(apps, schema_editor):
+    Usuario = apps.get_model('sgenapp', 'Usuario')
+    pendientes = []
+    for usuario in Usuario.objects.only('first_name', 'last_name').iterator(chunk_size=2000):
+        nombre = ' '.join(filter(None, (usuario.first_name, usuario.last_name)))
+        usuario.nombre_busqueda = _normalizar(nombre)[:300]
+        pendientes.append(usuario)
+        if len(pendientes) == 2000:
+            Usuario.objects.bulk_update(pendientes, ['nombre_busqueda'])
+            pendientes = []
+    Usuario.objects.bulk_update(pendientes, ['nombre_busqueda'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sgenapp', '0010_historial_fts_username'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='usuario',
+            managers=[
+                ('objects', sgenapp.models.UsuarioManager()),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='usuario',
+            name='usuario_nombre_upper_idx',
+        ),
+        migrations.RunPython(_ejecutar_en_sqlite(TRIGGERS_BORRAR), _ejecutar_en_sqlite(TRIGGERS_CREAR)),
+        migrations.AddField(
+            model_name='usuario',
+            name='nombre_busqueda',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=300),
+        ),
+        migrations.RunPython(_ejecutar_en_sqlite(TRIGGERS_CREAR), _ejecutar_en_sqlite(TRIGGERS_BORRAR)),
+        migrations.RunPython(llenar_nombre_busqueda, migrations.RunPython.noop),
+    ]
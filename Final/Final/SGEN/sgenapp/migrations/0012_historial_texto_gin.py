@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:20
+
+from django.db import migrations
+
+# Búsqueda libre del historial en PostgreSQL (historial.buscar_texto). En SQLite
+# la resuelve la tabla FTS5 de 0007, así que no se crea nada.
+INDICE_CREAR = [
+    """
+    CREATE INDEX IF NOT EXISTS historial_texto_gin ON sgenapp_historialacciones
+    USING gin (to_tsvector('simple', accion || ' ' || descripcion))
+    """,
+]
+
+INDICE_BORRAR = [
+    'DROP INDEX IF EXISTS historial_texto_gin',
+]
+
+
+def _ejecutar_en_postgresql(sentencias):
+    def ejecutar(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for sql in sentencias:
+            schema_editor.execute(sql)
+    return ejecutar
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sgenapp', '0011_usuario_nombre_busqueda'),
+    ]
+
+    operations = [
+        migrations.RunPython(_ejecutar_en_postgresql(INDICE_CREAR), _ejecutar_en_postgresql(INDICE_BORRAR)),
+    ]
@@ -1,5 +1,26 @@
+import unicodedata
+
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
+
+LARGO_NOMBRE_BUSQUEDA = 300
+
+
+def normalizar_busqueda(texto):
+    """Texto sin tildes y en minúsculas (casefold) para comparar nombres en la búsqueda"""
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+
+class UsuarioManager(UserManager):
+    """bulk_create no llama a save(): calcula aquí el nombre de búsqueda"""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for usuario in objs:
+            usuario.nombre_busqueda = usuario.calcular_nombre_busqueda()
+        return super().bulk_create(objs, *args, **kwargs)
+
 
 class Usuario(AbstractUser):
     """Clase base para todos los usuarios del sistema"""
@@ -12,14 +33,33 @@ class Usuario(AbstractUser):
     id_usuario = models.AutoField(primary_key=True)
     documento = models.CharField(max_length=20, unique=True)
     rol = models.CharField(max_length=1, choices=ROLES, default='3')
+    # Nombre completo normalizado con normalizar_busqueda; lo mantienen save() y bulk_create
+    nombre_busqueda = models.CharField(max_length=LARGO_NOMBRE_BUSQUEDA, blank=True, editable=False, db_index=True)
+
+    objects = UsuarioManager()
     
     class Meta:
         verbose_name = 'Usuario'
         verbose_name_plural = 'Usuarios'
+        indexes = [
+            # Búsqueda por prefijo en el selector de estudiantes
+            models.Index(fields=['rol', 'documento'], name='usuario_rol_documento_idx'),
+        ]
     
     def __str__(self):
         return f"{self.username} ({self.get_rol_display()})"
 
+    def calcular_nombre_busqueda(self):
+        nombre = ' '.join(filter(None, (self.first_name, self.last_name)))
+        return normalizar_busqueda(nombre)[:LARGO_NOMBRE_BUSQUEDA]
+
+    def save(self, *args, **kwargs):
+        self.nombre_busqueda = self.calcular_nombre_busqueda()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'first_name', 'last_name'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'nombre_busqueda'}
+        super().save(*args, **kwargs)
+
 
 class Admin(models.Model):
     """Administrador con privilegios especiales"""
@@ -117,12 +157,16 @@ class MateriaGrupo(models.Model):
     """Relación entre Materia, Grupo y Profesor"""
     materia = models.ForeignKey(Materia, on_delete=models.CASCADE)
     grupo = models.ForeignKey(Grupo, on_delete=models.CASCADE)
-    profesor = models.ForeignKey(Usuario, on_delete=models.SET_NULL, null=True, limit_choices_to={'rol': '2'})
+    profesor = models.ForeignKey(Usuario, on_delete=models.SET_NULL, null=True, limit_choices_to={'rol': '2'}, db_index=False)
     
     class Meta:
         verbose_name = 'Materia-Grupo'
         verbose_name_plural = 'Materias-Grupos'
         unique_together = ('materia', 'grupo')
+        indexes = [
+            # Materias de un profesor (panel, ingreso de notas); reemplaza el índice simple de profesor
+            models.Index(fields=['profesor', 'grupo'], include=['materia'], name='materiagrupo_profesor_idx'),
+        ]
     
     def __str__(self):
         return f"{self.materia.codigo} - {self.grupo.nombre}"
@@ -130,14 +174,19 @@ class MateriaGrupo(models.Model):
 
 class EstudianteGrupo(models.Model):
     """Relación entre Estudiante y Grupo (inscripción)"""
-    estudiante = models.ForeignKey(Usuario, on_delete=models.CASCADE, limit_choices_to={'rol': '3'})
-    grupo = models.ForeignKey(Grupo, on_delete=models.CASCADE)
+    # Los índices simples sobran: unique_together empieza por estudiante y el índice de grupo cubre grupo
+    estudiante = models.ForeignKey(Usuario, on_delete=models.CASCADE, limit_choices_to={'rol': '3'}, db_index=False)
+    grupo = models.ForeignKey(Grupo, on_delete=models.CASCADE, db_index=False)
     fecha_inscripcion = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         verbose_name = 'Estudiante-Grupo'
         verbose_name_plural = 'Estudiantes-Grupos'
         unique_together = ('estudiante', 'grupo')
+        indexes = [
+            # Estudiantes de un grupo sin leer la tabla
+            models.Index(fields=['grupo', 'estudiante'], name='estudiantegrupo_grupo_idx'),
+        ]
     
     def __str__(self):
         return f"{self.estudiante.username} - {self.grupo.nombre}"
@@ -158,8 +207,9 @@ class TipoEvaluacion(models.Model):
 
 class Calificacion(models.Model):
     """Calificaciones de estudiantes"""
-    estudiante = models.ForeignKey(Usuario, on_delete=models.CASCADE, limit_choices_to={'rol': '3'})
-    materia_grupo = models.ForeignKey(MateriaGrupo, on_delete=models.CASCADE)
+    # estudiante lo cubre unique_together y materia_grupo el índice de planilla
+    estudiante = models.ForeignKey(Usuario, on_delete=models.CASCADE, limit_choices_to={'rol': '3'}, db_index=False)
+    materia_grupo = models.ForeignKey(MateriaGrupo, on_delete=models.CASCADE, db_index=False)
     tipo_evaluacion = models.ForeignKey(TipoEvaluacion, on_delete=models.CASCADE)
     nota = models.FloatField(null=True, blank=True)
     observacion = models.TextField(blank=True)
@@ -179,6 +229,13 @@ class Calificacion(models.Model):
         verbose_name = 'Calificación'
         verbose_name_plural = 'Calificaciones'
         unique_together = ('estudiante', 'materia_grupo', 'tipo_evaluacion')
+        indexes = [
+            # Planilla de una evaluación, resumen por materia-grupo y reportes por grupo
+            models.Index(
+                fields=['materia_grupo', 'tipo_evaluacion', 'estudiante'], include=['nota'],
+                name='calificacion_planilla_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.estudiante.username} - {self.materia_grupo.materia.codigo}: {self.nota}"
@@ -196,6 +253,29 @@ class HistorialAcciones(models.Model):
         verbose_name = 'Historial de Acciones'
         verbose_name_plural = 'Historiales de Acciones'
         ordering = ['-fecha_hora']
+        indexes = [
+            models.Index(fields=['-fecha_hora', '-id'], name='historial_fecha_id_idx'),
+            models.Index(fields=['usuario', '-fecha_hora'], name='historial_usuario_fecha_idx'),
+            models.Index(fields=['accion', '-fecha_hora'], name='historial_accion_fecha_idx'),
+        ]
     
     def __str__(self):
         return f"{self.usuario.username} - {self.accion} ({self.fecha_hora})"
+
+
+class ResumenCalificacion(models.Model):
+    """Resumen materializado de las calificaciones de un estudiante en una materia-grupo"""
+    estudiante = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='resumenes_calificacion', limit_choices_to={'rol': '3'})
+    materia_grupo = models.ForeignKey(MateriaGrupo, on_delete=models.CASCADE, related_name='resumenes_calificacion')
+    promedio = models.FloatField(default=0)  # Promedio ponderado acumulado
+    porcentaje_evaluado = models.FloatField(default=0)  # Suma de porcentajes con nota registrada
+    total_notas = models.PositiveIntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Resumen de Calificaciones'
+        verbose_name_plural = 'Resúmenes de Calificaciones'
+        unique_together = ('estudiante', 'materia_grupo')
+    
+    def __str__(self):
+        return f"{self.estudiante.username} - {self.materia_grupo}: {self.promedio}"
@@ -0,0 +1,110 @@
+"""
+Paginación por cursor (keyset) para listados grandes.
+
+En lugar de OFFSET, cada página se pide a partir de los valores de ordenamiento
+del último (o primer) registro mostrado, así el costo de una página no crece
+con el tamaño de la tabla. El cursor viaja en la URL como un token opaco.
+"""
+
+import base64
+import json
+import math
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class PaginaKeyset:
+    """Resultado de una página: objetos y cursores para navegar"""
+
+    def __init__(self, objetos, cursor_siguiente=None, cursor_anterior=None):
+        self.objetos = objetos
+        self.cursor_siguiente = cursor_siguiente
+        self.cursor_anterior = cursor_anterior
+
+    def __iter__(self):
+        return iter(self.objetos)
+
+    def __len__(self):
+        return len(self.objetos)
+
+
+def _campos(ordenamiento):
+    return [(campo.lstrip('-'), campo.startswith('-')) for campo in ordenamiento]
+
+
+def _codificar(obj, campos):
+    valores = [getattr(obj, nombre) for nombre, _ in campos]
+    datos = json.dumps([v.isoformat() if hasattr(v, 'isoformat') else v for v in valores])
+    return base64.urlsafe_b64encode(datos.encode()).decode().rstrip('=')
+
+
+def _decodificar(cursor, modelo, campos):
+    """
+    Valores del cursor validados con clean() de cada campo, o None si el
+    cursor no sirve. Rechaza null y números no finitos: el cursor viene del
+    cliente y sus valores terminan en el WHERE.
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(valores, list) or len(valores) != len(campos):
+            return None
+        limpios = []
+        for (nombre, _), valor in zip(campos, valores):
+            if valor is None or (isinstance(valor, float) and not math.isfinite(valor)):
+                return None
+            limpios.append(modelo._meta.get_field(nombre).clean(valor, None))
+        return limpios
+    except (ValueError, TypeError, OverflowError, ValidationError):
+        return None
+
+
+def _condicion(campos, valores, hacia_adelante):
+    """Comparación lexicográfica (a, b) > (x, y) expresada con Q"""
+    condicion = Q()
+    for i, (nombre, descendente) in enumerate(campos):
+        iguales = {campos[j][0]: valores[j] for j in range(i)}
+        lookup = 'lt' if descendente == hacia_adelante else 'gt'
+        condicion |= Q(**iguales, **{f'{nombre}__{lookup}': valores[i]})
+    return condicion
+
+
+def paginar_keyset(queryset, ordenamiento, despues=None, antes=None, tamano=50):
+    """
+    Devuelve una PaginaKeyset de `queryset` ordenado por `ordenamiento`.
+
+    `ordenamiento` debe identificar cada fila de forma única (por ejemplo
+    ['-fecha_hora', '-id']). `despues` pide la página siguiente al cursor y
+    `antes` la anterior; sin ninguno de los dos se devuelve la primera página.
+    Un cursor inválido se ignora.
+    """
+    campos = _campos(ordenamiento)
+    modelo = queryset.model
+
+    valores_antes = _decodificar(antes, modelo, campos) if antes else None
+    if valores_antes is not None:
+        invertido = [('' if campo.startswith('-') else '-') + campo.lstrip('-') for campo in ordenamiento]
+        filas = list(
+            queryset.filter(_condicion(campos, valores_antes, hacia_adelante=False))
+            .order_by(*invertido)[:tamano + 1]
+        )
+        hay_mas = len(filas) > tamano
+        objetos = filas[:tamano][::-1]
+        return PaginaKeyset(
+            objetos,
+            cursor_siguiente=_codificar(objetos[-1], campos) if objetos else None,
+            cursor_anterior=_codificar(objetos[0], campos) if hay_mas else None,
+        )
+
+    valores_despues = _decodificar(despues, modelo, campos) if despues else None
+    if valores_despues is not None:
+        queryset = queryset.filter(_condicion(campos, valores_despues, hacia_adelante=True))
+    filas = list(queryset.order_by(*ordenamiento)[:tamano + 1])
+    hay_mas = len(filas) > tamano
+    objetos = filas[:tamano]
+    return PaginaKeyset(
+        objetos,
+        cursor_siguiente=_codificar(objetos[-1], campos) if hay_mas else None,
+        cursor_anterior=_codificar(objetos[0], campos) if valores_despues is not None and objetos else None,
+    )
@@ -0,0 +1,45 @@
+"""
+Perfil de rendimiento para SQLite.
+
+Cada conexión nueva recibe los PRAGMA de settings.SQLITE_PERFIL (señal
+connection_created en signals.py). Con journal_mode=WAL los lectores ya no
+esperan a que termine cada escritura de Calificacion o HistorialAcciones, y
+synchronous=NORMAL reduce los fsync por transacción sin riesgo de corrupción
+en modo WAL (sólo se pueden perder las últimas transacciones ante un corte de
+luz).
+
+Configuración en settings.SQLITE_PERFIL:
+    ACTIVO: aplica el perfil
+    PRAGMAS: dict {pragma: valor} que se ejecuta en orden
+"""
+
+from django.conf import settings
+
+# Los PRAGMA viven sólo en settings.SQLITE_PERFIL; sin ese ajuste no se ejecuta ninguno
+CONFIGURACION_POR_DEFECTO = {
+    'ACTIVO': True,
+    'PRAGMAS': {},
+}
+
+
+def configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'SQLITE_PERFIL', {})}
+
+
+def sentencias(pragmas):
+    return [f'PRAGMA {nombre} = {valor}' for nombre, valor in pragmas.items()]
+
+
+def aplicar_pragmas(cursor, pragmas):
+    """Ejecuta los PRAGMA con un cursor de Django o de sqlite3"""
+    for sentencia in sentencias(pragmas):
+        cursor.execute(sentencia)
+
+
+def aplicar_perfil(connection):
+    """Aplica el perfil a una conexión de Django recién abierta (si es SQLite)"""
+    config = configuracion()
+    if connection.vendor != 'sqlite' or not config['ACTIVO']:
+        return
+    with connection.cursor() as cursor:
+        aplicar_pragmas(cursor, config['PRAGMAS'])
@@ -0,0 +1,265 @@
+"""
+Perfilado por petición: tiempo total, SQL, plantillas y consultas repetidas.
+
+PerfiladoMiddleware (opcional, settings.PERFILADO['ACTIVO']) mide cada
+petición y agrega la cabecera Server-Timing. Una muestra de las peticiones se
+escribe como JSON, una por línea, en un log rotativo que la página
+admin_perfilado resume en dos rankings: vistas más lentas y peores N+1.
+
+Configuración en settings.PERFILADO:
+    ACTIVO: activa el middleware
+    MUESTREO: fracción de peticiones que se escriben en el log (0 a 1)
+    LENTA_MS: las peticiones más lentas que esto se escriben siempre
+    ARCHIVO: ruta del log (por defecto BASE_DIR / 'perfilado.log')
+    TAMANO_MAXIMO, RESPALDOS: rotación del log
+    UMBRAL_REPETIDAS: veces que una misma consulta debe repetirse para marcarla como N+1
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+CONFIGURACION_POR_DEFECTO = {
+    'ACTIVO': False,
+    'MUESTREO': 0.1,
+    'LENTA_MS': 500,
+    'ARCHIVO': None,
+    'TAMANO_MAXIMO': 5 * 1024 * 1024,
+    'RESPALDOS': 3,
+    'UMBRAL_REPETIDAS': 5,
+}
+
+_medicion_actual = contextvars.ContextVar('medicion_perfilado', default=None)
+_lock_registro = threading.Lock()
+_manejador = None
+
+# "IN (%s, %s, %s)" con cualquier cantidad de parámetros cuenta como la misma consulta
+_LISTA_PARAMETROS = re.compile(r'%s(?:\s*,\s*%s)+')
+
+
+def configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'PERFILADO', {})}
+
+
+def archivo_log():
+    return Path(configuracion()['ARCHIVO'] or Path(settings.BASE_DIR) / 'perfilado.log')
+
+
+def forma_consulta(sql):
+    return _LISTA_PARAMETROS.sub('%s…', sql)
+
+
+class Medicion:
+    """Acumula los tiempos de una petición; también es el execute_wrapper de la BD"""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.total = 0.0
+        self.sql = 0.0
+        self.sql_en_plantilla = 0.0
+        self.plantilla = 0.0
+        self.profundidad_plantilla = 0
+        self.formas = Counter()
+        self.exactas = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.sql += duracion
+            if self.profundidad_plantilla:
+                self.sql_en_plantilla += duracion
+            self.formas[forma_consulta(sql)] += 1
+            self.exactas[(sql, repr(params))] += 1
+
+    @property
+    def consultas(self):
+        return sum(self.formas.values())
+
+    @property
+    def duplicadas(self):
+        """Consultas idénticas (mismo SQL y parámetros) que sobran"""
+        return sum(veces - 1 for veces in self.exactas.values())
+
+    def mas_repetida(self):
+        if not self.formas:
+            return None, 0
+        return self.formas.most_common(1)[0]
+
+    def tiempos_ms(self):
+        plantilla = max(self.plantilla - self.sql_en_plantilla, 0)
+        return {
+            'total_ms': round(self.total * 1000, 2),
+            'sql_ms': round(self.sql * 1000, 2),
+            'plantilla_ms': round(plantilla * 1000, 2),
+            'python_ms': round(max(self.total - self.sql - plantilla, 0) * 1000, 2),
+        }
+
+    def server_timing(self):
+        tiempos = self.tiempos_ms()
+        return ', '.join([
+            f'sql;dur={tiempos["sql_ms"]};desc="{self.consultas} consultas, {self.duplicadas} duplicadas"',
+            f'plantilla;dur={tiempos["plantilla_ms"]}',
+            f'python;dur={tiempos["python_ms"]}',
+            f'total;dur={tiempos["total_ms"]}',
+        ])
+
+    def registro(self, request, response):
+        forma, repeticiones = self.mas_repetida()
+        coincidencia = getattr(request, 'resolver_match', None)
+        return {
+            'fecha': timezone.now().isoformat(timespec='seconds'),
+            'vista': coincidencia.view_name if coincidencia else None,
+            'ruta': request.path,
+            'metodo': request.method,
+            'estado': response.status_code,
+            **self.tiempos_ms(),
+            'consultas': self.consultas,
+            'duplicadas': self.duplicadas,
+            'repeticion_max': repeticiones,
+            'consulta_repetida': forma[:500] if repeticiones >= configuracion()['UMBRAL_REPETIDAS'] else None,
+        }
+
+
+def medir_plantillas():
+    """
+    Envuelve el render de las plantillas de Django para sumar su tiempo a la
+    medición en curso. Sólo cuenta el render externo: los {% include %} ya
+    quedan dentro de él.
+    """
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, 'perfilado', False):
+        return
+    original = Template.render
+
+    @functools.wraps(original)
+    def render(self, context=None, request=None):
+        medicion = _medicion_actual.get()
+        if medicion is None:
+            return original(self, context, request)
+        medicion.profundidad_plantilla += 1
+        inicio = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            medicion.profundidad_plantilla -= 1
+            if not medicion.profundidad_plantilla:
+                medicion.plantilla += time.perf_counter() - inicio
+
+    render.perfilado = True
+    Template.render = render
+
+
+def iniciar():
+    medicion = Medicion()
+    return medicion, _medicion_actual.set(medicion)
+
+
+def terminar(medicion, token):
+    medicion.total = time.perf_counter() - medicion.inicio
+    _medicion_actual.reset(token)
+
+
+def _logger():
+    global _manejador
+    logger = logging.getLogger('sgenapp.perfilado')
+    with _lock_registro:
+        ruta = archivo_log()
+        if _manejador is None or Path(_manejador.baseFilename) != ruta.resolve():
+            if _manejador is not None:
+                logger.removeHandler(_manejador)
+                _manejador.close()
+            config = configuracion()
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            _manejador = RotatingFileHandler(
+                ruta, maxBytes=config['TAMANO_MAXIMO'], backupCount=config['RESPALDOS'], encoding='utf-8'
+            )
+            _manejador.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(_manejador)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+    return logger
+
+
+def escribir(registro):
+    _logger().info(json.dumps(registro, ensure_ascii=False))
+
+
+# ============ LECTURA Y RANKINGS ============
+
+def leer_registros(limite=20000):
+    """Últimos `limite` registros del log y sus respaldos, del más antiguo al más reciente"""
+    ruta = archivo_log()
+    archivos = [ruta.with_name(f'{ruta.name}.{i}') for i in range(configuracion()['RESPALDOS'], 0, -1)] + [ruta]
+    lineas = []
+    for archivo in archivos:
+        try:
+            with open(archivo, encoding='utf-8') as contenido:
+                lineas.extend(contenido.readlines())
+        except OSError:
+            continue
+    registros = []
+    for linea in lineas[-limite:]:
+        try:
+            registros.append(json.loads(linea))
+        except ValueError:
+            continue
+    return registros
+
+
+def _p95(valores):
+    ordenados = sorted(valores)
+    return ordenados[max(0, -(-95 * len(ordenados) // 100) - 1)]
+
+
+def ranking_vistas(registros, limite=25):
+    """Vistas ordenadas por p95 del tiempo total"""
+    por_vista = {}
+    for r in registros:
+        por_vista.setdefault(r.get('vista') or r.get('ruta'), []).append(r)
+    filas = []
+    for vista, lista in por_vista.items():
+        totales = [r['total_ms'] for r in lista]
+        filas.append({
+            'vista': vista,
+            'peticiones': len(lista),
+            'media_ms': round(sum(totales) / len(lista), 2),
+            'p95_ms': _p95(totales),
+            'max_ms': max(totales),
+            'sql_ms': round(sum(r['sql_ms'] for r in lista) / len(lista), 2),
+            'plantilla_ms': round(sum(r['plantilla_ms'] for r in lista) / len(lista), 2),
+            'consultas': round(sum(r['consultas'] for r in lista) / len(lista), 1),
+        })
+    filas.sort(key=lambda f: f['p95_ms'], reverse=True)
+    return filas[:limite]
+
+
+def ranking_n_mas_1(registros, limite=25):
+    """Consultas repetidas por vista, ordenadas por el máximo de repeticiones en una petición"""
+    grupos = {}
+    for r in registros:
+        if not r.get('consulta_repetida'):
+            continue
+        clave = (r.get('vista') or r.get('ruta'), r['consulta_repetida'])
+        fila = grupos.setdefault(clave, {
+            'vista': clave[0], 'consulta': clave[1], 'peticiones': 0, 'repeticion_max': 0, 'ruta': r['ruta'],
+        })
+        fila['peticiones'] += 1
+        if r['repeticion_max'] > fila['repeticion_max']:
+            fila['repeticion_max'] = r['repeticion_max']
+            fila['ruta'] = r['ruta']
+    filas = sorted(grupos.values(), key=lambda f: (f['repeticion_max'], f['peticiones']), reverse=True)
+    return filas[:limite]
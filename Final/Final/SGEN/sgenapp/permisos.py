@@ -0,0 +1,104 @@
+"""
+Control de acceso por rol y permisos de perfil.
+
+Las vistas se protegen con @rol_requerido('2', permiso='puede_ingresar_calificaciones')
+en lugar de repetir la comprobación de request.user.rol. El rol ya viene con
+el usuario de la sesión; los permisos (campos puede_* de Admin, Profesor y
+Estudiante) se leen con una consulta al iniciar sesión y se guardan en caché
+por usuario, de modo que las peticiones siguientes no consultan el perfil.
+Las señales invalidan la entrada cuando se modifica un perfil o el rol del
+usuario.
+
+Un usuario sin fila de perfil (creado por fuera del panel) tiene los valores
+por defecto de los campos del modelo.
+"""
+
+from functools import wraps
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.shortcuts import redirect
+
+from .models import Admin, Estudiante, Profesor
+
+PERFILES = {'1': Admin, '2': Profesor, '3': Estudiante}
+INICIO_POR_ROL = {'1': 'admin_dashboard', '2': 'profesor_dashboard', '3': 'estudiante_dashboard'}
+NOMBRE_ROL = {'1': 'administrador', '2': 'profesor', '3': 'estudiante'}
+EXPIRACION = 60 * 60  # segundos; las señales invalidan antes si cambia el perfil
+
+
+def campos_permiso(perfil):
+    """Nombres de los campos puede_* del modelo de perfil"""
+    return [campo.name for campo in perfil._meta.fields if campo.name.startswith('puede_')]
+
+
+PERMISOS_POR_ROL = {rol: campos_permiso(perfil) for rol, perfil in PERFILES.items()}
+
+
+def clave_cache(usuario_id, rol):
+    return f'sgen:permisos:{usuario_id}:{rol}'
+
+
+def cargar_permisos(usuario):
+    """Lee los permisos del perfil con una consulta y los deja en caché"""
+    perfil = PERFILES.get(usuario.rol)
+    if perfil is None:
+        permisos = {}
+    else:
+        campos = PERMISOS_POR_ROL[usuario.rol]
+        permisos = perfil.objects.filter(usuario_id=usuario.pk).values(*campos).first()
+        if permisos is None:
+            permisos = {campo: perfil._meta.get_field(campo).get_default() for campo in campos}
+    cache.set(clave_cache(usuario.pk, usuario.rol), permisos, EXPIRACION)
+    return permisos
+
+
+def permisos_de(request):
+    """Permisos del usuario autenticado; una sola lectura de caché por petición"""
+    if not hasattr(request, '_permisos'):
+        usuario = request.user
+        permisos = cache.get(clave_cache(usuario.pk, usuario.rol))
+        request._permisos = permisos if permisos is not None else cargar_permisos(usuario)
+    return request._permisos
+
+
+def tiene_permiso(request, permiso):
+    return bool(permisos_de(request).get(permiso, False))
+
+
+def invalidar_permisos(usuario_id):
+    cache.delete_many([clave_cache(usuario_id, rol) for rol in PERFILES])
+
+
+def inicio_de(usuario):
+    """Nombre de la URL del panel que corresponde al rol del usuario"""
+    return INICIO_POR_ROL.get(usuario.rol, 'estudiante_dashboard')
+
+
+def rol_requerido(*roles, permiso=None, json=False):
+    """
+    Exige sesión iniciada, uno de `roles` y, si se indica, que el perfil tenga
+    el permiso `permiso`. Sin sesión redirige al login; con otro rol vuelve al
+    login (que lleva a su panel) y sin el permiso vuelve a su panel con un
+    mensaje. Con json=True responde 403 en JSON en lugar de redirigir.
+    """
+    def decorador(vista):
+        @login_required(login_url='login')
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if request.user.rol not in roles:
+                if json:
+                    return JsonResponse({'error': 'No autorizado'}, status=403)
+                if len(roles) == 1:
+                    messages.error(request, f'No tiene permisos de {NOMBRE_ROL[roles[0]]}.')
+                return redirect('login')
+            if permiso and not tiene_permiso(request, permiso):
+                if json:
+                    return JsonResponse({'error': 'No autorizado'}, status=403)
+                messages.error(request, 'No tiene permiso para realizar esta acción.')
+                return redirect(inicio_de(request.user))
+            return vista(request, *args, **kwargs)
+        return envoltura
+    return decorador
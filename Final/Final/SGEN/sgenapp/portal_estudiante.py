@@ -0,0 +1,321 @@
+"""
+Datos del portal del estudiante.
+
+Las tres vistas del estudiante (panel, selección de materia y notas) usan el
+mismo modelo de vista: las materias-grupo en las que está inscrito, con
+materia, grupo, período y profesor, sus calificaciones y su promedio del
+resumen. construir_portales arma el de varios estudiantes a la vez con tres
+consultas en total y el resultado se guarda en caché por estudiante como dicts
+simples, con la misma forma que esperan las plantillas (mg.materia.nombre,
+cal.tipo_evaluacion.porcentaje, ...).
+
+Invalidación: cada entrada lleva la generación (global) y la versión del
+estudiante que estaban vigentes antes de consultar la base de datos, y sólo
+se usa mientras ambas sigan iguales.
+    - Las notas de un estudiante (Calificacion, guardar_calificaciones) y sus
+      inscripciones cambian su versión: invalidar_portal(ids).
+    - Los cambios de estructura (materias, grupos, períodos, tipos de
+      evaluación, asignación de profesores) cambian la generación y con ello
+      todas las entradas: invalidar_portales().
+Ambas se aplican al confirmar la transacción. Una lectura concurrente que
+consultó antes de la confirmación y guarda después deja una entrada con la
+versión anterior, que ya no se usa: no se pueden servir notas viejas hasta
+que la entrada expire.
+
+Calentamiento: después de guardar una planilla, calentar_portales(ids) vuelve
+a armar en una sola pasada los portales de los estudiantes afectados y los
+deja en caché antes de que lleguen a consultar sus notas. En modo 'asincrono'
+lo hace un hilo en segundo plano (como la auditoría); en 'sincrono' al
+confirmar la transacción. Si varios pedidos encuentran vacía la misma entrada,
+sólo uno la calcula y los demás esperan su resultado (vuelo único).
+
+Configuración en settings.PORTAL_ESTUDIANTE:
+    CALENTAMIENTO: 'asincrono' o 'sincrono'
+    EXPIRACION: segundos que vive cada entrada
+    TAMANO_LOTE: estudiantes por pasada de calentamiento
+    ESPERA_MAXIMA: segundos que un pedido espera el cálculo de otro
+"""
+
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+
+from .models import Calificacion, MateriaGrupo, ResumenCalificacion
+
+logger = logging.getLogger(__name__)
+
+CLAVE_GENERACION = 'sgen:portal:generacion'
+INTERVALO_ESPERA = 0.05  # segundos entre consultas a la caché mientras otro calcula
+
+CONFIGURACION_POR_DEFECTO = {
+    'CALENTAMIENTO': 'asincrono',
+    'EXPIRACION': 15 * 60,
+    'TAMANO_LOTE': 500,
+    'ESPERA_MAXIMA': 2.0,
+}
+
+
+def configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'PORTAL_ESTUDIANTE', {})}
+
+
+def clave_cache(estudiante_id):
+    return f'sgen:portal:{estudiante_id}'
+
+
+def clave_version(estudiante_id):
+    return f'sgen:portal:{estudiante_id}:version'
+
+
+def construir_portales(estudiante_ids):
+    """Arma el modelo de vista de varios estudiantes con tres consultas: {estudiante_id: portal}"""
+    estudiante_ids = list(estudiante_ids)
+    portales = {estudiante_id: {'secciones': []} for estudiante_id in estudiante_ids}
+    if not estudiante_ids:
+        return portales
+
+    # Una fila por (estudiante, sección), sólo con las columnas que se muestran
+    filas = list(
+        MateriaGrupo.objects
+        .filter(grupo__estudiantegrupo__estudiante_id__in=estudiante_ids)
+        .annotate(estudiante_id=F('grupo__estudiantegrupo__estudiante_id'))
+        .order_by('-grupo__periodo__fecha_inicio', 'materia__nombre', 'grupo__nombre')
+        .values(
+            'estudiante_id', 'id', 'materia_id', 'materia__nombre', 'materia__codigo',
+            'grupo_id', 'grupo__nombre', 'grupo__periodo_id', 'grupo__periodo__nombre',
+            'grupo__periodo__activo', 'profesor__username', 'profesor__first_name', 'profesor__last_name',
+        )
+    )
+    secciones_ids = {fila['id'] for fila in filas}
+
+    calificaciones = {}
+    for estudiante_id, mg_id, tipo, porcentaje, nota, observacion, estado in (
+        Calificacion.objects
+        .filter(estudiante_id__in=estudiante_ids, materia_grupo_id__in=secciones_ids)
+        .order_by('tipo_evaluacion_id')
+        .values_list(
+            'estudiante_id', 'materia_grupo_id', 'tipo_evaluacion__nombre', 'tipo_evaluacion__porcentaje',
+            'nota', 'observacion', 'estado',
+        )
+    ):
+        calificaciones.setdefault((estudiante_id, mg_id), []).append({
+            'tipo_evaluacion': {'nombre': tipo, 'porcentaje': porcentaje},
+            'nota': nota,
+            'observacion': observacion,
+            'estado': estado,
+        })
+
+    promedios = {
+        (estudiante_id, mg_id): promedio
+        for estudiante_id, mg_id, promedio in ResumenCalificacion.objects.filter(
+            estudiante_id__in=estudiante_ids, materia_grupo_id__in=secciones_ids,
+        ).values_list('estudiante_id', 'materia_grupo_id', 'promedio')
+    }
+
+    for fila in filas:
+        clave = (fila['estudiante_id'], fila['id'])
+        profesor = ' '.join(filter(None, (fila['profesor__first_name'], fila['profesor__last_name'])))
+        portales[fila['estudiante_id']]['secciones'].append({
+            'id': fila['id'],
+            'materia': {'id': fila['materia_id'], 'nombre': fila['materia__nombre'], 'codigo': fila['materia__codigo']},
+            'grupo': {
+                'id': fila['grupo_id'],
+                'nombre': fila['grupo__nombre'],
+                'periodo': {
+                    'id': fila['grupo__periodo_id'],
+                    'nombre': fila['grupo__periodo__nombre'],
+                    'activo': fila['grupo__periodo__activo'],
+                },
+            },
+            'profesor': profesor or fila['profesor__username'] or '',
+            'promedio': promedios.get(clave, 0),
+            'calificaciones': calificaciones.get(clave, []),
+        })
+    return portales
+
+
+def construir_portal(estudiante_id):
+    """Modelo de vista de un estudiante, sin caché"""
+    return construir_portales([estudiante_id])[estudiante_id]
+
+
+def generacion_actual():
+    generacion = cache.get(CLAVE_GENERACION)
+    if generacion is None:
+        generacion = uuid.uuid4().hex
+        if not cache.add(CLAVE_GENERACION, generacion, None):
+            generacion = cache.get(CLAVE_GENERACION)
+    return generacion
+
+
+def versiones_actuales(estudiante_ids):
+    """
+    Versión del portal de cada estudiante: {estudiante_id: version}. Las que
+    no están en caché se crean; dos pedidos que crean la misma a la vez sólo
+    hacen que uno de los dos resultados no se use.
+    """
+    claves = {clave_version(estudiante_id): estudiante_id for estudiante_id in estudiante_ids}
+    versiones = cache.get_many(list(claves))
+    nuevas = {clave: uuid.uuid4().hex for clave in claves if clave not in versiones}
+    if nuevas:
+        cache.set_many(nuevas, None)
+    return {claves[clave]: version for clave, version in {**versiones, **nuevas}.items()}
+
+
+def _renovar_versiones(estudiante_ids):
+    cache.set_many({clave_version(estudiante_id): uuid.uuid4().hex for estudiante_id in estudiante_ids}, None)
+
+
+def _vigente(entrada, generacion, version):
+    return entrada is not None and entrada['generacion'] == generacion and entrada['version'] == version
+
+
+def _guardar(portales, generacion, versiones):
+    """`generacion` y `versiones` deben haberse leído antes de consultar los portales"""
+    expiracion = configuracion()['EXPIRACION']
+    cache.set_many(
+        {clave_cache(estudiante_id): {
+            'generacion': generacion, 'version': versiones[estudiante_id], 'portal': portal,
+        } for estudiante_id, portal in portales.items()},
+        expiracion,
+    )
+
+
+def portal_estudiante(estudiante_id):
+    """Modelo de vista del estudiante, desde caché cuando está vigente"""
+    clave = clave_cache(estudiante_id)
+    guardado = cache.get_many([CLAVE_GENERACION, clave_version(estudiante_id), clave])
+    generacion = guardado.get(CLAVE_GENERACION) or generacion_actual()
+    version = guardado.get(clave_version(estudiante_id)) or versiones_actuales([estudiante_id])[estudiante_id]
+    if _vigente(guardado.get(clave), generacion, version):
+        return guardado[clave]['portal']
+
+    # Vuelo único: sólo quien obtiene el candado calcula, el resto espera su resultado
+    espera_maxima = configuracion()['ESPERA_MAXIMA']
+    candado = f'{clave}:calculando'
+    if not cache.add(candado, 1, espera_maxima):
+        limite = time.monotonic() + espera_maxima
+        while time.monotonic() < limite:
+            time.sleep(INTERVALO_ESPERA)
+            entrada = cache.get(clave)
+            if _vigente(entrada, generacion, version):
+                return entrada['portal']
+        # Quien calculaba no terminó a tiempo: calcular aquí sin candado
+        return _calcular(estudiante_id, generacion, version)
+    try:
+        return _calcular(estudiante_id, generacion, version)
+    finally:
+        cache.delete(candado)
+
+
+def _calcular(estudiante_id, generacion, version):
+    portal = construir_portal(estudiante_id)
+    _guardar({estudiante_id: portal}, generacion, {estudiante_id: version})
+    return portal
+
+
+def materias_con_notas(portal):
+    """Secciones agrupadas por materia para la vista de todas las notas"""
+    materias = {}
+    for seccion in portal['secciones']:
+        materia = materias.setdefault(seccion['materia']['codigo'], {
+            'materia': seccion['materia'],
+            'calificaciones': [],
+            'promedio': 0,
+        })
+        materia['calificaciones'].extend(seccion['calificaciones'])
+        materia['promedio'] = round(materia['promedio'] + seccion['promedio'], 2)
+    return list(materias.values())
+
+
+def seccion_del_portal(portal, materia_grupo_id):
+    """La sección del estudiante con ese id, o None si no está inscrito"""
+    for seccion in portal['secciones']:
+        if seccion['id'] == materia_grupo_id:
+            return seccion
+    return None
+
+
+def invalidar_portal(estudiante_ids):
+    estudiante_ids = list(estudiante_ids)
+    if estudiante_ids:
+        transaction.on_commit(lambda: _renovar_versiones(estudiante_ids))
+
+
+def invalidar_portales():
+    transaction.on_commit(lambda: cache.set(CLAVE_GENERACION, uuid.uuid4().hex, None))
+
+
+def precalcular(estudiante_ids):
+    """Arma y guarda en caché los portales de `estudiante_ids`, por lotes"""
+    estudiante_ids = list(estudiante_ids)
+    tamano = configuracion()['TAMANO_LOTE']
+    for inicio in range(0, len(estudiante_ids), tamano):
+        lote = estudiante_ids[inicio:inicio + tamano]
+        # Generación y versiones se leen antes de consultar: si cambian mientras tanto, el resultado no se usa
+        generacion = generacion_actual()
+        versiones = versiones_actuales(lote)
+        _guardar(construir_portales(lote), generacion, versiones)
+
+
+class CalentadorPortales:
+    """Acumula estudiantes por calentar y los procesa por lotes desde un hilo"""
+
+    def __init__(self):
+        self._pendientes = set()
+        self._condicion = threading.Condition()
+        self._hilo = None
+
+    def agregar(self, estudiante_ids):
+        with self._condicion:
+            self._pendientes.update(estudiante_ids)
+            self._iniciar_hilo()
+            self._condicion.notify()
+
+    def _iniciar_hilo(self):
+        if self._hilo is None or not self._hilo.is_alive():
+            self._hilo = threading.Thread(target=self._ciclo, name='portal-estudiante', daemon=True)
+            self._hilo.start()
+
+    def _ciclo(self):
+        while True:
+            with self._condicion:
+                while not self._pendientes:
+                    self._condicion.wait()
+                lote, self._pendientes = self._pendientes, set()
+            close_old_connections()
+            try:
+                precalcular(lote)
+            except Exception:
+                logger.exception('No se pudieron precalcular %d portales de estudiante', len(lote))
+            finally:
+                connection.close()
+
+
+calentador = CalentadorPortales()
+
+
+def calentar_portales(estudiante_ids):
+    """
+    Al confirmar la transacción, reemplaza en caché los portales de
+    `estudiante_ids` por los recién calculados.
+    """
+    estudiante_ids = list(estudiante_ids)
+    if not estudiante_ids:
+        return
+
+    def al_confirmar():
+        # Las entradas anteriores (y las de lecturas concurrentes) dejan de usarse ya
+        _renovar_versiones(estudiante_ids)
+        if configuracion()['CALENTAMIENTO'] == 'sincrono':
+            precalcular(estudiante_ids)
+        else:
+            calentador.agregar(estudiante_ids)
+
+    transaction.on_commit(al_confirmar)
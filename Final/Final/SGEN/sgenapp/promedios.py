@@ -0,0 +1,38 @@
+"""
+Cálculo de promedios ponderados en la base de datos.
+
+El promedio de un estudiante en una materia es la suma de
+nota * porcentaje / 100 de sus evaluaciones registradas. anotar_promedios lo
+resuelve con anotaciones del ORM, en una sola consulta agrupada, para
+cualquier conjunto de calificaciones. resumen.py la usa para mantener
+ResumenCalificacion, de donde las páginas de notas del estudiante
+(portal_estudiante.py) leen los promedios ya calculados.
+"""
+
+from django.db.models import Count, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+CON_NOTA = Q(nota__isnull=False)
+
+
+def anotar_promedios(calificaciones):
+    """
+    Agrupa un queryset de Calificacion por (estudiante, materia_grupo) y anota:
+    promedio ponderado, porcentaje evaluado y cantidad de notas registradas.
+    """
+    return (
+        calificaciones
+        .order_by()
+        .values('estudiante_id', 'materia_grupo_id')
+        .annotate(
+            suma_ponderada=Coalesce(
+                Sum(F('nota') * F('tipo_evaluacion__porcentaje'), output_field=FloatField()),
+                Value(0.0),
+            ),
+            porcentaje_evaluado=Coalesce(
+                Sum('tipo_evaluacion__porcentaje', filter=CON_NOTA, output_field=FloatField()),
+                Value(0.0),
+            ),
+            total_notas=Count('id', filter=CON_NOTA),
+        )
+    )
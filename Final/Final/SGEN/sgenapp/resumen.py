@@ -0,0 +1,120 @@
+"""
+Mantenimiento de la tabla materializada ResumenCalificacion.
+
+Cada fila guarda el promedio ponderado, el porcentaje evaluado y la cantidad de
+notas de un estudiante en una MateriaGrupo. Las filas se recalculan de forma
+incremental cuando cambia una Calificacion (señales y ruta de guardado masivo)
+y se pueden reconstruir desde cero con el comando reconstruir_resumen.
+
+Las calificaciones se borran sólo en cascada. Al borrar un estudiante, un
+período, un grupo o una materia sus filas del resumen se van en la misma
+cascada, así que Calificacion no tiene receptor post_delete: con uno, Django
+cargaría cada calificación y la borraría por separado. Al borrar un
+TipoEvaluacion sí quedan resúmenes por recalcular (las otras evaluaciones de
+la materia), y lo hace actualizar_resumen_materias_grupo().
+"""
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .models import Calificacion, ResumenCalificacion
+from .promedios import anotar_promedios
+
+CAMPOS_RESUMEN = ['promedio', 'porcentaje_evaluado', 'total_notas', 'fecha_actualizacion']
+
+
+def _resumen_desde_fila(fila):
+    return ResumenCalificacion(
+        estudiante_id=fila['estudiante_id'],
+        materia_grupo_id=fila['materia_grupo_id'],
+        promedio=round(fila['suma_ponderada'] / 100, 2),
+        porcentaje_evaluado=fila['porcentaje_evaluado'],
+        total_notas=fila['total_notas'],
+    )
+
+
+def actualizar_resumen(materia_grupo_id, estudiante_ids):
+    """Recalcula el resumen de los estudiantes indicados en una MateriaGrupo"""
+    estudiante_ids = list(estudiante_ids)
+    if not estudiante_ids:
+        return
+
+    filas = anotar_promedios(Calificacion.objects.filter(
+        materia_grupo_id=materia_grupo_id,
+        estudiante_id__in=estudiante_ids,
+    ))
+    resumenes = [_resumen_desde_fila(fila) for fila in filas]
+
+    with transaction.atomic():
+        if resumenes:
+            ResumenCalificacion.objects.bulk_create(
+                resumenes,
+                update_conflicts=True,
+                unique_fields=['estudiante', 'materia_grupo'],
+                update_fields=CAMPOS_RESUMEN,
+            )
+        # Estudiantes que ya no tienen calificaciones en la materia
+        ResumenCalificacion.objects.filter(
+            materia_grupo_id=materia_grupo_id,
+            estudiante_id__in=estudiante_ids,
+        ).exclude(
+            estudiante_id__in=[r.estudiante_id for r in resumenes]
+        ).delete()
+
+
+def _misma_clave(calificaciones):
+    """Subconsulta correlacionada: calificaciones del mismo (estudiante, materia_grupo) que la fila externa"""
+    return calificaciones.filter(
+        estudiante_id=OuterRef('estudiante_id'),
+        materia_grupo_id=OuterRef('materia_grupo_id'),
+    )
+
+
+def _guardar_resumenes(filas):
+    ResumenCalificacion.objects.bulk_create(
+        [_resumen_desde_fila(fila) for fila in filas],
+        update_conflicts=True,
+        unique_fields=['estudiante', 'materia_grupo'],
+        update_fields=CAMPOS_RESUMEN,
+    )
+
+
+def actualizar_resumen_tipo_evaluacion(tipo_evaluacion):
+    """
+    Recalcula en bloque los resúmenes de todos los (estudiante, materia_grupo)
+    con notas del TipoEvaluacion: un SELECT agrupado y un upsert. Un cambio de
+    porcentaje no agrega ni quita filas del resumen.
+    """
+    con_tipo = _misma_clave(Calificacion.objects.filter(tipo_evaluacion=tipo_evaluacion))
+    _guardar_resumenes(anotar_promedios(Calificacion.objects.filter(Exists(con_tipo))))
+
+
+def actualizar_resumen_materias_grupo(materia_grupo_ids):
+    """Recalcula en bloque el resumen de varias MateriaGrupo y borra las filas que quedaron sin notas"""
+    materia_grupo_ids = list(materia_grupo_ids)
+    if not materia_grupo_ids:
+        return
+    filas = anotar_promedios(Calificacion.objects.filter(materia_grupo_id__in=materia_grupo_ids))
+    with transaction.atomic():
+        _guardar_resumenes(filas)
+        ResumenCalificacion.objects.filter(materia_grupo_id__in=materia_grupo_ids).exclude(
+            Exists(_misma_clave(Calificacion.objects.all()))
+        ).delete()
+
+
+def reconstruir_resumen(tamano_lote=2000):
+    """Borra y vuelve a generar todo el resumen a partir de Calificacion"""
+    total = 0
+    with transaction.atomic():
+        ResumenCalificacion.objects.all().delete()
+        lote = []
+        for fila in anotar_promedios(Calificacion.objects.all()).iterator(chunk_size=tamano_lote):
+            lote.append(_resumen_desde_fila(fila))
+            if len(lote) >= tamano_lote:
+                ResumenCalificacion.objects.bulk_create(lote)
+                total += len(lote)
+                lote = []
+        if lote:
+            ResumenCalificacion.objects.bulk_create(lote)
+            total += len(lote)
+    return total
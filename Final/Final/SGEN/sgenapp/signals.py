@@ -0,0 +1,104 @@
+from django.contrib.auth.signals import user_logged_in
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .estadisticas import invalidar_estadisticas
+from .fragmentos import invalidar_fragmentos
+from .models import (
+    Admin, Calificacion, Estudiante, EstudianteGrupo, Grupo, Materia, MateriaGrupo, PeriodoAcademico,
+    Profesor, TipoEvaluacion, Usuario,
+)
+from .perfil_sqlite import aplicar_perfil
+from .permisos import cargar_permisos, invalidar_permisos
+from .portal_estudiante import invalidar_portal, invalidar_portales
+from .resumen import actualizar_resumen, actualizar_resumen_materias_grupo, actualizar_resumen_tipo_evaluacion
+
+
+# Sin post_delete: las calificaciones sólo se borran en cascada (ver resumen.py)
+@receiver(post_save, sender=Calificacion)
+def calificacion_modificada(sender, instance, **kwargs):
+    """Mantiene ResumenCalificacion y el portal del estudiante al día cuando cambia una calificación"""
+    actualizar_resumen(instance.materia_grupo_id, [instance.estudiante_id])
+    invalidar_portal([instance.estudiante_id])
+
+
+@receiver(post_save, sender=TipoEvaluacion)
+def tipo_evaluacion_modificado(sender, instance, created, **kwargs):
+    """Un cambio de porcentaje afecta todos los promedios que usan la evaluación"""
+    if not created:
+        actualizar_resumen_tipo_evaluacion(instance)
+
+
+@receiver(pre_delete, sender=TipoEvaluacion)
+def tipo_evaluacion_por_eliminar(sender, instance, **kwargs):
+    """Anota las materias con notas de la evaluación antes de que la cascada las borre"""
+    instance._materias_grupo_afectadas = list(
+        Calificacion.objects.filter(tipo_evaluacion=instance)
+        .order_by().values_list('materia_grupo_id', flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=TipoEvaluacion)
+def tipo_evaluacion_eliminado(sender, instance, **kwargs):
+    actualizar_resumen_materias_grupo(getattr(instance, '_materias_grupo_afectadas', []))
+
+
+@receiver(post_save, sender=Usuario)
+@receiver(post_delete, sender=Usuario)
+@receiver(post_save, sender=PeriodoAcademico)
+@receiver(post_delete, sender=PeriodoAcademico)
+def invalidar_estadisticas_dashboard(sender, update_fields=None, **kwargs):
+    """Los conteos del panel cambian con usuarios y períodos (no con cada login)"""
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidar_estadisticas()
+
+
+@receiver(connection_created)
+def conexion_creada(sender, connection, **kwargs):
+    """Aplica el perfil de rendimiento de SQLite a cada conexión nueva"""
+    aplicar_perfil(connection)
+
+
+@receiver(user_logged_in)
+def sesion_iniciada(sender, request, user, **kwargs):
+    """Carga los permisos del perfil al iniciar sesión para no consultarlos en cada petición"""
+    cargar_permisos(user)
+
+
+@receiver(post_save, sender=Admin)
+@receiver(post_save, sender=Profesor)
+@receiver(post_save, sender=Estudiante)
+@receiver(post_delete, sender=Admin)
+@receiver(post_delete, sender=Profesor)
+@receiver(post_delete, sender=Estudiante)
+def perfil_modificado(sender, instance, **kwargs):
+    invalidar_permisos(instance.usuario_id)
+
+
+@receiver(post_save, sender=EstudianteGrupo)
+def inscripcion_creada(sender, instance, **kwargs):
+    invalidar_portal([instance.estudiante_id])
+
+
+@receiver(post_save, sender=Materia)
+@receiver(post_save, sender=Grupo)
+@receiver(post_save, sender=PeriodoAcademico)
+@receiver(post_save, sender=MateriaGrupo)
+@receiver(post_save, sender=TipoEvaluacion)
+@receiver(post_save, sender=Usuario)
+@receiver(post_delete, sender=Materia)
+@receiver(post_delete, sender=Grupo)
+@receiver(post_delete, sender=PeriodoAcademico)
+@receiver(post_delete, sender=TipoEvaluacion)
+@receiver(post_delete, sender=Usuario)
+def estructura_modificada(sender, update_fields=None, **kwargs):
+    """
+    Materias, grupos, períodos, profesores y porcentajes se ven en el portal de
+    todos los estudiantes y en las listas de selección en caché
+    """
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidar_portales()
+    invalidar_fragmentos()
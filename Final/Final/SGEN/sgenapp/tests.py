@@ -1,3 +1,1595 @@
-from django.test import TestCase
+import base64
+import csv
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Count
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import auditoria, importacion_usuarios, perfilado
+from .arranque import precompilar_plantillas, preparar
+from .auditoria import EscritorAuditoria, registrar_accion
+from .busqueda import buscar_estudiantes, filtrar_estudiantes
+from .estaticos import manifiesto_generado
+from .fragmentos import version_actual
+from .calificaciones import guardar_calificaciones
+from .portal_estudiante import (
+    _guardar, clave_cache, construir_portal, construir_portales, generacion_actual, portal_estudiante,
+    versiones_actuales,
+)
+from .models import (
+    Usuario, Materia, Grupo, MateriaGrupo, EstudianteGrupo, TipoEvaluacion,
+    Calificacion, PeriodoAcademico, HistorialAcciones, ResumenCalificacion, Estudiante, Profesor
+)
+from .historial import filtrar_historial
+from .inscripciones import InscripcionError, parsear_ids, sincronizar_inscripciones
+from .paginacion import paginar_keyset
+from .resumen import reconstruir_resumen
+from .urls import urlpatterns
+
+# ============ PRESUPUESTOS DE RENDIMIENTO POR VISTA ============
+
+# Tamaño del conjunto de datos sembrado para las pruebas de rendimiento
+GRUPOS = 20
+ESTUDIANTES_POR_GRUPO = 100
+MATERIAS = 10
+MATERIAS_POR_GRUPO = 5
+PROFESORES = 10
+ACCIONES_HISTORIAL = 5000
+
+# Multiplica los presupuestos de tiempo (p. ej. en máquinas de CI lentas)
+FACTOR_TIEMPO = float(os.environ.get('SGEN_FACTOR_TIEMPO', '1'))
+
+# Ruta de un archivo JSON con el resultado por vista, para comparar entre versiones.
+# Sin la variable no se escribe nada: la suite no deja archivos en el proyecto.
+REPORTE_RENDIMIENTO = os.environ.get('SGEN_REPORTE_RENDIMIENTO', '')
+
+# nombre de la URL -> (máximo de consultas, máximo de segundos)
+PRESUPUESTOS = {
+    'login': (0, 0.5),
+    'logout': (4, 0.5),
+    'admin_dashboard': (7, 0.5),
+    'admin_usuarios': (5, 2.0),
+    'admin_crear_usuario': (2, 0.5),
+    'admin_editar_usuario': (3, 0.5),
+    'admin_eliminar_usuario': (16, 0.5),
+    'admin_reportes': (6, 0.5),
+    'admin_periodos': (3, 0.5),
+    'admin_crear_periodo': (2, 0.5),
+    'admin_editar_periodo': (3, 0.5),
+    'admin_eliminar_periodo': (11, 1.0),
+    'admin_grupos': (3, 0.5),
+    'admin_crear_grupo': (3, 0.5),
+    'admin_editar_grupo': (4, 0.5),
+    'admin_eliminar_grupo': (9, 1.0),
+    'admin_materias': (3, 0.5),
+    'admin_crear_materia': (2, 0.5),
+    'admin_editar_materia': (3, 0.5),
+    'admin_eliminar_materia': (6, 1.0),
+    'admin_historial': (4, 0.5),
+    'admin_perfilado': (2, 0.5),
+    'admin_asignar_estudiantes': (5, 0.5),
+    'admin_asignar_profesor': (5, 0.5),
+    'admin_importar_usuarios': (2, 0.5),
+    'buscar_estudiantes': (3, 0.5),
+    'profesor_dashboard': (3, 0.5),
+    'profesor_ingresar_notas': (5, 0.5),
+    'profesor_guardar_notas': (15, 1.0),
+    'profesor_importar_notas': (4, 0.5),
+    'profesor_asignar_estudiantes': (4, 0.5),
+    'estudiante_dashboard': (5, 0.5),
+    'estudiante_seleccionar_materia': (5, 0.5),
+    'estudiante_ver_notas': (5, 0.5),
+    'estudiante_ver_notas_materia': (5, 0.5),
+}
+
+
+@override_settings(AUDITORIA={'MODO': 'sincrono'})
+class PresupuestoConsultasTest(TestCase):
+    """
+    Recorre cada URL de sgenapp con el rol adecuado sobre un conjunto de datos
+    de tamaño realista y verifica que no supere su presupuesto de consultas
+    SQL ni de tiempo. Un N+1 nuevo aparece aquí como un exceso de consultas.
+    """
+
+    resultados = []
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.periodo = PeriodoAcademico.objects.create(
+            nombre='2025-1', fecha_inicio=date(2025, 1, 15), fecha_fin=date(2025, 6, 15)
+        )
+        PeriodoAcademico.objects.create(
+            nombre='2024-2', activo=False, fecha_inicio=date(2024, 7, 15), fecha_fin=date(2024, 12, 15)
+        )
+        cls.admin = Usuario.objects.create_user(username='admin', documento='A-1', rol='1', password='x')
+        Usuario.objects.bulk_create(
+            [Usuario(username=f'prof{i}', documento=f'P-{i}', first_name=f'Profesor {i}', rol='2', password='!')
+             for i in range(PROFESORES)]
+            + [Usuario(username=f'est{i}', documento=f'E-{i:06d}', first_name=f'Estudiante {i}', rol='3', password='!')
+               for i in range(GRUPOS * ESTUDIANTES_POR_GRUPO)]
+        )
+        profesores = list(Usuario.objects.filter(rol='2').order_by('documento'))
+        estudiantes = list(Usuario.objects.filter(rol='3').order_by('documento'))
+        cls.profesor = profesores[0]
+        cls.estudiante = estudiantes[0]
+
+        Grupo.objects.bulk_create([Grupo(nombre=f'G{i:02d}', periodo=cls.periodo, capacidad=150) for i in range(GRUPOS)])
+        Materia.objects.bulk_create([Materia(nombre=f'Materia {i}', codigo=f'MAT{i:03d}') for i in range(MATERIAS)])
+        grupos = list(Grupo.objects.order_by('nombre'))
+        materias = list(Materia.objects.order_by('codigo'))
+        cls.grupo = grupos[0]
+
+        MateriaGrupo.objects.bulk_create([
+            MateriaGrupo(materia=materias[(g + m) % MATERIAS], grupo=grupo, profesor=profesores[(g + m) % PROFESORES])
+            for g, grupo in enumerate(grupos) for m in range(MATERIAS_POR_GRUPO)
+        ])
+        EstudianteGrupo.objects.bulk_create([
+            EstudianteGrupo(estudiante=est, grupo=grupos[i // ESTUDIANTES_POR_GRUPO])
+            for i, est in enumerate(estudiantes)
+        ])
+        tipos = TipoEvaluacion.objects.bulk_create([
+            TipoEvaluacion(nombre='Parcial 1', porcentaje=30),
+            TipoEvaluacion(nombre='Parcial 2', porcentaje=30),
+            TipoEvaluacion(nombre='Examen Final', porcentaje=40),
+        ])
+        cls.tipo = tipos[0]
+
+        materias_grupos = list(MateriaGrupo.objects.all())
+        cls.materia_grupo = next(mg for mg in materias_grupos if mg.profesor_id == cls.profesor.pk)
+        por_grupo = {}
+        for i, est in enumerate(estudiantes):
+            por_grupo.setdefault(grupos[i // ESTUDIANTES_POR_GRUPO].pk, []).append(est)
+        Calificacion.objects.bulk_create([
+            Calificacion(estudiante=est, materia_grupo=mg, tipo_evaluacion=tipo,
+                         nota=(est.pk + tipo.pk) % 50 / 10, estado='registrada')
+            for mg in materias_grupos for est in por_grupo[mg.grupo_id] for tipo in tipos[:2]
+        ], batch_size=5000)
+
+        HistorialAcciones.objects.bulk_create([
+            HistorialAcciones(usuario=cls.admin, accion='Creó usuario', descripcion=f'Acción de prueba {i}')
+            for i in range(ACCIONES_HISTORIAL)
+        ], batch_size=5000)
+
+        # Objetos desechables para las vistas de edición y eliminación
+        cls.usuario_extra = Usuario.objects.create_user(username='extra', documento='X-1', rol='3', password='x')
+        cls.periodo_extra = PeriodoAcademico.objects.create(
+            nombre='2023-1', activo=False, fecha_inicio=date(2023, 1, 15), fecha_fin=date(2023, 6, 15)
+        )
+        cls.grupo_extra = Grupo.objects.create(nombre='Z99', periodo=cls.periodo)
+        cls.materia_extra = Materia.objects.create(nombre='Extra', codigo='EXT001')
+
+        # El usuario, el período y el grupo a eliminar tienen calificaciones: el
+        # borrado en cascada no debe costar consultas por cada nota
+        grupo_anterior = Grupo.objects.create(nombre='Y99', periodo=cls.periodo_extra)
+        materias_grupos_extra = MateriaGrupo.objects.bulk_create([
+            MateriaGrupo(materia=materias[0], grupo=grupo_anterior),
+            MateriaGrupo(materia=materias[1], grupo=grupo_anterior),
+            MateriaGrupo(materia=materias[2], grupo=cls.grupo_extra),
+        ])
+        inscritos = estudiantes[-ESTUDIANTES_POR_GRUPO:] + [cls.usuario_extra]
+        EstudianteGrupo.objects.bulk_create([
+            EstudianteGrupo(estudiante=est, grupo=grupo)
+            for grupo in (grupo_anterior, cls.grupo_extra) for est in inscritos
+        ])
+        Calificacion.objects.bulk_create([
+            Calificacion(estudiante=est, materia_grupo=mg, tipo_evaluacion=tipo, nota=3.5, estado='registrada')
+            for mg in materias_grupos_extra for est in inscritos for tipo in tipos[:2]
+        ], batch_size=5000)
+        reconstruir_resumen()
+
+    def setUp(self):
+        cache.clear()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if cls.resultados and REPORTE_RENDIMIENTO:
+            with open(REPORTE_RENDIMIENTO, 'w', encoding='utf-8') as archivo:
+                json.dump({
+                    'dataset': {
+                        'estudiantes': GRUPOS * ESTUDIANTES_POR_GRUPO,
+                        'calificaciones': GRUPOS * MATERIAS_POR_GRUPO * ESTUDIANTES_POR_GRUPO * 2,
+                        'acciones_historial': ACCIONES_HISTORIAL,
+                    },
+                    'vistas': sorted(cls.resultados, key=lambda r: r['vista']),
+                }, archivo, ensure_ascii=False, indent=2)
+
+    def peticiones(self):
+        """(nombre_url, usuario, método, kwargs de la URL, datos) para cada vista"""
+        mg = self.materia_grupo
+        notas = {'materia_grupo_id': mg.pk, 'tipo_evaluacion_id': self.tipo.pk}
+        for eg in EstudianteGrupo.objects.filter(grupo_id=mg.grupo_id):
+            notas[f'nota_{eg.estudiante_id}'] = '4.5'
+        return [
+            ('login', None, 'get', {}, None),
+            ('admin_dashboard', self.admin, 'get', {}, None),
+            ('admin_usuarios', self.admin, 'get', {}, None),
+            ('admin_crear_usuario', self.admin, 'get', {}, None),
+            ('admin_editar_usuario', self.admin, 'get', {'usuario_id': self.usuario_extra.pk}, None),
+            ('admin_reportes', self.admin, 'get', {}, {'periodo': self.periodo.pk}),
+            ('admin_periodos', self.admin, 'get', {}, None),
+            ('admin_crear_periodo', self.admin, 'get', {}, None),
+            ('admin_editar_periodo', self.admin, 'get', {'periodo_id': self.periodo_extra.pk}, None),
+            ('admin_grupos', self.admin, 'get', {}, None),
+            ('admin_crear_grupo', self.admin, 'get', {}, None),
+            ('admin_editar_grupo', self.admin, 'get', {'grupo_id': self.grupo_extra.pk}, None),
+            ('admin_materias', self.admin, 'get', {}, None),
+            ('admin_crear_materia', self.admin, 'get', {}, None),
+            ('admin_editar_materia', self.admin, 'get', {'materia_id': self.materia_extra.pk}, None),
+            ('admin_historial', self.admin, 'get', {}, None),
+            ('admin_perfilado', self.admin, 'get', {}, None),
+            ('admin_asignar_estudiantes', self.admin, 'get', {}, {'grupo': self.grupo.pk}),
+            ('admin_asignar_profesor', self.admin, 'get', {}, None),
+            ('admin_importar_usuarios', self.admin, 'get', {}, None),
+            ('buscar_estudiantes', self.admin, 'get', {}, {'q': 'E-0001', 'grupo': self.grupo.pk}),
+            ('profesor_dashboard', self.profesor, 'get', {}, None),
+            ('profesor_ingresar_notas', self.profesor, 'post', {},
+             {'materia_grupo': mg.pk, 'tipo_evaluacion': self.tipo.pk}),
+            ('profesor_guardar_notas', self.profesor, 'post', {}, notas),
+            ('profesor_importar_notas', self.profesor, 'get', {}, None),
+            ('profesor_asignar_estudiantes', self.profesor, 'get', {}, {'materia_grupo': mg.pk}),
+            ('estudiante_dashboard', self.estudiante, 'get', {}, None),
+            ('estudiante_seleccionar_materia', self.estudiante, 'get', {}, None),
+            ('estudiante_ver_notas', self.estudiante, 'get', {}, None),
+            ('estudiante_ver_notas_materia', self.estudiante, 'get', {'materia_grupo_id': mg.pk}, None),
+            # Vistas destructivas al final
+            ('admin_eliminar_usuario', self.admin, 'get', {'usuario_id': self.usuario_extra.pk}, None),
+            ('admin_eliminar_periodo', self.admin, 'get', {'periodo_id': self.periodo_extra.pk}, None),
+            ('admin_eliminar_grupo', self.admin, 'get', {'grupo_id': self.grupo_extra.pk}, None),
+            ('admin_eliminar_materia', self.admin, 'get', {'materia_id': self.materia_extra.pk}, None),
+            ('logout', self.admin, 'post', {}, None),
+        ]
+
+    def medir(self, nombre, usuario, metodo, kwargs, datos):
+        if usuario is None:
+            self.client.logout()
+        else:
+            self.client.force_login(usuario)
+        url = reverse(nombre, kwargs=kwargs)
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            response = getattr(self.client, metodo)(url, datos or {})
+            segundos = time.perf_counter() - inicio
+        return response, len(consultas), segundos
+
+    def test_todas_las_urls_tienen_presupuesto(self):
+        nombres = {patron.name for patron in urlpatterns}
+        self.assertEqual(nombres, set(PRESUPUESTOS))
+        self.assertEqual(nombres, {p[0] for p in self.peticiones()})
+
+    def test_presupuesto_por_vista(self):
+        for nombre, usuario, metodo, kwargs, datos in self.peticiones():
+            with self.subTest(vista=nombre):
+                response, consultas, segundos = self.medir(nombre, usuario, metodo, kwargs, datos)
+                max_consultas, max_segundos = PRESUPUESTOS[nombre]
+                self.resultados.append({
+                    'vista': nombre,
+                    'estado': response.status_code,
+                    'consultas': consultas,
+                    'max_consultas': max_consultas,
+                    'segundos': round(segundos, 4),
+                    'max_segundos': max_segundos * FACTOR_TIEMPO,
+                })
+                self.assertLess(response.status_code, 400)
+                self.assertLessEqual(consultas, max_consultas, f'{nombre}: {consultas} consultas')
+                self.assertLessEqual(segundos, max_segundos * FACTOR_TIEMPO, f'{nombre}: {segundos:.3f}s')
+
+
+class ResumenCalificacionTest(TestCase):
+    """Mantenimiento en bloque de ResumenCalificacion cuando cambia un TipoEvaluacion"""
+
+    @classmethod
+    def setUpTestData(cls):
+        periodo = PeriodoAcademico.objects.create(
+            nombre='2032-1', fecha_inicio=date(2032, 1, 15), fecha_fin=date(2032, 6, 15)
+        )
+        grupo = Grupo.objects.create(nombre='R01', periodo=periodo)
+        Materia.objects.bulk_create([Materia(nombre=f'Resumen {i}', codigo=f'RES{i:03d}') for i in range(40)])
+        cls.materias_grupo = MateriaGrupo.objects.bulk_create([
+            MateriaGrupo(materia=materia, grupo=grupo) for materia in Materia.objects.filter(codigo__startswith='RES')
+        ])
+        cls.estudiantes = Usuario.objects.bulk_create([
+            Usuario(username=f'res{i}', documento=f'RES-{i}', rol='3', password='!') for i in range(10)
+        ])
+        cls.parcial, cls.quiz = TipoEvaluacion.objects.bulk_create([
+            TipoEvaluacion(nombre='Parcial', porcentaje=60),
+            TipoEvaluacion(nombre='Quiz', porcentaje=40),
+        ])
+        # El último estudiante sólo tiene nota de quiz
+        Calificacion.objects.bulk_create(
+            [Calificacion(estudiante=est, materia_grupo=mg, tipo_evaluacion=cls.parcial, nota=4.0)
+             for mg in cls.materias_grupo for est in cls.estudiantes[:-1]]
+            + [Calificacion(estudiante=est, materia_grupo=mg, tipo_evaluacion=cls.quiz, nota=2.0)
+               for mg in cls.materias_grupo for est in cls.estudiantes]
+        )
+        reconstruir_resumen()
+
+    def resumen(self):
+        return {
+            (r.estudiante_id, r.materia_grupo_id): (r.promedio, r.porcentaje_evaluado, r.total_notas)
+            for r in ResumenCalificacion.objects.all()
+        }
+
+    def test_cambio_de_porcentaje_en_bloque(self):
+        self.parcial.porcentaje = 50
+        # UPDATE del tipo, un SELECT agrupado y el upsert (en lotes según el motor),
+        # sin una consulta por cada materia que use la evaluación
+        with CaptureQueriesContext(connection) as consultas:
+            self.parcial.save()
+        sentencias = [q['sql'].split(None, 1)[0] for q in consultas.captured_queries]
+        self.assertEqual(sentencias.count('SELECT'), 1)
+        self.assertEqual(set(sentencias), {'UPDATE', 'SELECT', 'INSERT'})
+        actual = self.resumen()
+        self.assertEqual(actual[(self.estudiantes[0].pk, self.materias_grupo[0].pk)], (2.8, 90.0, 2))
+        self.assertEqual(actual[(self.estudiantes[-1].pk, self.materias_grupo[-1].pk)], (0.8, 40.0, 1))
+        reconstruir_resumen()
+        self.assertEqual(actual, self.resumen())
+
+    def test_eliminar_evaluacion_recalcula_las_demas(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.parcial.delete()
+        actual = self.resumen()
+        self.assertEqual(actual[(self.estudiantes[0].pk, self.materias_grupo[0].pk)], (0.8, 40.0, 1))
+        self.assertEqual(len(actual), len(self.estudiantes) * len(self.materias_grupo))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiz.delete()
+        self.assertFalse(ResumenCalificacion.objects.exists())
+
+
+# ============ AUDITORÍA ASÍNCRONA ============
+
+@override_settings(AUDITORIA={'MODO': 'asincrono', 'TAMANO_LOTE': 3, 'INTERVALO': 60})
+class AuditoriaTest(TransactionTestCase):
+    """El hilo del escritor usa su propia conexión: TransactionTestCase para ver lo que escribe"""
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user('au-admin', password='x', documento='AU-A', rol='1')
+        self.escritor = EscritorAuditoria()
+        parche = mock.patch.object(auditoria, 'escritor', self.escritor)
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.addCleanup(self.escritor.vaciar)
+
+    def registrar(self, descripcion, ip='203.0.113.7'):
+        request = RequestFactory().get('/', REMOTE_ADDR=ip)
+        request.user = self.usuario
+        return registrar_accion(request, 'Creó grupo', descripcion)
+
+    def esperar_filas(self, cantidad, limite=5.0):
+        fin = time.monotonic() + limite
+        while HistorialAcciones.objects.count() < cantidad and time.monotonic() < fin:
+            time.sleep(0.02)
+        self.assertEqual(HistorialAcciones.objects.count(), cantidad)
+
+    def test_el_lote_completo_se_escribe_desde_el_hilo(self):
+        self.registrar('G1')
+        self.registrar('G2')
+        time.sleep(0.2)
+        self.assertEqual(HistorialAcciones.objects.count(), 0)
+        self.registrar('G3')
+        self.esperar_filas(3)
+        self.assertEqual(
+            sorted(HistorialAcciones.objects.values_list('descripcion', 'ip_address', 'usuario_id')),
+            [(f'G{i}', '203.0.113.7', self.usuario.pk) for i in (1, 2, 3)],
+        )
+
+    def test_vaciar_escribe_lo_pendiente_con_la_ip(self):
+        self.registrar('IPv6', ip='2001:db8::1')
+        self.registrar('Sin IP', ip='no-es-una-ip')
+        self.assertEqual(HistorialAcciones.objects.count(), 0)
+        self.escritor.vaciar()
+        self.assertEqual(
+            dict(HistorialAcciones.objects.values_list('descripcion', 'ip_address')),
+            {'IPv6': '2001:db8::1', 'Sin IP': None},
+        )
+        self.assertEqual(self.escritor._pendientes, [])
+
+    def test_fin_de_peticion_programa_el_vaciado(self):
+        self.registrar('G1')
+        # Lo que hace AuditoriaMiddleware al terminar la petición, sin esperar INTERVALO
+        self.escritor.programar_vaciado()
+        self.esperar_filas(1)
+
+
+# ============ PERFILADO POR PETICIÓN ============
+
+class PerfiladoMiddlewareTest(TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directorio.cleanup)
+        self.ajustes = self.settings(PERFILADO={
+            'ACTIVO': True, 'MUESTREO': 1.0, 'UMBRAL_REPETIDAS': 3,
+            'ARCHIVO': os.path.join(self.directorio.name, 'perfilado.log'),
+        })
+        self.ajustes.enable()
+        self.addCleanup(self.ajustes.disable)
+        self.admin = Usuario.objects.create_user('perf-admin', password='x', documento='P-1', rol='1')
+
+    def test_cabecera_y_registro(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin_dashboard'))
+
+        self.assertIn('sql;dur=', response['Server-Timing'])
+        self.assertIn('plantilla;dur=', response['Server-Timing'])
+        registros = perfilado.leer_registros()
+        self.assertEqual(len(registros), 1)
+        self.assertEqual(registros[0]['vista'], 'admin_dashboard')
+        self.assertGreater(registros[0]['consultas'], 0)
+
+    def test_detecta_consultas_repetidas(self):
+        medicion = perfilado.Medicion()
+        with connection.execute_wrapper(medicion):
+            for _ in range(4):
+                Usuario.objects.get(pk=self.admin.pk)
+            list(Usuario.objects.filter(pk__in=[1, 2]))
+            list(Usuario.objects.filter(pk__in=[1, 2, 3]))
+
+        forma, repeticiones = medicion.mas_repetida()
+        self.assertEqual(repeticiones, 4)
+        self.assertEqual(medicion.duplicadas, 3)
+        # Los dos IN con distinta cantidad de parámetros tienen la misma forma
+        self.assertEqual(len(medicion.formas), 2)
+        self.assertEqual(perfilado.forma_consulta('IN (%s, %s, %s)'), 'IN (%s…)')
+
+
+# ============ MIGRACIONES (SQLite y PostgreSQL) ============
+
+class MigracionesTest(TransactionTestCase):
+    """Correr también con SGEN_DB_MOTOR=postgresql para validar ambos motores"""
+
+    def test_modelos_sin_migraciones_pendientes(self):
+        call_command('makemigrations', 'sgenapp', check=True, dry_run=True, verbosity=0)
+
+    def test_migraciones_reversibles(self):
+        call_command('migrate', 'sgenapp', 'zero', verbosity=0)
+        call_command('migrate', verbosity=0)
+        self.assertIn('sgenapp_resumencalificacion', connection.introspection.table_names())
+
+
+# ============ DATOS SINTÉTICOS (generar_datos) ============
+
+class GenerarDatosTest(TestCase):
+
+    def generar(self, *argumentos):
+        call_command(
+            'generar_datos', '--periodos', '1', '--grupos', '2', '--materias', '3', '--materias-por-grupo', '2',
+            '--profesores', '2', '--estudiantes', '6', '--tipos', '2', '--completitud', '0.5', '--sin-resumen',
+            *argumentos, stdout=io.StringIO(),
+        )
+
+    def huella(self, prefijo):
+        """Notas generadas sin el prefijo, para comparar dos corridas"""
+        largo = len(prefijo) + 1
+        return sorted(
+            (documento[largo:], codigo[largo - 1:], grupo, tipo[largo:], nota)
+            for documento, codigo, grupo, tipo, nota in Calificacion.objects.filter(
+                estudiante__username__startswith=f'{prefijo}-'
+            ).values_list(
+                'estudiante__documento', 'materia_grupo__materia__codigo', 'materia_grupo__grupo__nombre',
+                'tipo_evaluacion__nombre', 'nota',
+            )
+        )
+
+    def test_misma_semilla_mismos_datos(self):
+        self.generar('--prefijo', 'gda', '--semilla', '7')
+        self.generar('--prefijo', 'gdb', '--semilla', '7')
+        self.generar('--prefijo', 'gdc', '--semilla', '8')
+        self.assertEqual(len(self.huella('gda')), 2 * 2 * 3 * 2)
+        self.assertEqual(self.huella('gda'), self.huella('gdb'))
+        self.assertNotEqual(self.huella('gda'), self.huella('gdc'))
+
+    def test_opciones_invalidas(self):
+        for argumentos in (('--tipos', '0'), ('--grupos', '0'), ('--periodos', '0'), ('--lote', '0'),
+                           ('--estudiantes', '-1')):
+            with self.subTest(argumentos=argumentos):
+                with self.assertRaises(CommandError):
+                    self.generar('--prefijo', 'gdx', *argumentos)
+        self.assertFalse(Usuario.objects.filter(username__startswith='gdx-').exists())
+
+    def test_invalida_fragmentos_y_portales(self):
+        fragmentos, generacion = version_actual(), generacion_actual()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.generar('--prefijo', 'gdd')
+        self.assertNotEqual(version_actual(), fragmentos)
+        self.assertNotEqual(generacion_actual(), generacion)
+
+
+# ============ PERFIL DE SQLITE ============
+
+class PerfilSqliteTest(TestCase):
+
+    def test_pragmas_aplicados_al_conectar(self):
+        if connection.vendor != 'sqlite' or not settings.SQLITE_PERFIL['ACTIVO']:
+            self.skipTest('Sólo aplica a SQLite con el perfil activo')
+        pragmas = settings.SQLITE_PERFIL['PRAGMAS']
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], pragmas['busy_timeout'])
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], pragmas['cache_size'])
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+
+# ============ PLANES DE CONSULTA (EXPLAIN) ============
+
+class PlanesConsultaTest(TestCase):
+    """
+    Las consultas principales de las vistas deben resolverse con índices.
+    En PostgreSQL se desactiva el Seq Scan para que el planificador muestre
+    el índice aunque las tablas de prueba sean pequeñas.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        periodo = PeriodoAcademico.objects.create(
+            nombre='EX-1', fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 6, 30)
+        )
+        cls.grupo = Grupo.objects.create(nombre='EX', periodo=periodo)
+        cls.profesor = Usuario.objects.create_user('ex-prof', password='x', documento='EXP-1', rol='2')
+        cls.estudiante = Usuario.objects.create_user('ex-est', password='x', documento='EXE-1', rol='3')
+        materia = Materia.objects.create(nombre='Explain', codigo='EX-1')
+        cls.materia_grupo = MateriaGrupo.objects.create(materia=materia, grupo=cls.grupo, profesor=cls.profesor)
+        cls.tipo = TipoEvaluacion.objects.create(nombre='Parcial', porcentaje=100)
+        EstudianteGrupo.objects.create(estudiante=cls.estudiante, grupo=cls.grupo)
+        Calificacion.objects.create(
+            estudiante=cls.estudiante, materia_grupo=cls.materia_grupo, tipo_evaluacion=cls.tipo, nota=4
+        )
+        # Otras secciones del mismo grupo y otras notas de la misma evaluación: con una sola
+        # fila por tabla PostgreSQL elige cualquier índice de costo igual
+        otro = Usuario.objects.create_user('ex-prof2', password='x', documento='EXP-2', rol='2')
+        materias = Materia.objects.bulk_create([
+            Materia(nombre=f'Explain {i}', codigo=f'EX-M{i:02d}') for i in range(40)
+        ])
+        secciones = MateriaGrupo.objects.bulk_create([
+            MateriaGrupo(materia=m, grupo=cls.grupo, profesor=otro) for m in materias
+        ])
+        Calificacion.objects.bulk_create([
+            Calificacion(estudiante=cls.estudiante, materia_grupo=mg, tipo_evaluacion=cls.tipo, nota=3)
+            for mg in secciones
+        ])
+
+    def plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                # Estadísticas de los datos de la prueba: las que dejan otras pruebas cambian el plan
+                cursor.execute(f'ANALYZE {queryset.model._meta.db_table}')
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def assertSinRecorrido(self, queryset, tabla, indice=None):
+        plan = self.plan(queryset)
+        if connection.vendor == 'sqlite':
+            # SCAN ... USING COVERING INDEX también lee el índice completo: sólo vale SEARCH
+            lineas = re.findall(rf'^.*\b(?:SCAN|SEARCH) {tabla}\b.*$', plan, re.MULTILINE)
+            self.assertTrue(lineas, f'{tabla} no aparece en el plan:\n{plan}')
+            for linea in lineas:
+                self.assertIn(f'SEARCH {tabla}', linea, f'Recorrido completo de {tabla}:\n{plan}')
+        else:
+            self.assertNotRegex(plan, rf'Seq Scan on {tabla}\b', f'Recorrido completo de {tabla}:\n{plan}')
+        if indice:
+            self.assertIn(indice, plan)
+
+    def assertRecorreIndice(self, queryset, tabla, indice):
+        """Para las consultas que leen la tabla completa a propósito: en orden o sólo desde el índice"""
+        plan = self.plan(queryset)
+        if connection.vendor == 'sqlite':
+            self.assertRegex(plan, rf'SCAN {tabla} USING (COVERING )?INDEX {indice}\b')
+        else:
+            self.assertNotRegex(plan, rf'Seq Scan on {tabla}\b')
+            self.assertIn(indice, plan)
+
+    def test_materias_del_profesor(self):
+        self.assertSinRecorrido(
+            MateriaGrupo.objects.filter(profesor=self.profesor).select_related('materia', 'grupo'),
+            'sgenapp_materiagrupo', 'materiagrupo_profesor_idx',
+        )
+
+    def test_estudiantes_del_grupo(self):
+        self.assertSinRecorrido(
+            EstudianteGrupo.objects.filter(grupo=self.grupo).values_list('estudiante_id', flat=True),
+            'sgenapp_estudiantegrupo', 'estudiantegrupo_grupo_idx',
+        )
+
+    def test_planilla_de_evaluacion(self):
+        self.assertSinRecorrido(
+            Calificacion.objects.filter(materia_grupo=self.materia_grupo, tipo_evaluacion=self.tipo),
+            'sgenapp_calificacion', 'calificacion_planilla_idx',
+        )
+        self.assertSinRecorrido(
+            Calificacion.objects.filter(
+                materia_grupo=self.materia_grupo, tipo_evaluacion=self.tipo, estudiante_id__in=[self.estudiante.pk]
+            ),
+            'sgenapp_calificacion',
+        )
+
+    def test_reportes_por_grupo(self):
+        self.assertSinRecorrido(
+            Calificacion.objects.filter(materia_grupo__grupo=self.grupo),
+            'sgenapp_calificacion', 'calificacion_planilla_idx',
+        )
+
+    def test_calificaciones_del_estudiante(self):
+        self.assertSinRecorrido(
+            Calificacion.objects.filter(estudiante=self.estudiante, materia_grupo=self.materia_grupo),
+            'sgenapp_calificacion',
+        )
+        self.assertSinRecorrido(
+            EstudianteGrupo.objects.filter(estudiante=self.estudiante).values_list('grupo', flat=True),
+            'sgenapp_estudiantegrupo',
+        )
+        self.assertSinRecorrido(
+            ResumenCalificacion.objects.filter(estudiante=self.estudiante).values_list('materia_grupo_id', 'promedio'),
+            'sgenapp_resumencalificacion',
+        )
+
+    def test_busqueda_de_estudiantes(self):
+        # Casi todos los usuarios son estudiantes: con estadísticas el motor no recorre el índice por rol
+        Usuario.objects.bulk_create([
+            Usuario(username=f'ex-est{i}', documento=f'EXE-{i:04d}', first_name=f'Estudiante {i}', rol='3', password='!')
+            for i in range(2, 400)
+        ])
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE sgenapp_usuario')
+        for texto in ('EXE-0123', 'ex-est123', 'ángel'):
+            self.assertSinRecorrido(
+                filtrar_estudiantes(texto).order_by('documento')[:26], 'sgenapp_usuario', 'usuario_nombre_busqueda'
+            )
+
+    def test_usuarios_por_rol(self):
+        self.assertSinRecorrido(
+            Usuario.objects.filter(rol='3').order_by('documento'), 'sgenapp_usuario', 'usuario_rol_documento_idx'
+        )
+        self.assertSinRecorrido(
+            Usuario.objects.filter(rol='3').values_list('documento', flat=True), 'sgenapp_usuario',
+            'usuario_rol_documento_idx',
+        )
+        # Conteo por rol de las estadísticas: lee todo el índice, nunca la tabla
+        self.assertRecorreIndice(
+            Usuario.objects.order_by().values_list('rol').annotate(total=Count('pk')), 'sgenapp_usuario',
+            'usuario_rol_documento_idx',
+        )
+
+    def test_busqueda_en_el_historial(self):
+        HistorialAcciones.objects.bulk_create([
+            HistorialAcciones(usuario=self.profesor, accion='Importó calificaciones', descripcion=f'Planilla {i}')
+            for i in range(50)
+        ])
+        consulta = filtrar_historial(HistorialAcciones.objects.all(), q='planilla 1')
+        if connection.vendor == 'sqlite':
+            self.assertSinRecorrido(consulta, 'sgenapp_historialacciones')
+        else:
+            self.assertSinRecorrido(consulta, 'sgenapp_historialacciones', 'historial_texto_gin')
+
+    def test_historial_reciente(self):
+        # Primera página: recorre el índice en orden y se detiene en el LIMIT
+        self.assertRecorreIndice(
+            HistorialAcciones.objects.order_by('-fecha_hora', '-id')[:50],
+            'sgenapp_historialacciones', 'historial_fecha_id_idx',
+        )
+        self.assertSinRecorrido(
+            filtrar_historial(HistorialAcciones.objects.all(), desde='2025-01-01').order_by('-fecha_hora', '-id')[:50],
+            'sgenapp_historialacciones', 'historial_fecha_id_idx',
+        )
+
+
+# ============ REPORTES: EXPORTACIÓN Y PAGINACIÓN ============
+
+class ReportesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user('rp-admin', password='x', documento='RP-A', rol='1')
+        tipo = TipoEvaluacion.objects.create(nombre='Parcial', porcentaje=50)
+        cls.periodos = []
+        for p, cantidad in enumerate((25, 4)):
+            periodo = PeriodoAcademico.objects.create(
+                nombre=f'RP-{p}', fecha_inicio=date(2034 + p, 1, 15), fecha_fin=date(2034 + p, 6, 15)
+            )
+            grupo = Grupo.objects.create(nombre=f'RP{p}', periodo=periodo)
+            materia = Materia.objects.create(nombre=f'Reporte {p}', codigo=f'RP{p}')
+            mg = MateriaGrupo.objects.create(materia=materia, grupo=grupo)
+            estudiantes = Usuario.objects.bulk_create([
+                Usuario(username=f'rp{p}-{i}', documento=f'RP{p}-{i:03d}', first_name=f'Est {i}', rol='3', password='!')
+                for i in range(cantidad)
+            ])
+            Calificacion.objects.bulk_create([
+                Calificacion(estudiante=e, materia_grupo=mg, tipo_evaluacion=tipo, nota=3.0, estado='registrada')
+                for e in estudiantes
+            ])
+            cls.periodos.append(periodo)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_exportacion_csv_en_streaming(self):
+        response = self.client.get(reverse('admin_reportes'), {'formato': 'csv', 'periodo': self.periodos[0].pk})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        filas = list(csv.reader(b''.join(response.streaming_content).decode('utf-8').splitlines()))
+        self.assertEqual(
+            filas[0], ['Documento', 'Estudiante', 'Código', 'Materia', 'Grupo', 'Período', 'Evaluación', 'Nota', 'Estado']
+        )
+        self.assertEqual(len(filas) - 1, 25)
+        self.assertEqual(filas[1], ['RP0-000', 'Est 0', 'RP0', 'Reporte 0', 'RP0', 'RP-0', 'Parcial', '3.0', 'Registrada'])
+
+    def test_paginacion_keyset_adelante_y_atras(self):
+        calificaciones = Calificacion.objects.filter(materia_grupo__grupo__periodo=self.periodos[0])
+        ids = list(calificaciones.order_by('id').values_list('id', flat=True))
+
+        primera = paginar_keyset(calificaciones, ['id'], tamano=10)
+        self.assertEqual([c.pk for c in primera], ids[:10])
+        self.assertIsNone(primera.cursor_anterior)
+
+        segunda = paginar_keyset(calificaciones, ['id'], despues=primera.cursor_siguiente, tamano=10)
+        self.assertEqual([c.pk for c in segunda], ids[10:20])
+        tercera = paginar_keyset(calificaciones, ['id'], despues=segunda.cursor_siguiente, tamano=10)
+        self.assertEqual([c.pk for c in tercera], ids[20:])
+        self.assertIsNone(tercera.cursor_siguiente)
+
+        atras = paginar_keyset(calificaciones, ['id'], antes=tercera.cursor_anterior, tamano=10)
+        self.assertEqual([c.pk for c in atras], ids[10:20])
+        inicio = paginar_keyset(calificaciones, ['id'], antes=atras.cursor_anterior, tamano=10)
+        self.assertEqual([c.pk for c in inicio], ids[:10])
+        self.assertIsNone(inicio.cursor_anterior)
+
+    def test_cursor_invalido_muestra_la_primera_pagina(self):
+        primera = [c.pk for c in self.client.get(reverse('admin_reportes')).context['reportes']]
+        alterados = ['[null]', '[1e400]', '[-1e400]', 'NaN', '[NaN]', '[1e30]', f'[{2 ** 70}]',
+                     '{"id": 1}', '[[1]]', '[{}]', '[""]', '[1, 2]']
+        cursores = ['no-es-un-cursor', 'W10', 'WyJhYmMiXQ', '!!'] + [
+            base64.urlsafe_b64encode(datos.encode()).decode().rstrip('=') for datos in alterados
+        ]
+        for cursor in cursores:
+            for direccion in ('despues', 'antes'):
+                with self.subTest(cursor=cursor, direccion=direccion):
+                    response = self.client.get(reverse('admin_reportes'), {direccion: cursor})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual([c.pk for c in response.context['reportes']], primera)
+
+    def test_cursor_alterado_en_el_historial(self):
+        HistorialAcciones.objects.create(usuario=self.admin, accion='Creó grupo', descripcion='RP')
+        for datos in ('[null, 1]', '["2025-01-01T00:00:00", null]', '["no-es-fecha", 1]', '["2025-01-01", 1e400]'):
+            cursor = base64.urlsafe_b64encode(datos.encode()).decode().rstrip('=')
+            with self.subTest(datos=datos):
+                response = self.client.get(reverse('admin_historial'), {'despues': cursor})
+                self.assertEqual(response.status_code, 200)
+
+
+# ============ INSCRIPCIONES POR CONJUNTOS ============
+
+class InscripcionesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user('in-admin', password='x', documento='IN-A', rol='1')
+        cls.profesor = Usuario.objects.create_user('in-prof', password='x', documento='IN-P', rol='2')
+        periodo = PeriodoAcademico.objects.create(
+            nombre='2033-1', fecha_inicio=date(2033, 1, 15), fecha_fin=date(2033, 6, 15)
+        )
+        cls.grupo = Grupo.objects.create(nombre='IN1', periodo=periodo, capacidad=3)
+        cls.estudiantes = Usuario.objects.bulk_create([
+            Usuario(username=f'in-est{i}', documento=f'IN-E{i}', rol='3', password='!') for i in range(5)
+        ])
+        cls.ids = [e.pk for e in cls.estudiantes]
+
+    def inscritos(self):
+        return set(EstudianteGrupo.objects.filter(grupo=self.grupo).values_list('estudiante_id', flat=True))
+
+    def test_aplica_la_diferencia(self):
+        self.assertEqual(sincronizar_inscripciones(self.grupo, self.ids[:3]), (3, 0))
+        self.assertEqual(sincronizar_inscripciones(self.grupo, self.ids[1:4]), (1, 1))
+        self.assertEqual(self.inscritos(), set(self.ids[1:4]))
+
+    def test_capacidad_del_grupo(self):
+        sincronizar_inscripciones(self.grupo, self.ids[:2])
+        with self.assertRaisesMessage(InscripcionError, 'capacidad para 3'):
+            sincronizar_inscripciones(self.grupo, self.ids[:4])
+        self.assertEqual(self.inscritos(), set(self.ids[:2]))
+        # Justo en el límite sí se aplica
+        sincronizar_inscripciones(self.grupo, self.ids[2:5])
+        self.assertEqual(self.inscritos(), set(self.ids[2:5]))
+
+    def test_id_invalido_no_aplica_nada(self):
+        sincronizar_inscripciones(self.grupo, self.ids[:2])
+        for invalido in (self.profesor.pk, max(self.ids) + 1000):
+            with self.subTest(invalido=invalido):
+                with self.assertRaisesMessage(InscripcionError, str(invalido)):
+                    sincronizar_inscripciones(self.grupo, [self.ids[2], invalido])
+                self.assertEqual(self.inscritos(), set(self.ids[:2]))
+        with self.assertRaises(InscripcionError):
+            parsear_ids([str(self.ids[0]), 'abc'])
+
+    def test_vista_informa_el_error_sin_cambiar_el_grupo(self):
+        sincronizar_inscripciones(self.grupo, self.ids[:1])
+        self.client.force_login(self.admin)
+        url = f"{reverse('admin_asignar_estudiantes')}?grupo={self.grupo.pk}"
+        response = self.client.post(url, {'estudiantes': [str(i) for i in self.ids[1:]]}, follow=True)
+        self.assertContains(response, 'capacidad para 3')
+        self.assertEqual(self.inscritos(), {self.ids[0]})
+
+
+# ============ BÚSQUEDA DE ESTUDIANTES ============
+
+class BusquedaEstudiantesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        nombres = [
+            ('Ángela', 'Muñoz'), ('Angelo', 'Ríos'), ('Jürgen', 'Straße'), ('Ωμέγα', 'Λάμδα'),
+            ('Иван', 'Петров'), ('Andrés', ''),
+        ]
+        cls.estudiantes = Usuario.objects.bulk_create([
+            Usuario(username=f'be{i}', documento=f'BE-{i}', first_name=nombre, last_name=apellido, rol='3', password='!')
+            for i, (nombre, apellido) in enumerate(nombres)
+        ])
+        # Con save() en lugar de bulk_create
+        cls.estudiantes.append(
+            Usuario.objects.create_user('be-ines', password='x', documento='BE-9', first_name='Inés', rol='3')
+        )
+        Usuario.objects.create_user('be-prof', password='x', documento='BE-P', first_name='Ángel', rol='2')
+
+    def nombres(self, texto):
+        return [u.first_name for u in buscar_estudiantes(texto)]
+
+    def test_sin_tildes_ni_mayusculas(self):
+        self.assertEqual(self.nombres('ang'), ['Ángela', 'Angelo'])
+        self.assertEqual(self.nombres('ÁNGELA MUÑ'), ['Ángela'])
+        self.assertEqual(self.nombres('angela mun'), ['Ángela'])
+        self.assertEqual(self.nombres('andres'), ['Andrés'])
+        self.assertEqual(self.nombres('INÉS'), ['Inés'])
+
+    def test_nombres_fuera_de_ascii(self):
+        self.assertEqual(self.nombres('jurgen strasse'), ['Jürgen'])
+        self.assertEqual(self.nombres('ΩΜΕΓΑ λαμ'), ['Ωμέγα'])
+        self.assertEqual(self.nombres('иван'), ['Иван'])
+        self.assertEqual(self.nombres('Ив'), ['Иван'])
+        self.assertEqual(self.nombres('muñoz'), [])  # prefijo del nombre completo, no del apellido
+
+    def test_documento_y_username(self):
+        self.assertEqual(self.nombres('BE-3'), ['Ωμέγα'])
+        self.assertEqual(self.nombres('be-ines'), ['Inés'])
+
+    def test_renombrar_actualiza_la_busqueda(self):
+        estudiante = self.estudiantes[0]
+        estudiante.first_name = 'Úrsula'
+        estudiante.save(update_fields=['first_name'])
+        self.assertEqual(self.nombres('ursula mun'), ['Úrsula'])
+        self.assertEqual(self.nombres('angela'), [])
+
+
+# ============ BÚSQUEDA EN EL HISTORIAL ============
+
+class HistorialBusquedaTest(TestCase):
+    """Texto libre sobre acción, descripción y usuario (FTS5 en SQLite, índice GIN en PostgreSQL)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user('hb-ana', password='x', documento='HB-1', rol='1')
+        cls.otro = Usuario.objects.create_user('hb-beto', password='x', documento='HB-2', rol='1')
+
+    def buscar(self, texto):
+        return set(filtrar_historial(HistorialAcciones.objects.all(), q=texto).values_list('pk', flat=True))
+
+    def test_busqueda_por_accion_descripcion_y_usuario(self):
+        importo = HistorialAcciones.objects.create(
+            usuario=self.usuario, accion='Importó calificaciones', descripcion='Planilla de Matemáticas 10A'
+        )
+        creo = HistorialAcciones.objects.create(usuario=self.otro, accion='Creó grupo', descripcion='Grupo 10B')
+        self.assertEqual(self.buscar('calificaciones'), {importo.pk})
+        self.assertEqual(self.buscar('Planilla'), {importo.pk})
+        self.assertEqual(self.buscar('grupo'), {creo.pk})
+        self.assertEqual(self.buscar('hb-beto'), {creo.pk})
+        self.assertEqual(self.buscar('inexistente'), set())
+        # Con los demás filtros
+        self.assertEqual(
+            set(filtrar_historial(HistorialAcciones.objects.all(), q='10', accion='Creó grupo')
+                .values_list('pk', flat=True)),
+            {creo.pk},
+        )
+
+    def test_busqueda_por_prefijo(self):
+        accion = HistorialAcciones.objects.create(
+            usuario=self.usuario, accion='Importó calificaciones', descripcion='Planilla de Matemáticas'
+        )
+        # Varias palabras se combinan con AND
+        self.assertEqual(self.buscar('calif planilla'), {accion.pk})
+        self.assertEqual(self.buscar('calif fisica'), set())
+        self.assertEqual(self.buscar('calif'), {accion.pk})
+        self.assertEqual(self.buscar('alificaciones'), set())
+        # Los signos de la consulta se descartan en lugar de causar un error
+        for texto in ('"calif*', "calif:* & !'", '(calif) |'):
+            self.assertEqual(self.buscar(texto), {accion.pk})
+        self.assertEqual(self.buscar('"*'), {accion.pk})
+
+    def test_busqueda_sin_tildes(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Las tildes sólo se ignoran en el índice FTS5 de SQLite')
+        accion = HistorialAcciones.objects.create(
+            usuario=self.usuario, accion='Importó calificaciones', descripcion='Planilla de Matemáticas'
+        )
+        self.assertEqual(self.buscar('importo matematicas'), {accion.pk})
+
+    def test_fechas_invalidas_se_ignoran(self):
+        accion = HistorialAcciones.objects.create(usuario=self.usuario, accion='Creó grupo', descripcion='Grupo F')
+        self.client.force_login(self.usuario)
+        for desde, hasta in (('2024-02-30', ''), ('', '2024-13-01'), ('', '9999-12-31'), ('0001-01-01', ''),
+                             ('no-es-fecha', '2024-02-31')):
+            with self.subTest(desde=desde, hasta=hasta):
+                self.assertIn(accion.pk, self.buscar_fechas(desde, hasta))
+                response = self.client.get(reverse('admin_historial'), {'desde': desde, 'hasta': hasta})
+                self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.buscar_fechas('2000-01-01', '2000-01-31'), set())
+
+    def buscar_fechas(self, desde, hasta):
+        return set(filtrar_historial(HistorialAcciones.objects.all(), desde=desde, hasta=hasta)
+                   .values_list('pk', flat=True))
+
+    def test_indice_sigue_las_altas_cambios_y_bajas(self):
+        accion = HistorialAcciones.objects.create(usuario=self.usuario, accion='Editó materia', descripcion='Física')
+        self.assertEqual(self.buscar('Física'), {accion.pk})
+
+        accion.descripcion = 'Química'
+        accion.save()
+        self.assertEqual(self.buscar('Física'), set())
+        self.assertEqual(self.buscar('Química'), {accion.pk})
+
+        accion.delete()
+        self.assertEqual(self.buscar('Química'), set())
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT COUNT(*) FROM sgenapp_historialacciones_fts')
+                self.assertEqual(cursor.fetchone()[0], HistorialAcciones.objects.count())
+
+    def test_renombrar_usuario_actualiza_su_historial(self):
+        accion = HistorialAcciones.objects.create(usuario=self.usuario, accion='Creó grupo', descripcion='Grupo A1')
+        ajena = HistorialAcciones.objects.create(usuario=self.otro, accion='Creó grupo', descripcion='Grupo A2')
+        self.usuario.username = 'hb-carolina'
+        self.usuario.save()
+        self.assertEqual(self.buscar('carolina'), {accion.pk})
+        self.assertEqual(self.buscar('hb ana'), set())
+        self.assertEqual(self.buscar('beto'), {ajena.pk})
+
+
+# ============ ASIGNACIÓN DE PROFESORES EN BLOQUE ============
+
+@override_settings(AUDITORIA={'MODO': 'sincrono'})
+class AsignacionProfesoresTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user('as-admin', password='x', documento='AS-A', rol='1')
+        cls.periodo = PeriodoAcademico.objects.create(
+            nombre='AS-1', fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 6, 30)
+        )
+        cls.grupos = Grupo.objects.bulk_create([
+            Grupo(nombre=f'AS{i:02d}', periodo=cls.periodo) for i in range(50)
+        ])
+        cls.materias = Materia.objects.bulk_create([
+            Materia(nombre=f'Materia {i}', codigo=f'AS-M{i:02d}') for i in range(10)
+        ])
+        cls.profesores = [
+            Usuario.objects.create_user(f'as-prof{i}', password='x', documento=f'AS-P{i}', rol='2')
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def subir(self, filas):
+        lineas = ['materia,grupo,periodo,profesor'] + [','.join(fila) for fila in filas]
+        archivo = SimpleUploadedFile('asignaciones.csv', '\n'.join(lineas).encode('utf-8'), 'text/csv')
+        return self.client.post(reverse('admin_asignar_profesor'), {'archivo': archivo})
+
+    def test_csv_de_500_secciones(self):
+        filas = [
+            (materia.codigo, grupo.nombre, self.periodo.nombre, self.profesores[(i + j) % 5].documento)
+            for i, grupo in enumerate(self.grupos) for j, materia in enumerate(self.materias)
+        ]
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.subir(filas)
+        self.assertRedirects(response, reverse('admin_asignar_profesor'), fetch_redirect_response=False)
+        self.assertEqual(MateriaGrupo.objects.count(), 500)
+        self.assertLessEqual(len(consultas), 15)
+
+        # Reasignar por username: sólo cambian las filas con otro profesor
+        filas[0] = (filas[0][0], filas[0][1], filas[0][2], self.profesores[4].username)
+        self.subir(filas)
+        mg = MateriaGrupo.objects.get(materia=self.materias[0], grupo=self.grupos[0])
+        self.assertEqual(mg.profesor, self.profesores[4])
+        self.assertEqual(MateriaGrupo.objects.count(), 500)
+
+    def test_errores_no_aplican_nada(self):
+        response = self.subir([
+            (self.materias[0].codigo, self.grupos[0].nombre, self.periodo.nombre, self.profesores[0].documento),
+            ('NO-EXISTE', self.grupos[1].nombre, self.periodo.nombre, self.profesores[0].documento),
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Fila 3')
+        self.assertFalse(MateriaGrupo.objects.exists())
+
+    def test_formulario_de_varias_filas(self):
+        response = self.client.post(reverse('admin_asignar_profesor'), {
+            'materia': [self.materias[0].pk, self.materias[1].pk, ''],
+            'grupo': [self.grupos[0].pk, self.grupos[0].pk, ''],
+            'profesor': [self.profesores[0].pk, self.profesores[1].pk, ''],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            set(MateriaGrupo.objects.values_list('materia_id', 'profesor_id')),
+            {(self.materias[0].pk, self.profesores[0].pk), (self.materias[1].pk, self.profesores[1].pk)},
+        )
+
+    def test_xlsx(self):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            self.skipTest('openpyxl no está instalado')
+        libro = Workbook()
+        hoja = libro.active
+        hoja.append(['Profesor', 'Periodo', 'Grupo', 'Materia'])
+        hoja.append([self.profesores[0].username, self.periodo.nombre, self.grupos[0].nombre, self.materias[0].codigo])
+        contenido = tempfile.SpooledTemporaryFile()
+        libro.save(contenido)
+        contenido.seek(0)
+
+        archivo = SimpleUploadedFile('asignaciones.xlsx', contenido.read())
+        response = self.client.post(reverse('admin_asignar_profesor'), {'archivo': archivo})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(MateriaGrupo.objects.get().profesor, self.profesores[0])
+
+    def test_archivo_invalido(self):
+        archivo = SimpleUploadedFile('asignaciones.csv', b'materia,grupo\nX,Y\n')
+        response = self.client.post(reverse('admin_asignar_profesor'), {'archivo': archivo})
+        self.assertContains(response, 'Faltan columnas: periodo, profesor')
+        archivo = SimpleUploadedFile('asignaciones.txt', b'materia,grupo,periodo,profesor\n')
+        response = self.client.post(reverse('admin_asignar_profesor'), {'archivo': archivo})
+        self.assertContains(response, 'Formato no soportado')
+        self.assertFalse(MateriaGrupo.objects.exists())
+
+
+@override_settings(AUDITORIA={'MODO': 'sincrono'})
+class ImportacionUsuariosTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user('iu-admin', password='x', documento='IU-A', rol='1')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def subir(self, nombre, contenido, contrasena_inicial=''):
+        archivo = SimpleUploadedFile(nombre, contenido)
+        return self.client.post(reverse('admin_importar_usuarios'), {
+            'archivo': archivo, 'contrasena_inicial': contrasena_inicial,
+        })
+
+    def test_csv_con_errores_por_fila(self):
+        lineas = [
+            'Documento,Nombre,Correo,Rol,Contraseña',
+            'IU-1,Ana,ana@sgen.test,estudiante,',
+            'IU-2,Beto,beto@sgen.test,2,propia123',
+            'IU-1,Repetida,rep@sgen.test,3,',
+            'IU-A,Existente,ex@sgen.test,1,',
+            'IU-3,Carla,no-es-correo,3,',
+            'IU-4,Dario,dario@sgen.test,rector,',
+            '',
+            'IU-5,Elena,elena@sgen.test,administrador,',
+        ]
+        response = self.subir('usuarios.csv', '\n'.join(lineas).encode('utf-8'), 'inicial123')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(
+            set(Usuario.objects.filter(documento__startswith='IU-').exclude(pk=self.admin.pk)
+                .values_list('documento', 'rol')),
+            {('IU-1', '3'), ('IU-2', '2'), ('IU-5', '1')},
+        )
+        self.assertTrue(Estudiante.objects.filter(usuario__documento='IU-1').exists())
+        self.assertTrue(Profesor.objects.filter(usuario__documento='IU-2').exists())
+        self.assertTrue(Usuario.objects.get(documento='IU-1').check_password('inicial123'))
+        self.assertTrue(Usuario.objects.get(documento='IU-2').check_password('propia123'))
+
+        errores = {linea: mensaje for linea, _, mensaje in response.context['errores']}
+        self.assertEqual(set(errores), {4, 5, 6, 7})
+        self.assertIn('repetido', errores[4])
+        self.assertIn('ya existe', errores[5])
+        self.assertIn('correo', errores[6])
+        self.assertIn('rol', errores[7])
+        self.assertTrue(HistorialAcciones.objects.filter(accion='Importó usuarios').exists())
+
+    def test_xlsx(self):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            self.skipTest('openpyxl no está instalado')
+        libro = Workbook()
+        hoja = libro.active
+        hoja.append(['nombre', 'documento', 'correo', 'rol'])
+        for i in range(60):
+            hoja.append([f'Estudiante {i}', f'IU-X{i:03d}', f'x{i}@sgen.test', 3])
+        contenido = tempfile.SpooledTemporaryFile()
+        libro.save(contenido)
+        contenido.seek(0)
+
+        response = self.subir('usuarios.xlsx', contenido.read(), 'inicial123')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['errores'], [])
+        self.assertEqual(Estudiante.objects.filter(usuario__documento__startswith='IU-X').count(), 60)
+
+    def test_pool_de_hashes_usa_spawn(self):
+        # El proceso del servidor tiene hilos vivos: el pool no debe crearse con fork
+        filas = ''.join(f'IU-S{i:03d},Estudiante {i},s{i}@sgen.test,3\n' for i in range(60))
+        archivo = io.BytesIO(('documento,nombre,correo,rol\n' + filas).encode())
+        with mock.patch.object(importacion_usuarios, 'ProcessPoolExecutor',
+                               wraps=importacion_usuarios.ProcessPoolExecutor) as pool:
+            creados, errores = importacion_usuarios.importar_usuarios(archivo, 'u.csv', 'inicial123', procesos=2)
+        self.assertEqual((creados, errores), (60, []))
+        self.assertEqual(pool.call_args.kwargs['mp_context'].get_start_method(), 'spawn')
+        self.assertTrue(Usuario.objects.get(documento='IU-S059').check_password('inicial123'))
+
+    def test_profesor_importado_aparece_en_la_asignacion(self):
+        caches['fragmentos'].clear()
+        self.assertNotContains(self.client.get(reverse('admin_asignar_profesor')), 'Profesora Importada')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.subir('usuarios.csv', b'documento,nombre,correo,rol\nIU-P1,Profesora Importada,pi@sgen.test,2\n', 'x')
+        self.assertContains(self.client.get(reverse('admin_asignar_profesor')), 'Profesora Importada')
+
+    def test_archivo_sin_columnas(self):
+        response = self.subir('usuarios.csv', b'nombre,documento\nAna,IU-9\n')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Faltan columnas')
+        self.assertFalse(Usuario.objects.filter(documento='IU-9').exists())
+
+
+@override_settings(AUDITORIA={'MODO': 'sincrono'})
+class ImportacionNotasTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        periodo = PeriodoAcademico.objects.create(
+            nombre='IN-1', fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 6, 30)
+        )
+        cls.profesor = Usuario.objects.create_user('in-prof', password='x', documento='IN-P', rol='2')
+        grupo = Grupo.objects.create(nombre='IN01', periodo=periodo, capacidad=600)
+        cls.mg = MateriaGrupo.objects.create(
+            materia=Materia.objects.create(nombre='Cálculo', codigo='IN-M1'), grupo=grupo, profesor=cls.profesor
+        )
+        cls.tipo = TipoEvaluacion.objects.create(nombre='Parcial', porcentaje=30)
+        cls.estudiantes = Usuario.objects.bulk_create([
+            Usuario(username=f'in-est{i}', documento=f'IN-{i:04d}', first_name=f'Estudiante {i}', rol='3', password='!')
+            for i in range(500)
+        ])
+        EstudianteGrupo.objects.bulk_create([EstudianteGrupo(estudiante=e, grupo=grupo) for e in cls.estudiantes])
+        Usuario.objects.create(username='in-otro', documento='IN-OTRO', rol='3', password='!')
+        Calificacion.objects.create(
+            estudiante=cls.estudiantes[0], materia_grupo=cls.mg, tipo_evaluacion=cls.tipo,
+            nota=3.0, observacion='Entregó tarde', estado='registrada',
+        )
+        Calificacion.objects.create(
+            estudiante=cls.estudiantes[1], materia_grupo=cls.mg, tipo_evaluacion=cls.tipo,
+            nota=4.0, estado='registrada',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.profesor)
+
+    def previsualizar(self, lineas, nombre='notas.csv'):
+        archivo = SimpleUploadedFile(nombre, '\n'.join(lineas).encode('utf-8'))
+        return self.client.post(reverse('profesor_importar_notas'), {
+            'materia_grupo': self.mg.pk, 'tipo_evaluacion': self.tipo.pk, 'archivo': archivo,
+        })
+
+    def test_vista_previa_y_confirmacion_de_500_notas(self):
+        lineas = ['documento,nota,observacion', 'IN-0000,"4,5",', 'IN-0001,4.0,']
+        lineas += [f'IN-{i:04d},{i % 50 / 10},' for i in range(2, 500)]
+
+        inicio = time.perf_counter()
+        response = self.previsualizar(lineas)
+        self.assertLess(time.perf_counter() - inicio, 1.0)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_nuevas'], 498)
+        self.assertEqual(response.context['total_modificadas'], 1)
+        self.assertEqual(response.context['total_pendientes'], 499)
+        self.assertEqual(Calificacion.objects.filter(materia_grupo=self.mg).count(), 2)
+
+        inicio = time.perf_counter()
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.post(reverse('profesor_importar_notas'), {'confirmar': '1'})
+        self.assertLess(time.perf_counter() - inicio, 1.0)
+        # En SQLite bulk_create parte los 500 INSERT en lotes por el límite de parámetros
+        self.assertLessEqual(len(consultas), 30)
+        self.assertRedirects(response, reverse('profesor_dashboard'), fetch_redirect_response=False)
+
+        self.assertEqual(Calificacion.objects.filter(materia_grupo=self.mg, tipo_evaluacion=self.tipo).count(), 500)
+        primera = Calificacion.objects.get(estudiante=self.estudiantes[0], materia_grupo=self.mg)
+        self.assertEqual((primera.nota, primera.observacion), (4.5, 'Entregó tarde'))
+        self.assertEqual(
+            ResumenCalificacion.objects.filter(materia_grupo=self.mg).count(), 500
+        )
+        self.assertTrue(HistorialAcciones.objects.filter(accion='Importó calificaciones').exists())
+
+        # La vista previa se consume al confirmar
+        response = self.client.post(reverse('profesor_importar_notas'), {'confirmar': '1'})
+        self.assertRedirects(response, reverse('profesor_importar_notas'), fetch_redirect_response=False)
+
+    def test_errores_por_fila(self):
+        response = self.previsualizar([
+            'Nota,Documento',
+            '3.5,IN-0002',
+            '9,IN-0003',
+            'abc,IN-0004',
+            '2.0,IN-0002',
+            '1.0,IN-OTRO',
+            ',IN-0005',
+        ])
+        errores = {linea: mensaje for linea, _, mensaje in response.context['errores']}
+        self.assertEqual(set(errores), {3, 4, 5, 6})
+        self.assertIn('repetido', errores[5])
+        self.assertIn('inscrito', errores[6])
+        self.assertEqual([c['documento'] for c in response.context['cambios']], ['IN-0002'])
+
+    def test_xlsx(self):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            self.skipTest('openpyxl no está instalado')
+        libro = Workbook()
+        libro.active.append(['documento', 'nota'])
+        libro.active.append(['IN-0001', 4])
+        libro.active.append(['IN-0002', 2.5])
+        contenido = tempfile.SpooledTemporaryFile()
+        libro.save(contenido)
+        contenido.seek(0)
+
+        archivo = SimpleUploadedFile('notas.xlsx', contenido.read())
+        response = self.client.post(reverse('profesor_importar_notas'), {
+            'materia_grupo': self.mg.pk, 'tipo_evaluacion': self.tipo.pk, 'archivo': archivo,
+        })
+        acciones = {c['documento']: c['accion'] for c in response.context['cambios']}
+        self.assertEqual(acciones, {'IN-0001': 'sin_cambios', 'IN-0002': 'nueva'})
+        self.assertEqual(response.context['total_pendientes'], 1)
+
+    def test_materia_de_otro_profesor(self):
+        otro = Usuario.objects.create_user('in-prof2', password='x', documento='IN-P2', rol='2')
+        self.client.force_login(otro)
+        response = self.previsualizar(['documento,nota', 'IN-0001,3'])
+        self.assertEqual(response.status_code, 404)
+
+
+class PermisosTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.profesor = Usuario.objects.create_user('pe-prof', password='x', documento='PE-P', rol='2')
+        cls.perfil = Profesor.objects.create(usuario=cls.profesor, puede_ingresar_calificaciones=False)
+        cls.estudiante = Usuario.objects.create_user('pe-est', password='x', documento='PE-E', rol='3')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_permiso_del_perfil_sin_consultas(self):
+        self.client.force_login(self.profesor)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('profesor_ingresar_notas'))
+        self.assertRedirects(response, reverse('profesor_dashboard'), fetch_redirect_response=False)
+        self.assertFalse(any('sgenapp_profesor' in q['sql'] for q in consultas.captured_queries))
+
+        # Al guardar el perfil se invalida la caché y el cambio se ve en la siguiente petición
+        self.perfil.puede_ingresar_calificaciones = True
+        self.perfil.save()
+        self.assertEqual(self.client.get(reverse('profesor_ingresar_notas')).status_code, 200)
+
+    def test_perfil_ausente_usa_valores_por_defecto(self):
+        self.client.force_login(self.estudiante)
+        self.assertEqual(self.client.get(reverse('estudiante_ver_notas')).status_code, 200)
+
+    def test_rol_equivocado(self):
+        self.client.force_login(self.estudiante)
+        response = self.client.get(reverse('profesor_dashboard'))
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        response = self.client.get(reverse('buscar_estudiantes'))
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(PORTAL_ESTUDIANTE={'CALENTAMIENTO': 'sincrono', 'ESPERA_MAXIMA': 2.0})
+class PortalEstudianteTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.estudiante = Usuario.objects.create_user('po-est', password='x', documento='PO-E', rol='3')
+        profesor = Usuario.objects.create_user('po-prof', password='x', documento='PO-P', first_name='Ana', rol='2')
+        cls.tipos = TipoEvaluacion.objects.bulk_create([
+            TipoEvaluacion(nombre=f'Parcial {i}', porcentaje=25) for i in range(4)
+        ])
+        cls.secciones = []
+        for p in range(2):
+            periodo = PeriodoAcademico.objects.create(
+                nombre=f'PO-{p}', fecha_inicio=date(2024 + p, 1, 1), fecha_fin=date(2024 + p, 6, 30)
+            )
+            grupo = Grupo.objects.create(nombre=f'PO{p}', periodo=periodo)
+            EstudianteGrupo.objects.create(estudiante=cls.estudiante, grupo=grupo)
+            for m in range(4):
+                materia = Materia.objects.create(nombre=f'Materia {p}-{m}', codigo=f'PO-{p}{m}')
+                mg = MateriaGrupo.objects.create(materia=materia, grupo=grupo, profesor=profesor)
+                cls.secciones.append(mg)
+                for tipo in cls.tipos[:2]:
+                    Calificacion.objects.create(
+                        estudiante=cls.estudiante, materia_grupo=mg, tipo_evaluacion=tipo, nota=4.0
+                    )
+        cls.companeros = Usuario.objects.bulk_create([
+            Usuario(username=f'po-est{i}', documento=f'PO-E{i}', rol='3', password='!') for i in range(30)
+        ])
+        EstudianteGrupo.objects.bulk_create([EstudianteGrupo(estudiante=e, grupo=grupo) for e in cls.companeros])
+        otro_grupo = Grupo.objects.create(nombre='PO-X', periodo=periodo)
+        cls.ajena = MateriaGrupo.objects.create(materia=materia, grupo=otro_grupo)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_consultas_fijas_y_cache(self):
+        with self.assertNumQueries(3):
+            portal = construir_portal(self.estudiante.pk)
+        self.assertEqual(len(portal['secciones']), 8)
+        seccion = portal['secciones'][0]
+        self.assertEqual(seccion['grupo']['periodo']['nombre'], 'PO-1')
+        self.assertEqual(seccion['profesor'], 'Ana')
+        self.assertEqual(len(seccion['calificaciones']), 2)
+        self.assertEqual(seccion['promedio'], 2.0)
+
+        portal_estudiante(self.estudiante.pk)
+        with self.assertNumQueries(0):
+            portal_estudiante(self.estudiante.pk)
+
+    def test_invalidacion_por_notas_y_estructura(self):
+        portal_estudiante(self.estudiante.pk)
+        mg = self.secciones[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            guardar_calificaciones(mg, self.tipos[2], {self.estudiante.pk: ('5', '')})
+        seccion = next(s for s in portal_estudiante(self.estudiante.pk)['secciones'] if s['id'] == mg.pk)
+        self.assertEqual(len(seccion['calificaciones']), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mg.materia.nombre = 'Renombrada'
+            mg.materia.save()
+        nombres = {s['materia']['nombre'] for s in portal_estudiante(self.estudiante.pk)['secciones']}
+        self.assertIn('Renombrada', nombres)
+
+    def test_vistas(self):
+        self.client.force_login(self.estudiante)
+        response = self.client.get(reverse('estudiante_ver_notas'))
+        self.assertEqual(len(response.context['materias']), 8)
+        response = self.client.get(reverse('estudiante_ver_notas_materia', args=[self.secciones[1].pk]))
+        self.assertEqual(response.context['promedio'], 2.0)
+        response = self.client.get(reverse('estudiante_ver_notas_materia', args=[self.ajena.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_calentamiento_al_guardar_planilla(self):
+        mg = self.secciones[-1]
+        estudiantes = [self.estudiante] + self.companeros
+        with self.assertNumQueries(3):
+            portales = construir_portales([e.pk for e in estudiantes])
+        self.assertEqual(len(portales[self.companeros[0].pk]['secciones']), 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            guardar_calificaciones(mg, self.tipos[3], {e.pk: ('3.5', '') for e in estudiantes})
+        # Los portales quedaron en caché con la nota nueva antes de la primera consulta
+        with self.assertNumQueries(0):
+            portal = portal_estudiante(self.companeros[5].pk)
+        seccion = next(s for s in portal['secciones'] if s['id'] == mg.pk)
+        self.assertEqual([c['nota'] for c in seccion['calificaciones']], [3.5])
+        self.assertEqual(seccion['promedio'], 0.88)
+
+    def test_vuelo_unico(self):
+        clave = clave_cache(self.estudiante.pk)
+        generacion = generacion_actual()
+        version = versiones_actuales([self.estudiante.pk])[self.estudiante.pk]
+        # Otro pedido está calculando este portal y lo guarda poco después
+        cache.add(f'{clave}:calculando', 1, 5)
+        calculado = {'secciones': []}
+        entrada = {'generacion': generacion, 'version': version, 'portal': calculado}
+        threading.Timer(0.2, cache.set, [clave, entrada]).start()
+        with self.assertNumQueries(0):
+            self.assertEqual(portal_estudiante(self.estudiante.pk), calculado)
+
+
+    def test_lectura_concurrente_no_guarda_notas_viejas(self):
+        # Un pedido lee generación y versión y consulta antes de que se confirme una nota...
+        generacion = generacion_actual()
+        versiones = versiones_actuales([self.estudiante.pk])
+        anterior = construir_portal(self.estudiante.pk)
+        mg = self.secciones[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            Calificacion.objects.create(
+                estudiante=self.estudiante, materia_grupo=mg, tipo_evaluacion=self.tipos[3], nota=1.0
+            )
+        # ...y guarda su resultado después de la invalidación
+        _guardar({self.estudiante.pk: anterior}, generacion, versiones)
+
+        seccion = next(s for s in portal_estudiante(self.estudiante.pk)['secciones'] if s['id'] == mg.pk)
+        self.assertEqual(len(seccion['calificaciones']), 3)
+
+
+class CachesTest(TestCase):
+    """Configuración de cachés y el uso que hace la aplicación de cada motor"""
+
+    def test_alias_y_sesiones_en_cache(self):
+        self.assertEqual(set(settings.CACHES), {'default', 'sesiones', 'fragmentos'})
+        usuario = Usuario.objects.create_user('ca-prof', password='x', documento='CA-P', rol='2')
+        self.client.force_login(usuario)
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get(reverse('profesor_dashboard'))
+        self.assertFalse(any('django_session' in q['sql'] for q in consultas.captured_queries))
+
+    def test_memoria_descarta_lo_menos_usado(self):
+        from django.core.cache.backends.locmem import LocMemCache
+        lru = LocMemCache('sgen-prueba-lru', {'OPTIONS': {'MAX_ENTRIES': 4, 'CULL_FREQUENCY': 4}})
+        for clave in 'abcd':
+            lru.set(clave, clave)
+        lru.get('a')
+        lru.set('e', 'e')
+        self.assertEqual(lru.get_many('abcde'), {'a': 'a', 'c': 'c', 'd': 'd', 'e': 'e'})
+
+    def verificar_motor(self, motor):
+        """Las operaciones de las que dependen permisos, estadísticas y el portal"""
+        motor.clear()
+        self.assertTrue(motor.add('candado', 1, 5))
+        self.assertFalse(motor.add('candado', 2, 5))
+        motor.set_many({'x': {'portal': [1, 2]}, 'y': 'generacion'}, None)
+        self.assertEqual(motor.get_many(['x', 'y', 'z']), {'x': {'portal': [1, 2]}, 'y': 'generacion'})
+        motor.delete_many(['x', 'candado'])
+        self.assertIsNone(motor.get('x'))
+        self.assertTrue(motor.add('candado', 3, 5))
+        motor.clear()
+
+    def test_motor_archivo(self):
+        from django.core.cache.backends.filebased import FileBasedCache
+        with tempfile.TemporaryDirectory() as directorio:
+            self.verificar_motor(FileBasedCache(directorio, {'OPTIONS': {'MAX_ENTRIES': 100}}))
+
+    def test_motor_redis(self):
+        url = os.environ.get('SGEN_CACHE_URL_PRUEBA')
+        if not url:
+            self.skipTest('Defina SGEN_CACHE_URL_PRUEBA (p. ej. redis://127.0.0.1:6379/15) para probar Redis')
+        from django.core.cache.backends.redis import RedisCache
+        self.verificar_motor(RedisCache(url, {'KEY_PREFIX': 'sgen-prueba'}))
+
+
+class PlantillasTest(TestCase):
+    """Hoja de estilos compartida con hash de contenido y fragmentos de plantilla en caché"""
+
+    def setUp(self):
+        cache.clear()
+        caches['fragmentos'].clear()
+        self.admin = Usuario.objects.create_user('pl-admin', password='x', documento='PL-A', rol='1')
+        self.client.force_login(self.admin)
+
+    def crear_periodo(self, nombre):
+        return PeriodoAcademico.objects.create(
+            nombre=nombre, fecha_inicio=date(2031, 1, 15), fecha_fin=date(2031, 6, 15)
+        )
+
+    def test_plantillas_enlazan_la_hoja_compartida(self):
+        for ruta in (settings.BASE_DIR / 'sgenapp' / 'templates').glob('*.html'):
+            texto = ruta.read_text(encoding='utf-8')
+            self.assertIn("{% static 'sgenapp/css/sgen.css' %}", texto, ruta.name)
+            # Las variables de diseño se definen sólo en la hoja
+            self.assertNotIn('--brand-blue:', texto.replace(' ', ''), ruta.name)
+
+    def test_hoja_con_huella_y_cache_de_un_ano(self):
+        manifiesto = {
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+        }
+        with tempfile.TemporaryDirectory() as directorio, \
+                override_settings(STATIC_ROOT=directorio, STORAGES=manifiesto):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            pagina = self.client.get(reverse('admin_crear_grupo')).content.decode()
+            url = re.search(r'href="(/static/sgenapp/css/sgen\.[0-9a-f]{12}\.css)"', pagina).group(1)
+
+            hoja = self.client.get(url)
+            self.assertEqual(hoja.status_code, 200)
+            self.assertIn('max-age=31536000', hoja['Cache-Control'])
+            self.assertIn('immutable', hoja['Cache-Control'])
+            b''.join(hoja.streaming_content)
+
+            sin_huella = self.client.get('/static/sgenapp/css/sgen.css')
+            self.assertIn('max-age=300', sin_huella['Cache-Control'])
+            self.assertNotIn('immutable', sin_huella['Cache-Control'])
+            b''.join(sin_huella.streaming_content)
+
+    def test_sin_collectstatic_no_se_arranca(self):
+        manifiesto = {
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+        }
+        with tempfile.TemporaryDirectory() as directorio, \
+                override_settings(STATIC_ROOT=directorio, STORAGES=manifiesto):
+            self.assertEqual([error.id for error in manifiesto_generado(None)], ['sgenapp.E001'])
+            # Sólo check --deploy lo reporta: migrate y runserver deben funcionar antes de collectstatic
+            self.assertNotIn('sgenapp.E001', [error.id for error in checks.run_checks()])
+            self.assertIn('sgenapp.E001', [error.id for error in checks.run_checks(include_deployment_checks=True)])
+            with self.assertRaisesMessage(ImproperlyConfigured, 'collectstatic'):
+                preparar()
+            call_command('collectstatic', interactive=False, verbosity=0)
+            self.assertEqual(manifiesto_generado(None), [])
+        # Sin DEBUG en settings.py las pruebas usan los archivos de la app tal cual
+        self.assertEqual(manifiesto_generado(None), [])
+
+    def test_fragmento_evita_la_consulta_y_se_invalida(self):
+        self.crear_periodo('2031-1')
+        url = reverse('admin_crear_grupo')
+        with CaptureQueriesContext(connection) as frio:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as caliente:
+            respuesta = self.client.get(url)
+        self.assertEqual(len(caliente), len(frio) - 1)
+        self.assertContains(respuesta, '2031-1')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.crear_periodo('2031-2')
+        self.assertContains(self.client.get(url), '2031-2')
+
+    def test_fragmento_varia_con_la_opcion_seleccionada(self):
+        periodo = self.crear_periodo('2031-1')
+        seleccionado = f'<option value="{periodo.pk}" selected>'
+        self.assertNotContains(self.client.get(reverse('admin_reportes')), seleccionado)
+        self.assertContains(self.client.get(reverse('admin_reportes'), {'periodo': periodo.pk}), seleccionado)
+        self.assertNotContains(self.client.get(reverse('admin_reportes')), seleccionado)
+
+
+class ArranqueTest(TestCase):
+    """Precompilación y validación de plantillas al iniciar el proceso"""
+
+    def plantillas(self, dirs=(), **opciones):
+        return [{**settings.TEMPLATES[0], 'DIRS': list(dirs), 'OPTIONS': {**settings.TEMPLATES[0]['OPTIONS'], **opciones}}]
+
+    def test_todas_las_plantillas_compilan(self):
+        compiladas, errores = precompilar_plantillas()
+        self.assertEqual(errores, [])
+        self.assertEqual(compiladas, len(list((settings.BASE_DIR / 'sgenapp' / 'templates').rglob('*.html'))))
+
+    def test_plantilla_con_error_detiene_el_arranque(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            with open(os.path.join(directorio, 'rota.html'), 'w', encoding='utf-8') as archivo:
+                archivo.write('{% if %}sin condición{% endif %}')
+            with override_settings(TEMPLATES=self.plantillas([directorio])):
+                _, errores = precompilar_plantillas()
+                self.assertEqual([nombre for nombre, _ in errores], ['rota.html'])
+                with self.assertRaisesMessage(ImproperlyConfigured, 'rota.html'):
+                    preparar()
+
+    def test_perfil_produccion_guarda_las_plantillas_compiladas(self):
+        from django.template import engines
+        produccion = self.plantillas(debug=False, loaders=[(
+            'django.template.loaders.cached.Loader',
+            ['django.template.loaders.filesystem.Loader', 'django.template.loaders.app_directories.Loader'],
+        )])
+        produccion[0]['APP_DIRS'] = False
+        with override_settings(TEMPLATES=produccion):
+            compiladas = preparar()
+            cargador = engines['django'].engine.template_loaders[0]
+            self.assertEqual(len(cargador.get_template_cache), compiladas)
+            self.assertIn('login.html', cargador.get_template_cache)
+            self.assertEqual(self.client.get(reverse('login')).status_code, 200)
+            self.assertEqual(len(cargador.get_template_cache), compiladas)
@@ -10,6 +10,7 @@ urlpatterns = [
     path('admin/', views.admin_dashboard, name='admin_dashboard'),
     path('admin/usuarios/', views.admin_usuarios, name='admin_usuarios'),
     path('admin/usuarios/crear/', views.admin_crear_usuario, name='admin_crear_usuario'),
+    path('admin/usuarios/importar/', views.admin_importar_usuarios, name='admin_importar_usuarios'),
     path('admin/usuarios/editar/<int:usuario_id>/', views.admin_editar_usuario, name='admin_editar_usuario'),
     path('admin/usuarios/eliminar/<int:usuario_id>/', views.admin_eliminar_usuario, name='admin_eliminar_usuario'),
     path('admin/reportes/', views.admin_reportes, name='admin_reportes'),
@@ -34,13 +35,16 @@ urlpatterns = [
 
     # Admin - Historial y Asignaciones
     path('admin/historial/', views.admin_historial, name='admin_historial'),
+    path('admin/perfilado/', views.admin_perfilado, name='admin_perfilado'),
     path('admin/asignar-estudiantes/', views.admin_asignar_estudiantes, name='admin_asignar_estudiantes'),
     path('admin/asignar-profesor/', views.admin_asignar_profesor, name='admin_asignar_profesor'),
+    path('estudiantes/buscar/', views.buscar_estudiantes_json, name='buscar_estudiantes'),
     
     # Profesor
     path('profesor/', views.profesor_dashboard, name='profesor_dashboard'),
     path('profesor/notas/', views.profesor_ingresar_notas, name='profesor_ingresar_notas'),
     path('profesor/guardar-notas/', views.profesor_guardar_notas, name='profesor_guardar_notas'),
+    path('profesor/importar-notas/', views.profesor_importar_notas, name='profesor_importar_notas'),
     path('profesor/asignar-estudiantes/', views.profesor_asignar_estudiantes, name='profesor_asignar_estudiantes'),
     
     # Estudiante
@@ -1,13 +1,36 @@
+import csv
+from itertools import chain
+from urllib.parse import urlencode
+
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.contrib.auth import authenticate, login, logout
-from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django.contrib import messages
-from django.db.models import Q, Avg
 from .models import (
     Usuario, Admin, Profesor, Estudiante, Materia, Grupo, MateriaGrupo,
     EstudianteGrupo, TipoEvaluacion, Calificacion, PeriodoAcademico, HistorialAcciones
 )
+from .archivos import ArchivoError
+from .asignaciones import AsignacionError, aplicar_asignaciones, leer_archivo, resolver_archivo, resolver_ids
+from .auditoria import registrar_accion
+from .busqueda import buscar_estudiantes, estudiante_a_dict
+from .calificaciones import guardar_calificaciones
+from .estadisticas import estadisticas_dashboard
+from .inscripciones import InscripcionError, parsear_ids, sincronizar_inscripciones
+from .historial import filtrar_historial, tipos_de_accion
+from .importacion_notas import aplicar_importacion, leer_notas, pendientes, previsualizar
+from .importacion_usuarios import importar_usuarios
+from .paginacion import paginar_keyset
+from .permisos import inicio_de, rol_requerido
+from .portal_estudiante import materias_con_notas, portal_estudiante, seccion_del_portal
+from . import perfilado
+
+REPORTES_POR_PAGINA = 50
+HISTORIAL_POR_PAGINA = 50
+ERRORES_IMPORTACION_VISIBLES = 200
+SESION_IMPORTACION_NOTAS = 'importacion_notas'
 
 # ============ AUTENTICACIÓN ============
 
@@ -16,12 +39,7 @@ def login_view(request):
     """Vista de inicio de sesión"""
     # Si ya está logueado, redirige según su rol
     if request.user.is_authenticated:
-        if request.user.rol == '1':
-            return redirect('admin_dashboard')
-        elif request.user.rol == '2':
-            return redirect('profesor_dashboard')
-        else:
-            return redirect('estudiante_dashboard')
+        return redirect(inicio_de(request.user))
     
     if request.method == "POST":
         username = request.POST.get('username')
@@ -33,12 +51,7 @@ def login_view(request):
             messages.success(request, f'¡Bienvenido {user.first_name or user.username}!')
             
             # Redirigir según el rol
-            if user.rol == '1':  # Admin
-                return redirect('admin_dashboard')
-            elif user.rol == '2':  # Profesor
-                return redirect('profesor_dashboard')
-            else:  # Estudiante (3)
-                return redirect('estudiante_dashboard')
+            return redirect(inicio_de(user))
         else:
             messages.error(request, 'Usuario o contraseña incorrectos.')
     
@@ -53,27 +66,15 @@ def logout_view(request):
 
 # ============ PANEL ADMINISTRADOR ============
 
-@login_required(login_url='login')
+@rol_requerido('1')
 def admin_dashboard(request):
     """Dashboard del administrador"""
-    if request.user.rol != '1':
-        messages.error(request, 'No tiene permisos de administrador.')
-        return redirect('login')
-    
-    context = {
-        'total_usuarios': Usuario.objects.count(),
-        'total_profesores': Usuario.objects.filter(rol='2').count(),
-        'total_estudiantes': Usuario.objects.filter(rol='3').count(),
-        'periodos': PeriodoAcademico.objects.all(),
-    }
+    context = estadisticas_dashboard()
     return render(request, 'admin_dashboard.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_usuarios')
 def admin_usuarios(request):
     """Gestión de usuarios para admin"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     admins = Usuario.objects.filter(rol='1')
     profesores = Usuario.objects.filter(rol='2')
     estudiantes = Usuario.objects.filter(rol='3')
@@ -85,12 +86,9 @@ def admin_usuarios(request):
     }
     return render(request, 'admin_usuarios.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_usuarios')
 def admin_crear_usuario(request):
     """Crear nuevo usuario"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     if request.method == 'POST':
         nombre = request.POST.get('nombre')
         documento = request.POST.get('documento')
@@ -118,10 +116,10 @@ def admin_crear_usuario(request):
             
             # Registrar en historial
             rol_nombre = {'1': 'Administrador', '2': 'Profesor', '3': 'Estudiante'}.get(rol, 'Usuario')
-            HistorialAcciones.objects.create(
-                usuario=request.user,
-                accion='Creó usuario',
-                descripcion=f"Creó {rol_nombre}: {nombre} ({documento})"
+            registrar_accion(
+                request,
+                'Creó usuario',
+                f"Creó {rol_nombre}: {nombre} ({documento})"
             )
             
             messages.success(request, f'Usuario {nombre} creado exitosamente.')
@@ -132,12 +130,40 @@ def admin_crear_usuario(request):
     context = {'roles': [('1', 'Administrador'), ('2', 'Profesor'), ('3', 'Estudiante')]}
     return render(request, 'admin_crear_usuario.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_usuarios')
+def admin_importar_usuarios(request):
+    """Crear usuarios en bloque desde un archivo CSV o XLSX"""
+    context = {}
+    if request.method == 'POST':
+        archivo = request.FILES.get('archivo')
+        if not archivo:
+            messages.error(request, 'Seleccione un archivo CSV o XLSX.')
+        else:
+            try:
+                creados, errores = importar_usuarios(
+                    archivo, archivo.name, contrasena_inicial=request.POST.get('contrasena_inicial', '')
+                )
+            except ArchivoError as e:
+                messages.error(request, str(e))
+            else:
+                if creados:
+                    registrar_accion(
+                        request,
+                        'Importó usuarios',
+                        f'{creados} usuarios creados desde {archivo.name} ({len(errores)} filas con errores)'
+                    )
+                messages.success(request, f'{creados} usuarios creados.')
+                if errores:
+                    messages.warning(request, f'{len(errores)} filas no se importaron.')
+                context = {
+                    'errores': errores[:ERRORES_IMPORTACION_VISIBLES],
+                    'errores_ocultos': max(len(errores) - ERRORES_IMPORTACION_VISIBLES, 0),
+                }
+    return render(request, 'admin_importar_usuarios.html', context)
+
+@rol_requerido('1', permiso='puede_gestionar_usuarios')
 def admin_editar_usuario(request, usuario_id):
     """Editar usuario"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     usuario = get_object_or_404(Usuario, id_usuario=usuario_id)
     
     if request.method == 'POST':
@@ -162,10 +188,10 @@ def admin_editar_usuario(request, usuario_id):
             rol_map = {'1': 'Administrador', '2': 'Profesor', '3': 'Estudiante'}
             cambios.append(f"Rol: {rol_map.get(usuario_anterior['rol'])} → {rol_map.get(usuario.rol)}")
         
-        HistorialAcciones.objects.create(
-            usuario=request.user,
-            accion='Editó usuario',
-            descripcion=f"Editó {usuario.first_name}: {'; '.join(cambios)}"
+        registrar_accion(
+            request,
+            'Editó usuario',
+            f"Editó {usuario.first_name}: {'; '.join(cambios)}"
         )
         
         messages.success(request, 'Usuario actualizado exitosamente.')
@@ -177,33 +203,27 @@ def admin_editar_usuario(request, usuario_id):
     }
     return render(request, 'admin_editar_usuario.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_usuarios')
 def admin_eliminar_usuario(request, usuario_id):
     """Eliminar usuario"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     usuario = get_object_or_404(Usuario, id_usuario=usuario_id)
     nombre = usuario.first_name
     documento = usuario.documento
     
     # Registrar en historial antes de eliminar
-    HistorialAcciones.objects.create(
-        usuario=request.user,
-        accion='Eliminó usuario',
-        descripcion=f"Eliminó usuario: {nombre} ({documento})"
+    registrar_accion(
+        request,
+        'Eliminó usuario',
+        f"Eliminó usuario: {nombre} ({documento})"
     )
     
     usuario.delete()
     messages.success(request, f'Usuario {nombre} eliminado exitosamente.')
     return redirect('admin_usuarios')
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_ver_reportes')
 def admin_reportes(request):
     """Reportes filtrados"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     periodo = request.GET.get('periodo')
     grupo = request.GET.get('grupo')
     materia = request.GET.get('materia')
@@ -217,44 +237,79 @@ def admin_reportes(request):
     if materia:
         reportes = reportes.filter(materia_grupo__materia_id=materia)
     
+    if request.GET.get('formato') == 'csv':
+        return exportar_reportes_csv(reportes)
+    
+    pagina = paginar_keyset(
+        reportes.select_related(
+            'estudiante', 'materia_grupo__materia', 'materia_grupo__grupo', 'tipo_evaluacion'
+        ),
+        ['id'],
+        despues=request.GET.get('despues'),
+        antes=request.GET.get('antes'),
+        tamano=REPORTES_POR_PAGINA,
+    )
+    filtros = urlencode({k: v for k, v in (('periodo', periodo), ('grupo', grupo), ('materia', materia)) if v})
+    
     context = {
-        'reportes': reportes,
+        'reportes': pagina,
         'periodos': PeriodoAcademico.objects.all(),
         'grupos': Grupo.objects.all(),
         'materias': Materia.objects.all(),
         'filtro_periodo': periodo,
         'filtro_grupo': grupo,
         'filtro_materia': materia,
+        'filtros': filtros,
     }
     return render(request, 'admin_reportes.html', context)
 
+def exportar_reportes_csv(reportes):
+    """Exporta el reporte filtrado como CSV en streaming (memoria constante)"""
+    filas = reportes.order_by('id').values_list(
+        'estudiante__documento', 'estudiante__first_name', 'materia_grupo__materia__codigo',
+        'materia_grupo__materia__nombre', 'materia_grupo__grupo__nombre',
+        'materia_grupo__grupo__periodo__nombre', 'tipo_evaluacion__nombre', 'nota', 'estado',
+    ).iterator(chunk_size=2000)
+    
+    escritor = csv.writer(_Eco())
+    encabezado = ['Documento', 'Estudiante', 'Código', 'Materia', 'Grupo', 'Período', 'Evaluación', 'Nota', 'Estado']
+    estados = dict(Calificacion._meta.get_field('estado').choices)
+    contenido = chain(
+        [escritor.writerow(encabezado)],
+        (escritor.writerow(fila[:-1] + (estados.get(fila[-1], fila[-1]),)) for fila in filas),
+    )
+    
+    response = StreamingHttpResponse(contenido, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="reporte_calificaciones.csv"'
+    return response
+
+class _Eco:
+    """Pseudo-buffer para csv.writer: devuelve la línea en vez de guardarla"""
+    def write(self, valor):
+        return valor
+
 # ============ PANEL PROFESOR ============
 
-@login_required(login_url='login')
+@rol_requerido('2')
 def profesor_dashboard(request):
     """Dashboard del profesor"""
-    if request.user.rol != '2':
-        messages.error(request, 'No tiene permisos de profesor.')
-        return redirect('login')
-    
     # Materias que imparte este profesor
-    materias_grupos = MateriaGrupo.objects.filter(profesor=request.user)
+    materias_grupos = list(
+        MateriaGrupo.objects.filter(profesor=request.user).select_related('materia', 'grupo__periodo')
+    )
     
     context = {
         'materias_grupos': materias_grupos,
-        'total_grupos': materias_grupos.count(),
+        'total_grupos': len(materias_grupos),
     }
     return render(request, 'profesor_dashboard.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('2', permiso='puede_ingresar_calificaciones')
 def profesor_ingresar_notas(request):
     """Ingreso de calificaciones"""
-    if request.user.rol != '2':
-        return redirect('login')
-    
     if request.method == 'GET':
         periodos = PeriodoAcademico.objects.filter(activo=True)
-        materias_grupos = MateriaGrupo.objects.filter(profesor=request.user)
+        materias_grupos = MateriaGrupo.objects.filter(profesor=request.user).select_related('materia', 'grupo')
         tipos_evaluacion = TipoEvaluacion.objects.all()
         
         context = {
@@ -268,11 +323,14 @@ def profesor_ingresar_notas(request):
     materia_grupo_id = request.POST.get('materia_grupo')
     tipo_evaluacion_id = request.POST.get('tipo_evaluacion')
     
-    materia_grupo = get_object_or_404(MateriaGrupo, id=materia_grupo_id, profesor=request.user)
+    materia_grupo = get_object_or_404(
+        MateriaGrupo.objects.select_related('materia', 'grupo'),
+        id=materia_grupo_id, profesor=request.user
+    )
     tipo_evaluacion = get_object_or_404(TipoEvaluacion, id=tipo_evaluacion_id)
     
     # Estudiantes en este grupo
-    estudiantes_grupo = EstudianteGrupo.objects.filter(grupo=materia_grupo.grupo)
+    estudiantes_grupo = EstudianteGrupo.objects.filter(grupo=materia_grupo.grupo).select_related('estudiante')
     
     context = {
         'materia_grupo': materia_grupo,
@@ -281,47 +339,36 @@ def profesor_ingresar_notas(request):
     }
     return render(request, 'profesor_tabla_notas.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('2', permiso='puede_ingresar_calificaciones')
 def profesor_guardar_notas(request):
     """Guardar notas ingresadas"""
-    if request.method == 'POST' and request.user.rol == '2':
+    if request.method == 'POST':
         materia_grupo_id = request.POST.get('materia_grupo_id')
         tipo_evaluacion_id = request.POST.get('tipo_evaluacion_id')
         
-        materia_grupo = get_object_or_404(MateriaGrupo, id=materia_grupo_id)
+        materia_grupo = get_object_or_404(
+            MateriaGrupo.objects.select_related('materia', 'grupo'),
+            id=materia_grupo_id, profesor=request.user
+        )
         tipo_evaluacion = get_object_or_404(TipoEvaluacion, id=tipo_evaluacion_id)
-        
-        # Procesar notas
-        estudiantes_grupo = EstudianteGrupo.objects.filter(grupo=materia_grupo.grupo)
-        notas_guardadas = 0
-        
-        for eg in estudiantes_grupo:
-            nota = request.POST.get(f'nota_{eg.estudiante.id_usuario}')
-            observacion = request.POST.get(f'observacion_{eg.estudiante.id_usuario}')
-            
-            if nota:
-                try:
-                    nota_float = float(nota)
-                    calificacion, created = Calificacion.objects.update_or_create(
-                        estudiante=eg.estudiante,
-                        materia_grupo=materia_grupo,
-                        tipo_evaluacion=tipo_evaluacion,
-                        defaults={
-                            'nota': nota_float,
-                            'observacion': observacion or '',
-                            'estado': 'registrada'
-                        }
-                    )
-                    notas_guardadas += 1
-                except ValueError:
-                    messages.error(request, f'Nota inválida para estudiante {eg.estudiante.first_name}')
-        
+
+        # Recoger las notas enviadas (campos nota_<id> / observacion_<id>)
+        notas = {}
+        for campo, nota in request.POST.items():
+            if campo.startswith('nota_') and campo[5:].isdigit():
+                estudiante_id = int(campo[5:])
+                notas[estudiante_id] = (nota, request.POST.get(f'observacion_{estudiante_id}'))
+
+        notas_guardadas, errores = guardar_calificaciones(materia_grupo, tipo_evaluacion, notas)
+        for _, mensaje in errores:
+            messages.error(request, mensaje)
+
         # Registrar en historial
         if notas_guardadas > 0:
-            HistorialAcciones.objects.create(
-                usuario=request.user,
-                accion='Guardó calificaciones',
-                descripcion=f"Ingresó {notas_guardadas} notas de {materia_grupo.materia.codigo} ({materia_grupo.grupo.nombre}) - {tipo_evaluacion.nombre}"
+            registrar_accion(
+                request,
+                'Guardó calificaciones',
+                f"Ingresó {notas_guardadas} notas de {materia_grupo.materia.codigo} ({materia_grupo.grupo.nombre}) - {tipo_evaluacion.nombre}"
             )
         
         messages.success(request, 'Notas guardadas exitosamente.')
@@ -329,46 +376,106 @@ def profesor_guardar_notas(request):
     
     return redirect('profesor_ingresar_notas')
 
-@login_required(login_url='login')
+@rol_requerido('2', permiso='puede_ingresar_calificaciones')
+def profesor_importar_notas(request):
+    """Cargar las notas de una evaluación desde CSV o XLSX, con vista previa antes de guardar"""
+    if request.method == 'POST' and 'confirmar' in request.POST:
+        pendiente = request.session.pop(SESION_IMPORTACION_NOTAS, None)
+        if not pendiente:
+            messages.error(request, 'La vista previa expiró. Cargue el archivo de nuevo.')
+            return redirect('profesor_importar_notas')
+        materia_grupo = get_object_or_404(
+            MateriaGrupo.objects.select_related('materia', 'grupo'),
+            id=pendiente['materia_grupo'], profesor=request.user
+        )
+        tipo_evaluacion = get_object_or_404(TipoEvaluacion, id=pendiente['tipo_evaluacion'])
+
+        notas_guardadas, errores = aplicar_importacion(materia_grupo, tipo_evaluacion, pendiente['notas'])
+        for _, mensaje in errores:
+            messages.error(request, mensaje)
+        if notas_guardadas > 0:
+            registrar_accion(
+                request,
+                'Importó calificaciones',
+                f"Importó {notas_guardadas} notas de {materia_grupo.materia.codigo} ({materia_grupo.grupo.nombre}) - {tipo_evaluacion.nombre}"
+            )
+        messages.success(request, f'{notas_guardadas} notas guardadas.')
+        return redirect('profesor_dashboard')
+
+    datos = request.POST if request.method == 'POST' else request.GET
+    context = {
+        'materias_grupos': MateriaGrupo.objects.filter(profesor=request.user).select_related('materia', 'grupo'),
+        'tipos_evaluacion': TipoEvaluacion.objects.all(),
+        'materia_grupo_id': datos.get('materia_grupo', ''),
+        'tipo_evaluacion_id': datos.get('tipo_evaluacion', ''),
+    }
+
+    if request.method == 'POST':
+        materia_grupo = get_object_or_404(
+            MateriaGrupo.objects.select_related('materia', 'grupo'),
+            id=request.POST.get('materia_grupo'), profesor=request.user
+        )
+        tipo_evaluacion = get_object_or_404(TipoEvaluacion, id=request.POST.get('tipo_evaluacion'))
+        archivo = request.FILES.get('archivo')
+        if not archivo:
+            messages.error(request, 'Seleccione un archivo CSV o XLSX.')
+            return render(request, 'profesor_importar_notas.html', context)
+        try:
+            cambios, errores = previsualizar(materia_grupo, tipo_evaluacion, leer_notas(archivo, archivo.name))
+        except ArchivoError as e:
+            messages.error(request, str(e))
+            return render(request, 'profesor_importar_notas.html', context)
+
+        # La vista previa se confirma en otra petición: se guarda lo que hay que escribir
+        por_guardar = pendientes(cambios)
+        request.session[SESION_IMPORTACION_NOTAS] = {
+            'materia_grupo': materia_grupo.id,
+            'tipo_evaluacion': tipo_evaluacion.id,
+            'notas': por_guardar,
+        }
+        context.update({
+            'materia_grupo': materia_grupo,
+            'tipo_evaluacion': tipo_evaluacion,
+            'cambios': cambios,
+            'errores': errores[:ERRORES_IMPORTACION_VISIBLES],
+            'errores_ocultos': max(len(errores) - ERRORES_IMPORTACION_VISIBLES, 0),
+            'total_nuevas': sum(1 for c in cambios if c['accion'] == 'nueva'),
+            'total_modificadas': sum(1 for c in cambios if c['accion'] == 'modificada'),
+            'total_pendientes': len(por_guardar),
+        })
+    return render(request, 'profesor_importar_notas.html', context)
+
+@rol_requerido('2', permiso='puede_ver_estudiantes')
 def profesor_asignar_estudiantes(request):
     """Permitir que el profesor asigne estudiantes a sus materias"""
-    if request.user.rol != '2':
-        return redirect('login')
-    
     # Materias que imparte este profesor
     materias_grupos = MateriaGrupo.objects.filter(profesor=request.user).select_related('materia', 'grupo', 'grupo__periodo')
     
     materia_grupo_id = request.GET.get('materia_grupo')
     
     if materia_grupo_id:
-        materia_grupo = get_object_or_404(MateriaGrupo, id=materia_grupo_id, profesor=request.user)
-        
-        # Estudiantes ya asignados a este grupo
-        inscritos = set(EstudianteGrupo.objects.filter(grupo=materia_grupo.grupo).values_list('estudiante_id', flat=True))
+        materia_grupo = get_object_or_404(
+            MateriaGrupo.objects.select_related('materia', 'grupo__periodo'),
+            id=materia_grupo_id, profesor=request.user
+        )
         
-        # Todos los estudiantes disponibles
-        estudiantes = Usuario.objects.filter(rol='3')
+        # Estudiantes ya asignados a este grupo; el resto se busca bajo demanda
+        estudiantes = Usuario.objects.filter(estudiantegrupo__grupo=materia_grupo.grupo).order_by('documento')
+        inscritos = set(est.id_usuario for est in estudiantes)
         
         if request.method == 'POST':
-            seleccionados = request.POST.getlist('estudiantes')
-            seleccionados_set = set(int(s) for s in seleccionados) if seleccionados else set()
-            
-            # Remover estudiantes no seleccionados
-            EstudianteGrupo.objects.filter(grupo=materia_grupo.grupo).exclude(estudiante_id__in=seleccionados_set).delete()
-            
-            # Agregar estudiantes nuevos
-            nuevos_count = 0
-            for est_id in seleccionados_set:
-                if est_id not in inscritos:
-                    estudiante = get_object_or_404(Usuario, id_usuario=est_id, rol='3')
-                    EstudianteGrupo.objects.create(estudiante=estudiante, grupo=materia_grupo.grupo)
-                    nuevos_count += 1
+            try:
+                seleccionados_set = parsear_ids(request.POST.getlist('estudiantes'))
+                sincronizar_inscripciones(materia_grupo.grupo, seleccionados_set)
+            except InscripcionError as e:
+                messages.error(request, str(e))
+                return redirect(f"{reverse('profesor_asignar_estudiantes')}?materia_grupo={materia_grupo.id}")
             
             # Registrar en historial
-            HistorialAcciones.objects.create(
-                usuario=request.user,
-                accion='Asigno estudiantes a materia',
-                descripcion=f'{materia_grupo.materia.codigo} ({materia_grupo.grupo.nombre}) - {len(seleccionados_set)} estudiantes'
+            registrar_accion(
+                request,
+                'Asigno estudiantes a materia',
+                f'{materia_grupo.materia.codigo} ({materia_grupo.grupo.nombre}) - {len(seleccionados_set)} estudiantes'
             )
             
             messages.success(request, 'Estudiantes asignados correctamente.')
@@ -388,96 +495,44 @@ def profesor_asignar_estudiantes(request):
 
 # ============ PANEL ESTUDIANTE ============
 
-@login_required(login_url='login')
+@rol_requerido('3')
 def estudiante_dashboard(request):
     """Dashboard del estudiante"""
-    if request.user.rol != '3':
-        messages.error(request, 'No tiene permisos de estudiante.')
-        return redirect('login')
-    
-    # Grupos en los que está inscrito
-    grupos = EstudianteGrupo.objects.filter(estudiante=request.user).values_list('grupo', flat=True)
-    materias_disponibles = MateriaGrupo.objects.filter(grupo_id__in=grupos).distinct()
-    
+    portal = portal_estudiante(request.user.pk)
     context = {
-        'materias_disponibles': materias_disponibles,
+        'materias_disponibles': portal['secciones'],
     }
     return render(request, 'estudiante_dashboard.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('3', permiso='puede_ver_calificaciones')
 def estudiante_seleccionar_materia(request):
     """Seleccionar materia para ver notas"""
-    if request.user.rol != '3':
-        return redirect('login')
-    
-    # Materias disponibles para este estudiante
-    grupos = EstudianteGrupo.objects.filter(estudiante=request.user).values_list('grupo', flat=True)
-    materias = MateriaGrupo.objects.filter(grupo_id__in=grupos).distinct()
-    
+    portal = portal_estudiante(request.user.pk)
     context = {
-        'materias': materias,
+        'materias': portal['secciones'],
     }
     return render(request, 'estudiante_seleccionar_materia.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('3', permiso='puede_ver_calificaciones')
 def estudiante_ver_notas(request, materia_grupo_id=None):
     """Ver notas del estudiante por materia"""
-    if request.user.rol != '3':
-        return redirect('login')
-    
+    portal = portal_estudiante(request.user.pk)
     if not materia_grupo_id:
-        # Ver todas las notas
-        grupos = EstudianteGrupo.objects.filter(estudiante=request.user).values_list('grupo', flat=True)
-        calificaciones = Calificacion.objects.filter(
-            estudiante=request.user,
-            materia_grupo__grupo_id__in=grupos
-        ).select_related('materia_grupo__materia', 'tipo_evaluacion')
-        
-        # Agrupar por materia
-        materias_dict = {}
-        for cal in calificaciones:
-            materia_codigo = cal.materia_grupo.materia.codigo
-            if materia_codigo not in materias_dict:
-                materias_dict[materia_codigo] = {
-                    'materia': cal.materia_grupo.materia,
-                    'calificaciones': [],
-                    'promedio': 0
-                }
-            materias_dict[materia_codigo]['calificaciones'].append(cal)
-        
-        # Calcular promedios
-        for materia_codigo, data in materias_dict.items():
-            calificaciones = data['calificaciones']
-            if calificaciones:
-                # Promedio ponderado
-                suma_ponderada = sum(cal.nota * (cal.tipo_evaluacion.porcentaje / 100) 
-                                    for cal in calificaciones if cal.nota)
-                data['promedio'] = round(suma_ponderada, 2)
-        
+        # Ver todas las notas, agrupadas por materia
         context = {
             'todas_notas': True,
-            'materias': list(materias_dict.values()),
+            'materias': materias_con_notas(portal),
         }
     else:
-        # Ver notas de una materia específica
-        materia_grupo = get_object_or_404(MateriaGrupo, id=materia_grupo_id)
-        calificaciones = Calificacion.objects.filter(
-            estudiante=request.user,
-            materia_grupo=materia_grupo
-        ).select_related('tipo_evaluacion')
-        
-        # Calcular promedio ponderado
-        promedio = 0
-        if calificaciones.exists():
-            suma_ponderada = sum(cal.nota * (cal.tipo_evaluacion.porcentaje / 100) 
-                                for cal in calificaciones if cal.nota)
-            promedio = round(suma_ponderada, 2)
-        
+        # Ver notas de una materia específica (sólo de las secciones en que está inscrito)
+        materia_grupo = seccion_del_portal(portal, materia_grupo_id)
+        if materia_grupo is None:
+            raise Http404('El estudiante no está inscrito en esta materia.')
         context = {
             'todas_notas': False,
             'materia_grupo': materia_grupo,
-            'calificaciones': calificaciones,
-            'promedio': promedio,
+            'calificaciones': materia_grupo['calificaciones'],
+            'promedio': materia_grupo['promedio'],
         }
     
     return render(request, 'estudiante_ver_notas.html', context)
@@ -485,22 +540,16 @@ def estudiante_ver_notas(request, materia_grupo_id=None):
 
 # ============ GESTIÓN DE PERÍODOS ACADÉMICOS ============
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_periodos(request):
     """Lista de períodos académicos"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     periodos = PeriodoAcademico.objects.all().order_by('-fecha_inicio')
     context = {'periodos': periodos}
     return render(request, 'admin_periodos.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_crear_periodo(request):
     """Crear período académico"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     if request.method == 'POST':
         nombre = request.POST.get('nombre')
         fecha_inicio = request.POST.get('fecha_inicio')
@@ -515,10 +564,10 @@ def admin_crear_periodo(request):
                 activo=activo
             )
             
-            HistorialAcciones.objects.create(
-                usuario=request.user,
-                accion='Creó período académico',
-                descripcion=f"Período: {nombre} ({fecha_inicio} - {fecha_fin})"
+            registrar_accion(
+                request,
+                'Creó período académico',
+                f"Período: {nombre} ({fecha_inicio} - {fecha_fin})"
             )
             
             messages.success(request, f'Período {nombre} creado exitosamente.')
@@ -528,12 +577,9 @@ def admin_crear_periodo(request):
     
     return render(request, 'admin_crear_periodo.html')
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_editar_periodo(request, periodo_id):
     """Editar período académico"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     periodo = get_object_or_404(PeriodoAcademico, id=periodo_id)
     
     if request.method == 'POST':
@@ -556,10 +602,10 @@ def admin_editar_periodo(request, periodo_id):
         if periodo_anterior['activo'] != periodo.activo:
             cambios.append(f"Estado: {'Inactivo' if periodo_anterior['activo'] else 'Activo'} → {'Activo' if periodo.activo else 'Inactivo'}")
         
-        HistorialAcciones.objects.create(
-            usuario=request.user,
-            accion='Editó período académico',
-            descripcion=f"Editó {periodo.nombre}: {'; '.join(cambios)}"
+        registrar_accion(
+            request,
+            'Editó período académico',
+            f"Editó {periodo.nombre}: {'; '.join(cambios)}"
         )
         
         messages.success(request, 'Período actualizado exitosamente.')
@@ -568,19 +614,16 @@ def admin_editar_periodo(request, periodo_id):
     context = {'periodo': periodo}
     return render(request, 'admin_editar_periodo.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_eliminar_periodo(request, periodo_id):
     """Eliminar período académico"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     periodo = get_object_or_404(PeriodoAcademico, id=periodo_id)
     nombre = periodo.nombre
     
-    HistorialAcciones.objects.create(
-        usuario=request.user,
-        accion='Eliminó período académico',
-        descripcion=f"Período: {nombre}"
+    registrar_accion(
+        request,
+        'Eliminó período académico',
+        f"Período: {nombre}"
     )
     
     periodo.delete()
@@ -590,22 +633,16 @@ def admin_eliminar_periodo(request, periodo_id):
 
 # ============ GESTIÓN DE GRUPOS ============
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_grupos(request):
     """Lista de grupos"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     grupos = Grupo.objects.all().select_related('periodo').order_by('periodo', 'nombre')
     context = {'grupos': grupos}
     return render(request, 'admin_grupos.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_crear_grupo(request):
     """Crear grupo"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     if request.method == 'POST':
         nombre = request.POST.get('nombre')
         periodo_id = request.POST.get('periodo')
@@ -619,10 +656,10 @@ def admin_crear_grupo(request):
                 capacidad=int(capacidad)
             )
             
-            HistorialAcciones.objects.create(
-                usuario=request.user,
-                accion='Creó grupo',
-                descripcion=f"Grupo: {nombre} - Período {periodo.nombre}"
+            registrar_accion(
+                request,
+                'Creó grupo',
+                f"Grupo: {nombre} - Período {periodo.nombre}"
             )
             
             messages.success(request, f'Grupo {nombre} creado exitosamente.')
@@ -633,12 +670,9 @@ def admin_crear_grupo(request):
     context = {'periodos': PeriodoAcademico.objects.all()}
     return render(request, 'admin_crear_grupo.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_editar_grupo(request, grupo_id):
     """Editar grupo"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     grupo = get_object_or_404(Grupo, id=grupo_id)
     
     if request.method == 'POST':
@@ -657,10 +691,10 @@ def admin_editar_grupo(request, grupo_id):
         if grupo_anterior['capacidad'] != grupo.capacidad:
             cambios.append(f"Capacidad: {grupo_anterior['capacidad']} → {grupo.capacidad}")
         
-        HistorialAcciones.objects.create(
-            usuario=request.user,
-            accion='Editó grupo',
-            descripcion=f"Editó {grupo.nombre}: {'; '.join(cambios)}"
+        registrar_accion(
+            request,
+            'Editó grupo',
+            f"Editó {grupo.nombre}: {'; '.join(cambios)}"
         )
         
         messages.success(request, 'Grupo actualizado exitosamente.')
@@ -672,19 +706,16 @@ def admin_editar_grupo(request, grupo_id):
     }
     return render(request, 'admin_editar_grupo.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_eliminar_grupo(request, grupo_id):
     """Eliminar grupo"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     grupo = get_object_or_404(Grupo, id=grupo_id)
     nombre = grupo.nombre
     
-    HistorialAcciones.objects.create(
-        usuario=request.user,
-        accion='Eliminó grupo',
-        descripcion=f"Grupo: {nombre}"
+    registrar_accion(
+        request,
+        'Eliminó grupo',
+        f"Grupo: {nombre}"
     )
     
     grupo.delete()
@@ -694,22 +725,16 @@ def admin_eliminar_grupo(request, grupo_id):
 
 # ============ GESTIÓN DE MATERIAS ============
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_materias(request):
     """Lista de materias"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     materias = Materia.objects.all().order_by('codigo')
     context = {'materias': materias}
     return render(request, 'admin_materias.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_crear_materia(request):
     """Crear materia"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     if request.method == 'POST':
         codigo = request.POST.get('codigo')
         nombre = request.POST.get('nombre')
@@ -724,10 +749,10 @@ def admin_crear_materia(request):
                 creditos=int(creditos)
             )
             
-            HistorialAcciones.objects.create(
-                usuario=request.user,
-                accion='Creó materia',
-                descripcion=f"Materia: {nombre} ({codigo})"
+            registrar_accion(
+                request,
+                'Creó materia',
+                f"Materia: {nombre} ({codigo})"
             )
             
             messages.success(request, f'Materia {nombre} creada exitosamente.')
@@ -737,12 +762,9 @@ def admin_crear_materia(request):
     
     return render(request, 'admin_crear_materia.html')
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_editar_materia(request, materia_id):
     """Editar materia"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     materia = get_object_or_404(Materia, id=materia_id)
     
     if request.method == 'POST':
@@ -762,10 +784,10 @@ def admin_editar_materia(request, materia_id):
         if materia_anterior['creditos'] != materia.creditos:
             cambios.append(f"Créditos: {materia_anterior['creditos']} → {materia.creditos}")
         
-        HistorialAcciones.objects.create(
-            usuario=request.user,
-            accion='Editó materia',
-            descripcion=f"Editó {materia.nombre} ({materia.codigo}): {'; '.join(cambios) if cambios else 'Descripción'}"
+        registrar_accion(
+            request,
+            'Editó materia',
+            f"Editó {materia.nombre} ({materia.codigo}): {'; '.join(cambios) if cambios else 'Descripción'}"
         )
         
         messages.success(request, 'Materia actualizada exitosamente.')
@@ -774,20 +796,17 @@ def admin_editar_materia(request, materia_id):
     context = {'materia': materia}
     return render(request, 'admin_editar_materia.html', context)
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_eliminar_materia(request, materia_id):
     """Eliminar materia"""
-    if request.user.rol != '1':
-        return redirect('login')
-    
     materia = get_object_or_404(Materia, id=materia_id)
     nombre = materia.nombre
     codigo = materia.codigo
     
-    HistorialAcciones.objects.create(
-        usuario=request.user,
-        accion='Eliminó materia',
-        descripcion=f"Materia: {nombre} ({codigo})"
+    registrar_accion(
+        request,
+        'Eliminó materia',
+        f"Materia: {nombre} ({codigo})"
     )
     
     materia.delete()
@@ -798,56 +817,76 @@ def admin_eliminar_materia(request, materia_id):
 # ============ HISTORIAL DE ACCIONES ============
 
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_ver_reportes')
 def admin_historial(request):
     """Ver historial de acciones (auditoría)"""
-    if request.user.rol != '1':
-        return redirect('login')
-
-    q = request.GET.get('q')
-    acciones = HistorialAcciones.objects.select_related('usuario').all()
-    if q:
-        acciones = acciones.filter(
-            Q(accion__icontains=q) | Q(descripcion__icontains=q) | Q(usuario__username__icontains=q)
-        )
+    filtros = {
+        'q': request.GET.get('q', '').strip(),
+        'accion': request.GET.get('accion', ''),
+        'usuario': request.GET.get('usuario', '').strip(),
+        'desde': request.GET.get('desde', ''),
+        'hasta': request.GET.get('hasta', ''),
+    }
+    acciones = filtrar_historial(HistorialAcciones.objects.select_related('usuario'), **filtros)
+    pagina = paginar_keyset(
+        acciones,
+        ['-fecha_hora', '-id'],
+        despues=request.GET.get('despues'),
+        antes=request.GET.get('antes'),
+        tamano=HISTORIAL_POR_PAGINA,
+    )
 
-    context = {'acciones': acciones.order_by('-fecha_hora'), 'query': q}
+    context = {
+        'acciones': pagina,
+        'query': filtros['q'],
+        'filtros': filtros,
+        'filtros_url': urlencode({k: v for k, v in filtros.items() if v}),
+        'tipos_accion': tipos_de_accion(),
+    }
     return render(request, 'admin_historial.html', context)
 
 
+@rol_requerido('1', permiso='puede_ver_reportes')
+def admin_perfilado(request):
+    """Ranking de vistas lentas y consultas N+1 a partir del log de perfilado"""
+    registros = perfilado.leer_registros()
+    context = {
+        'activo': perfilado.configuracion()['ACTIVO'],
+        'archivo': perfilado.archivo_log(),
+        'total_registros': len(registros),
+        'vistas': perfilado.ranking_vistas(registros),
+        'n_mas_1': perfilado.ranking_n_mas_1(registros),
+        'umbral': perfilado.configuracion()['UMBRAL_REPETIDAS'],
+    }
+    return render(request, 'admin_perfilado.html', context)
+
+
 # ============ ASIGNACIONES (ADMIN) ============
 
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_asignar_estudiantes(request):
     """Asignar/Remover estudiantes a un grupo (admin)"""
-    if request.user.rol != '1':
-        return redirect('login')
-
     grupo_id = request.GET.get('grupo')
     grupos = Grupo.objects.select_related('periodo').all()
-    estudiantes = Usuario.objects.filter(rol='3')
 
     if grupo_id:
-        grupo = get_object_or_404(Grupo, id=grupo_id)
-        inscritos = set(EstudianteGrupo.objects.filter(grupo=grupo).values_list('estudiante_id', flat=True))
+        grupo = get_object_or_404(Grupo.objects.select_related('periodo'), id=grupo_id)
+        # Estudiantes ya inscritos; el resto se busca bajo demanda
+        estudiantes = Usuario.objects.filter(estudiantegrupo__grupo=grupo).order_by('documento')
+        inscritos = set(est.id_usuario for est in estudiantes)
         if request.method == 'POST':
-            seleccionados = request.POST.getlist('estudiantes')
-            seleccionados_set = set(int(s) for s in seleccionados)
-
-            # Eliminar los que ya no están seleccionados
-            EstudianteGrupo.objects.filter(grupo=grupo).exclude(estudiante_id__in=seleccionados_set).delete()
-
-            # Añadir los nuevos
-            for est_id in seleccionados_set:
-                if est_id not in inscritos:
-                    estudiante = get_object_or_404(Usuario, id_usuario=est_id, rol='3')
-                    EstudianteGrupo.objects.create(estudiante=estudiante, grupo=grupo)
-
-            HistorialAcciones.objects.create(
-                usuario=request.user,
-                accion='Asignó estudiantes a grupo',
-                descripcion=f'Grupo: {grupo.nombre} - {grupo.periodo.nombre} (Asignados: {len(seleccionados_set)})'
+            try:
+                seleccionados_set = parsear_ids(request.POST.getlist('estudiantes'))
+                sincronizar_inscripciones(grupo, seleccionados_set)
+            except InscripcionError as e:
+                messages.error(request, str(e))
+                return redirect(f"{reverse('admin_asignar_estudiantes')}?grupo={grupo.id}")
+
+            registrar_accion(
+                request,
+                'Asignó estudiantes a grupo',
+                f'Grupo: {grupo.nombre} - {grupo.periodo.nombre} (Asignados: {len(seleccionados_set)})'
             )
             messages.success(request, 'Asignaciones actualizadas correctamente.')
             return redirect('admin_asignar_estudiantes')
@@ -856,84 +895,76 @@ def admin_asignar_estudiantes(request):
         return render(request, 'admin_asignar_estudiantes.html', context)
     
     # Si no hay grupo seleccionado, mostrar lista de grupos
-    context = {'grupos': grupos, 'grupo': None, 'estudiantes': estudiantes}
+    context = {'grupos': grupos, 'grupo': None}
     return render(request, 'admin_asignar_estudiantes.html', context)
 
 
-@login_required(login_url='login')
-def admin_asignar_profesor(request):
-    """Asignar un profesor a una materia dentro de un grupo (admin)"""
-    if request.user.rol != '1':
-        return redirect('login')
-
-    if request.method == 'POST':
-        materia_id = request.POST.get('materia')
-        grupo_id = request.POST.get('grupo')
-        profesor_id = request.POST.get('profesor')
-
-        try:
-            materia = get_object_or_404(Materia, id=materia_id)
-            grupo = get_object_or_404(Grupo, id=grupo_id)
-            profesor = get_object_or_404(Usuario, id_usuario=profesor_id, rol='2')
-
-            mg, created = MateriaGrupo.objects.get_or_create(materia=materia, grupo=grupo, defaults={'profesor': profesor})
-            if not created:
-                mg.profesor = profesor
-                mg.save()
-
-            HistorialAcciones.objects.create(
-                usuario=request.user,
-                accion='Asignó profesor a materia',
-                descripcion=f'Profesor {profesor.username} asignado a {materia.codigo} - {grupo.nombre} ({grupo.periodo.nombre})'
-            )
-
-            messages.success(request, 'Profesor asignado correctamente.')
-            return redirect('admin_asignar_profesor')
-        except Exception as e:
-            messages.error(request, f'Error al asignar profesor: {str(e)}')
-
-    materias = Materia.objects.all().order_by('codigo')
-    grupos = Grupo.objects.select_related('periodo').all().order_by('periodo', 'nombre')
-    profesores = Usuario.objects.filter(rol='2')
-
-    context = {'materias': materias, 'grupos': grupos, 'profesores': profesores}
-    return render(request, 'admin_asignar_profesor.html', context)
+@rol_requerido('1', '2', json=True)
+def buscar_estudiantes_json(request):
+    """Búsqueda paginada de estudiantes (JSON) para los selectores de inscripción"""
+    grupo_id = request.GET.get('grupo')
+    pagina = buscar_estudiantes(
+        request.GET.get('q', ''),
+        grupo_id=int(grupo_id) if grupo_id and grupo_id.isdigit() else None,
+        despues=request.GET.get('despues'),
+    )
+    return JsonResponse({
+        'resultados': [estudiante_a_dict(est) for est in pagina],
+        'siguiente': pagina.cursor_siguiente,
+    })
 
 
-@login_required(login_url='login')
+@rol_requerido('1', permiso='puede_gestionar_cursos')
 def admin_asignar_profesor(request):
-    """Asignar profesor a una materia en un grupo (crea MateriaGrupo)"""
-    if request.user.rol != '1':
-        return redirect('login')
-
+    """Asignar profesores a materias en grupos (crea o actualiza MateriaGrupo), una o varias filas o por CSV/XLSX"""
     if request.method == 'POST':
-        materia_id = request.POST.get('materia')
-        grupo_id = request.POST.get('grupo')
-        profesor_id = request.POST.get('profesor')
-
         try:
-            materia = get_object_or_404(Materia, id=materia_id)
-            grupo = get_object_or_404(Grupo, id=grupo_id)
-            profesor = get_object_or_404(Usuario, id_usuario=profesor_id, rol='2')
-
-            mg, created = MateriaGrupo.objects.get_or_create(materia=materia, grupo=grupo, defaults={'profesor': profesor})
-            if not created:
-                mg.profesor = profesor
-                mg.save()
-
-            HistorialAcciones.objects.create(
-                usuario=request.user,
-                accion='Asignó profesor a materia',
-                descripcion=f'Profesor {profesor.username} -> {materia.codigo} en {grupo.nombre}'
-            )
-            messages.success(request, 'Profesor asignado correctamente.')
-            return redirect('admin_asignar_profesor')
-        except Exception as e:
-            messages.error(request, f'Error al asignar profesor: {str(e)}')
+            archivo = request.FILES.get('archivo')
+            if archivo:
+                asignaciones, errores = resolver_archivo(leer_archivo(archivo, archivo.name))
+            else:
+                filas = list(zip(
+                    request.POST.getlist('materia'),
+                    request.POST.getlist('grupo'),
+                    request.POST.getlist('profesor'),
+                ))
+                asignaciones, errores = resolver_ids([
+                    (numero, *fila) for numero, fila in enumerate(filas, start=1) if any(fila)
+                ])
+
+            if errores:
+                for linea, mensaje in errores[:20]:
+                    messages.error(request, f'Fila {linea}: {mensaje}')
+                if len(errores) > 20:
+                    messages.error(request, f'... y {len(errores) - 20} filas más con errores.')
+                messages.warning(request, 'No se aplicó ninguna asignación.')
+            elif not asignaciones:
+                messages.warning(request, 'No se recibió ninguna asignación.')
+            else:
+                creadas, actualizadas, sin_cambios = aplicar_asignaciones(asignaciones)
+                if len(asignaciones) == 1:
+                    _, materia, grupo, profesor = asignaciones[0]
+                    descripcion = (
+                        f'Profesor {profesor.username} asignado a {materia.codigo} - '
+                        f'{grupo.nombre} ({grupo.periodo.nombre})'
+                    )
+                else:
+                    descripcion = (
+                        f'{len(asignaciones)} asignaciones: {creadas} nuevas, '
+                        f'{actualizadas} actualizadas, {sin_cambios} sin cambios'
+                    )
+                registrar_accion(request, 'Asignó profesor a materia', descripcion)
+                messages.success(
+                    request,
+                    f'Asignaciones aplicadas: {creadas} nuevas, {actualizadas} actualizadas, {sin_cambios} sin cambios.'
+                )
+                return redirect('admin_asignar_profesor')
+        except AsignacionError as e:
+            messages.error(request, str(e))
 
     context = {
-        'materias': Materia.objects.all(),
-        'grupos': Grupo.objects.select_related('periodo').all(),
-        'profesores': Usuario.objects.filter(rol='2')
+        'materias': Materia.objects.all().order_by('codigo'),
+        'grupos': Grupo.objects.select_related('periodo').all().order_by('periodo', 'nombre'),
+        'profesores': Usuario.objects.filter(rol='2').order_by('first_name'),
     }
     return render(request, 'admin_asignar_profesor.html', context)